@@ -0,0 +1,7 @@
+"""
+Benchmarks del backend (no forman parte de pytest).
+
+Cada módulo se ejecuta desde backend/:  python -m benchmarks.<modulo> --help
+Usan una BD SQLite temporal en disco (nunca db.sqlite3), creada y migrada
+por `benchmarks.entorno.bd_temporal()`.
+"""
@@ -0,0 +1,163 @@
+"""
+Rendimiento de las lecturas calientes con --concurrencia clientes a la vez:
+
+    wsgi        vistas DRF por la aplicación WSGI, un hilo por cliente
+                (como gunicorn --threads N)
+    asgi-sync   las mismas vistas DRF por la aplicación ASGI: Django las
+                ejecuta con sync_to_async en un único hilo compartido
+    asgi-async  /api/async/... (core.vistas_asincronas) por la aplicación ASGI
+
+    python -m benchmarks.asgi_wsgi --personajes 5000 --concurrencia 50 --segundos 3
+
+Las aplicaciones se llaman en proceso (sin sockets): un event loop hace de
+worker de uvicorn y un ThreadPoolExecutor de worker de WSGI con hilos. Mide
+req/s y latencia p50/p95 por endpoint; el coste de red y de parseo HTTP del
+servidor real queda fuera y es igual para los tres modos.
+
+Referencia (500 personajes, 10 clientes): asgi-async empata con asgi-sync
+(las comprobaciones de DRF, APIView.initial, dan un salto a un hilo y cada
+consulta otro); wsgi sigue por delante (~2x): con SQLite local no hay espera
+de E/S que solapar y cada salto al hilo del ORM cuesta más que la consulta.
+Por eso el frontend solo usa /api/async/ con VITE_API_ASYNC=true.
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from benchmarks.entorno import bd_temporal, poblar
+
+MODOS = ("wsgi", "asgi-sync", "asgi-async")
+HOST = "localhost"
+
+
+# ---------- Conductores en proceso ----------
+def _wsgi(app, ruta, token):
+    environ = {
+        "REQUEST_METHOD": "GET", "PATH_INFO": ruta, "QUERY_STRING": "", "SCRIPT_NAME": "",
+        "SERVER_NAME": HOST, "SERVER_PORT": "443", "SERVER_PROTOCOL": "HTTP/1.1",
+        "HTTP_HOST": HOST, "HTTP_AUTHORIZATION": f"Bearer {token}", "REMOTE_ADDR": "127.0.0.1",
+        "wsgi.url_scheme": "https", "wsgi.input": BytesIO(), "wsgi.errors": sys.stderr,
+        "wsgi.version": (1, 0), "wsgi.multithread": True, "wsgi.multiprocess": False, "wsgi.run_once": False,
+    }
+    estado = []
+    cuerpo = app(environ, lambda status, headers, exc_info=None: estado.append(status))
+    try:
+        b"".join(cuerpo)
+    finally:
+        getattr(cuerpo, "close", lambda: None)()
+    return int(estado[0].split()[0])
+
+
+async def _asgi(app, ruta, token):
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "https", "path": ruta, "raw_path": ruta.encode(), "query_string": b"", "root_path": "",
+        "headers": [(b"host", HOST.encode()), (b"authorization", f"Bearer {token}".encode())],
+        "client": ("127.0.0.1", 0), "server": (HOST, 443),
+    }
+    cuerpo_enviado = False
+    desconexion = asyncio.get_running_loop().create_future()  # el cliente nunca corta
+
+    async def receive():
+        nonlocal cuerpo_enviado
+        if not cuerpo_enviado:
+            cuerpo_enviado = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        return await desconexion
+
+    estado = []
+
+    async def send(mensaje):
+        if mensaje["type"] == "http.response.start":
+            estado.append(mensaje["status"])
+
+    await app(scope, receive, send)
+    return estado[0]
+
+
+# ---------- Carga ----------
+def _cargar_wsgi(app, ruta, token, concurrencia, segundos):
+    fin = time.perf_counter() + segundos
+
+    def cliente():
+        tiempos = []
+        while time.perf_counter() < fin:
+            t0 = time.perf_counter()
+            assert _wsgi(app, ruta, token) == 200, ruta
+            tiempos.append(time.perf_counter() - t0)
+        return tiempos
+
+    with ThreadPoolExecutor(concurrencia) as pool:
+        return [t for parte in pool.map(lambda _: cliente(), range(concurrencia)) for t in parte]
+
+
+def _cargar_asgi(app, ruta, token, concurrencia, segundos):
+    async def cliente(fin):
+        tiempos = []
+        while time.perf_counter() < fin:
+            t0 = time.perf_counter()
+            assert await _asgi(app, ruta, token) == 200, ruta
+            tiempos.append(time.perf_counter() - t0)
+        return tiempos
+
+    async def todos():
+        fin = time.perf_counter() + segundos
+        partes = await asyncio.gather(*(cliente(fin) for _ in range(concurrencia)))
+        return [t for parte in partes for t in parte]
+
+    return asyncio.run(todos())
+
+
+def _percentil(valores, p):
+    return statistics.quantiles(valores, n=100)[p - 1] if len(valores) > 1 else valores[0]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--personajes", type=int, default=5000)
+    parser.add_argument("--concurrencia", type=int, default=50)
+    parser.add_argument("--segundos", type=float, default=3)
+    parser.add_argument("--modos", default=",".join(MODOS))
+    args = parser.parse_args(argv)
+
+    with bd_temporal("asgi_wsgi"):
+        from django.core.asgi import get_asgi_application
+        from django.core.wsgi import get_wsgi_application
+        from core.autenticacion import tokens_para
+        from core.models import Personaje, Raza
+
+        gm, jugador = poblar(args.personajes)
+        tokens = {"gm": tokens_para(gm)["access"], "jugador": tokens_para(jugador)["access"]}
+        pj = Personaje.objects.filter(propietario=jugador).order_by("id").values_list("id", flat=True).first()
+        raza = Raza.objects.order_by("id").values_list("id", flat=True).first()
+        # nombre -> (usuario, ruta DRF, ruta async)
+        endpoints = {
+            "yo": ("jugador", "/api/yo/", "/api/async/yo/"),
+            "personaje": ("jugador", f"/api/personajes/{pj}/", f"/api/async/personajes/{pj}/"),
+            "listado (gm)": ("gm", "/api/personajes/", "/api/async/personajes/"),
+            "disponibles": ("jugador", "/api/personajes/disponibles/", "/api/async/personajes/disponibles/"),
+            "raza": ("gm", f"/api/razas/{raza}/", f"/api/async/razas/{raza}/"),
+        }
+        apps = {"wsgi": get_wsgi_application(), "asgi": get_asgi_application()}
+
+        print(f"{args.personajes} personajes, {args.concurrencia} clientes, {args.segundos:g} s por medida")
+        print(f"{'endpoint':<14} {'modo':<11} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8}")
+        for nombre, (usuario, ruta_sync, ruta_async) in endpoints.items():
+            token = tokens[usuario]
+            for modo in args.modos.split(","):
+                if modo == "wsgi":
+                    tiempos = _cargar_wsgi(apps["wsgi"], ruta_sync, token, args.concurrencia, args.segundos)
+                else:
+                    ruta = ruta_async if modo == "asgi-async" else ruta_sync
+                    tiempos = _cargar_asgi(apps["asgi"], ruta, token, args.concurrencia, args.segundos)
+                print(f"{nombre:<14} {modo:<11} {len(tiempos) / args.segundos:8.0f} "
+                      f"{_percentil(tiempos, 50) * 1000:8.1f} {_percentil(tiempos, 95) * 1000:8.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,63 @@
+"""
+Búsqueda por nombre: FTS5 (core.busqueda) frente a LIKE '%...%' (lo que
+hacía el admin; el fallback sin FTS5 también usa LIKE) según crece la tabla.
+
+Busca prefijos de nombres generados y mide p50/p95 por búsqueda, en tres
+grupos según las coincidencias: "raro" ("pj4242" -> pj4242, pj42420...),
+"comun" ("pj4" -> ~1/9 de la tabla) y "todos" ("pj", toda la tabla). Con
+FTS5 la latencia depende de las coincidencias: plana con términos raros y
+lineal (no cuadrática: un solo MATCH por búsqueda) con prefijos frecuentes;
+con LIKE crece con el nº de filas.
+
+    python -m benchmarks.busqueda --tamanos 1000,10000,50000 --repeticiones 50
+"""
+import argparse
+import random
+import statistics
+import time
+
+from benchmarks.entorno import bd_temporal, poblar
+
+
+def _medir(terminos, repeticiones):
+    from core import busqueda
+    from core.models import Personaje
+    tiempos, encontrados = [], 0
+    for i in range(repeticiones):
+        t0 = time.perf_counter()
+        encontrados += len(list(busqueda.buscar(Personaje.objects.con_relaciones(), terminos[i])[:20]))
+        tiempos.append((time.perf_counter() - t0) * 1000)
+    tiempos.sort()
+    return statistics.median(tiempos), tiempos[int(len(tiempos) * 0.95) - 1], encontrados / repeticiones
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tamanos", default="1000,10000,50000")
+    parser.add_argument("--repeticiones", type=int, default=50)
+    args = parser.parse_args(argv)
+
+    with bd_temporal("busqueda"):
+        from django.db import DEFAULT_DB_ALIAS
+        from core import busqueda
+        fts = busqueda.fts_disponible(DEFAULT_DB_ALIAS)
+        print(f"{'filas':>8}  {'grupo':<6} {'modo':<5} {'p50 ms':>8} {'p95 ms':>8} {'res/búsq':>9}")
+        for n in (int(t) for t in args.tamanos.split(",")):
+            poblar(n)
+            rnd = random.Random(n)
+            grupos = {
+                "raro": [f"pj{rnd.randrange(n)}" for _ in range(args.repeticiones)],
+                "comun": [f"pj{rnd.randrange(1, 10)}" for _ in range(args.repeticiones)],
+                "todos": ["pj"] * args.repeticiones,
+            }
+            for grupo, terminos in grupos.items():
+                for modo, disponible in (("fts", fts), ("like", False)):
+                    busqueda._disponible[DEFAULT_DB_ALIAS] = disponible
+                    p50, p95, media = _medir(terminos, args.repeticiones)
+                    print(f"{n:>8}  {grupo:<6} {modo:<5} {p50:8.2f} {p95:8.2f} {media:9.1f}")
+            busqueda._disponible[DEFAULT_DB_ALIAS] = fts
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
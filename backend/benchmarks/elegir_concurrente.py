@@ -0,0 +1,120 @@
+"""
+Ráfaga de jugadores reclamando personajes del pool a la vez.
+
+Compara el `elegir` anterior (leer, comprobar en Python, guardar) con el
+UPDATE condicional de PersonajeQuerySet.reclamar / reclamar_varios.
+Informa de reclamaciones/s y de dobles reclamaciones (debe ser 0).
+
+    python -m benchmarks.elegir_concurrente --hilos 16 --personajes 2000
+"""
+import argparse
+import threading
+import time
+
+from benchmarks.entorno import bd_temporal, catalogos_minimos
+
+
+def _preparar(n_personajes, n_hilos):
+    from core.models import Personaje, Usuario
+    cat = catalogos_minimos()
+    Personaje.objects.all().delete()
+    Personaje.objects.bulk_create(
+        [Personaje(nombre=f"Pool-{i}", raza=cat["raza"], poder=cat["poder"], equipamiento=cat["equipamiento"])
+         for i in range(n_personajes)],
+        batch_size=2000,
+    )
+    Usuario.objects.all().delete()
+    return [Usuario.objects.create(username=f"jug{i}").id for i in range(n_hilos)]
+
+
+def _antes(pk, usuario_id, registro):
+    """Lógica previa: lectura + comprobación en Python + save (carrera)."""
+    from core.models import Personaje
+    pj = Personaje.objects.get(pk=pk)
+    if pj.propietario_id is not None or pj.estado == pj.Estado.MUERTO:
+        return False
+    pj.propietario_id = usuario_id
+    pj.save(update_fields=["propietario"])
+    registro.append(pk)
+    return True
+
+
+def _ahora(pk, usuario_id, registro):
+    from core.models import Personaje
+    if Personaje.objects.reclamar(pk, usuario_id):
+        registro.append(pk)
+        return True
+    return False
+
+
+def _ahora_varios(usuario_id, registro, cantidad):
+    from core.models import Personaje
+    ids = Personaje.objects.reclamar_varios(usuario_id, cantidad)
+    registro.extend(ids)
+    return bool(ids)
+
+
+def _rafaga(nombre, usuarios, ids, trabajo):
+    """Todos los hilos intentan todos los ids (máxima contención)."""
+    from django.db import connection
+    registros = {u: [] for u in usuarios}
+    barrera = threading.Barrier(len(usuarios))
+
+    def hilo(usuario_id):
+        barrera.wait()
+        try:
+            for pk in ids:
+                trabajo(pk, usuario_id, registros[usuario_id])
+        finally:
+            connection.close()
+
+    t0 = time.perf_counter()
+    hilos = [threading.Thread(target=hilo, args=(u,)) for u in usuarios]
+    for h in hilos:
+        h.start()
+    for h in hilos:
+        h.join()
+    return _informe(nombre, registros, time.perf_counter() - t0)
+
+
+def _informe(nombre, registros, segundos):
+    from core.models import Personaje
+    exitos = sum(len(r) for r in registros.values())
+    asignados = Personaje.objects.filter(propietario__isnull=False).count()
+    # Doble reclamación: dos "éxitos" sobre el mismo personaje
+    dobles = exitos - len({pk for r in registros.values() for pk in r})
+    print(f"{nombre:<28} {segundos:8.3f}s  {exitos / segundos:10.0f} reclam./s  "
+          f"éxitos={exitos} asignados={asignados} dobles={dobles}")
+    return dobles
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--hilos", type=int, default=16)
+    parser.add_argument("--personajes", type=int, default=1000)
+    parser.add_argument("--lote", type=int, default=10, help="cantidad por llamada en reclamar_varios")
+    args = parser.parse_args(argv)
+
+    with bd_temporal("elegir"):
+        print(f"{args.hilos} hilos, {args.personajes} personajes en el pool")
+        dobles = 0
+
+        from core.models import Personaje
+
+        usuarios = _preparar(args.personajes, args.hilos)
+        ids = list(Personaje.objects.order_by("id").values_list("id", flat=True))
+        _rafaga("antes (leer+save)", usuarios, ids, _antes)
+
+        usuarios = _preparar(args.personajes, args.hilos)
+        ids = list(Personaje.objects.order_by("id").values_list("id", flat=True))
+        dobles += _rafaga("reclamar (UPDATE cond.)", usuarios, ids, _ahora)
+
+        usuarios = _preparar(args.personajes, args.hilos)
+        pasos = range(0, args.personajes, args.lote)
+        dobles += _rafaga(f"reclamar_varios(N={args.lote})", usuarios, pasos,
+                          lambda _, u, r: _ahora_varios(u, r, args.lote))
+    return 1 if dobles else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,271 @@
+"""
+Suite de rendimiento de endpoints: latencia p50/p95/p99, nº de consultas y
+memoria pico por endpoint y tamaño de datos, a través del cliente de pruebas
+de Django (pila completa de middleware, JWT, permisos y serialización).
+
+    python -m benchmarks.endpoints --tamanos 100,1000,10000 --repeticiones 30
+    python -m benchmarks.endpoints --guardar-baseline           # fija la referencia
+    python -m benchmarks.endpoints --baseline benchmarks/resultados/baseline.json --umbral 0.25
+
+Escribe JSON en --salida. Con --baseline compara: un endpoint regresa si su p95
+supera la referencia en más de --umbral (fracción) o si hace más consultas.
+Sale con código 1 si hay alguna regresión.
+"""
+import argparse
+import itertools
+import json
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+from benchmarks.entorno import bd_temporal, poblar
+
+RESULTADOS = Path(__file__).resolve().parent / "resultados"
+# Endpoints dominados por el hash de contraseña: pocas repeticiones bastan
+LENTOS = {"auth_register", "auth_login", "token"}
+MAX_REP_LENTOS = 5
+# Sufijo de nombres únicos para todo el proceso (los catálogos no se vacían entre tamaños)
+_CONTADOR = itertools.count()
+
+
+class Contexto:
+    """Ids y clientes que usan los endpoints; los que mutan consumen ids."""
+
+    def __init__(self, gm, jugador):
+        from django.urls import reverse
+        from rest_framework.test import APIClient
+        from core.autenticacion import tokens_para
+        from core.models import Personaje, Raza
+
+        def cliente(usuario):
+            c = APIClient()
+            c.credentials(HTTP_AUTHORIZATION=f"Bearer {tokens_para(usuario)['access']}")
+            return c
+
+        self.reverse = reverse
+        self.gm, self.jugador = gm, jugador
+        self.clientes = {"gm": cliente(gm), "jugador": cliente(jugador), "anon": APIClient()}
+        # elegir / liberar reutilizan siempre el mismo personaje: tras medir,
+        # se deshace el cambio por ORM (fuera del tiempo medido)
+        self.libre = Personaje.objects.reclamables().order_by("id").values_list("id", flat=True).first()
+        mios = Personaje.objects.filter(propietario=jugador).exclude(estado="MUERTO").order_by("id")
+        self.mio = mios.values_list("id", flat=True).first()
+        # Personaje del jugador con 3 opciones para elegir-habilidades
+        con_ops = mios.filter(opcion_hab3__isnull=False).first()
+        self.con_opciones = con_ops
+        self.vivo = Personaje.objects.exclude(estado="MUERTO").order_by("id").values_list("id", flat=True).first()
+        self.raza = Raza.objects.order_by("id").first()
+        self.habs = list(Personaje.objects.filter(opcion_hab3__isnull=False).values_list(
+            "opcion_hab1_id", "opcion_hab2_id", "opcion_hab3_id").first() or [])
+        self.catalogo = {
+            "raza": self.raza.id,
+            "poder": Personaje.objects.values_list("poder_id", flat=True).first(),
+            "equipamiento": Personaje.objects.values_list("equipamiento_id", flat=True).first(),
+        }
+        self.bulk_ids = list(Personaje.objects.order_by("id").values_list("id", flat=True)[:100])
+        self.contador = _CONTADOR
+        self.creados = []
+        self.estados = itertools.cycle(["CONGELADO", "VIVO"])
+
+
+def _endpoints():
+    """(nombre, rol, método, url(ctx), cuerpo(ctx) | None)."""
+    from core.models import Personaje
+
+    def u(nombre):
+        return lambda c: c.reverse(nombre)
+
+    def crear_pj(c):
+        return {"nombre": f"Bench-{next(c.contador)}", **c.catalogo}
+
+    def post_crear(c, r):
+        if r.status_code == 201:
+            c.creados.append(r.json()["id"])
+
+    def devolver_al_pool(c, r):
+        Personaje.objects.filter(pk=c.libre).update(propietario=None)
+
+    def devolver_al_jugador(c, r):
+        Personaje.objects.filter(pk=c.mio).update(propietario=c.jugador)
+
+    def vaciar_elegidos(c, r):
+        Personaje.objects.filter(pk__in=r.json().get("personajes", [])).update(propietario=None)
+
+    return [
+        ("yo", "jugador", "get", lambda c: "/api/yo/", None),
+        ("bootstrap_gm", "gm", "get", u("bootstrap"), None),
+        ("bootstrap_jugador", "jugador", "get", u("bootstrap"), None),
+        ("personajes_list_gm", "gm", "get", u("personaje-list"), None),
+        ("personajes_list_jugador", "jugador", "get", u("personaje-list"), None),
+        ("personajes_list_nivel", "gm", "get", lambda c: c.reverse("personaje-list") + "?ordering=-nivel", None),
+        ("personajes_retrieve", "jugador", "get", lambda c: c.reverse("personaje-detail", args=[c.mio]), None),
+        ("personajes_disponibles", "jugador", "get", u("personaje-disponibles"), None),
+        ("personajes_create", "gm", "post", u("personaje-list"), crear_pj, post_crear),
+        ("personajes_update", "gm", "patch", lambda c: c.reverse("personaje-detail", args=[c.vivo]),
+         lambda c: {"nombre": f"Bench-upd-{next(c.contador)}"}),
+        ("personajes_delete", "gm", "delete", lambda c: c.reverse("personaje-detail", args=[c.creados.pop()])
+         if c.creados else c.reverse("personaje-detail", args=[0]), None),
+        ("elegir", "jugador", "post", lambda c: c.reverse("personaje-elegir", args=[c.libre]), None,
+         devolver_al_pool),
+        ("elegir_varios", "jugador", "post", u("personaje-elegir-varios"), lambda c: {"cantidad": 3},
+         vaciar_elegidos),
+        ("set_opciones", "gm", "patch", lambda c: c.reverse("personaje-set-opciones", args=[c.vivo]),
+         lambda c: dict(zip(["opcion_hab1", "opcion_hab2", "opcion_hab3"], c.habs))),
+        ("elegir_habilidades", "jugador", "post",
+         lambda c: c.reverse("personaje-elegir-habilidades", args=[c.con_opciones.id]),
+         lambda c: {"habilidades": [c.con_opciones.opcion_hab1_id, c.con_opciones.opcion_hab2_id]}),
+        ("subir_nivel", "gm", "post", lambda c: c.reverse("personaje-subir-nivel", args=[c.vivo]), None),
+        ("cambiar_estado", "gm", "post", lambda c: c.reverse("personaje-cambiar-estado", args=[c.vivo]),
+         lambda c: {"estado": next(c.estados)}),
+        ("liberar", "gm", "post", lambda c: c.reverse("personaje-liberar", args=[c.mio]), None,
+         devolver_al_jugador),
+        ("bulk_subir_nivel", "gm", "post", u("personaje-bulk"),
+         lambda c: {"ids": c.bulk_ids, "accion": "subir_nivel"}),
+        ("exportar", "gm", "get", u("personaje-exportar"), None),
+        ("razas_list", "gm", "get", u("raza-list"), None),
+        ("razas_retrieve", "gm", "get", lambda c: c.reverse("raza-detail", args=[c.raza.id]), None),
+        ("habilidades_list", "gm", "get", u("habilidad-list"), None),
+        ("poderes_list", "gm", "get", u("poder-list"), None),
+        ("equipamientos_list", "gm", "get", u("equipamiento-list"), None),
+        ("razas_create", "gm", "post", u("raza-list"), lambda c: {"nombre": f"Raza-bench-{next(c.contador)}"}),
+        ("auth_register", "anon", "post", u("auth-register"),
+         lambda c: {"username": f"bench{next(c.contador)}", "password": "Passw0rd!", "password2": "Passw0rd!"}),
+        ("auth_login", "anon", "post", u("token_obtain_pair"),
+         lambda c: {"username": c.jugador.username, "password": "Passw0rd!"}),
+    ]
+
+
+def _peticion(ctx, spec):
+    nombre, rol, metodo, url, cuerpo, *_ = spec
+    cliente = ctx.clientes[rol]
+    kwargs = {"format": "json"} if cuerpo is not None else {}
+    args = (url(ctx),) + ((cuerpo(ctx),) if cuerpo is not None else ())
+    r = getattr(cliente, metodo)(*args, **kwargs)
+    if getattr(r, "streaming", False):
+        for _ in r.streaming_content:
+            pass
+    return r
+
+
+def _despues(ctx, spec, r):
+    """Deshace/anota el efecto de la petición (fuera del tiempo medido)."""
+    if len(spec) > 5:
+        spec[5](ctx, r)
+
+
+def _percentil(valores, p):
+    if len(valores) == 1:
+        return valores[0]
+    return statistics.quantiles(valores, n=100, method="inclusive")[p - 1]
+
+
+def medir(ctx, spec, repeticiones):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    nombre = spec[0]
+    reps = min(repeticiones, MAX_REP_LENTOS) if nombre in LENTOS else repeticiones
+    _despues(ctx, spec, _peticion(ctx, spec))  # calentamiento (cachés, imports perezosos)
+
+    tiempos, consultas, codigos = [], [], set()
+    for _ in range(reps):
+        with CaptureQueriesContext(connection) as q:
+            t0 = time.perf_counter()
+            r = _peticion(ctx, spec)
+            tiempos.append((time.perf_counter() - t0) * 1000)
+        _despues(ctx, spec, r)
+        consultas.append(len(q.captured_queries))
+        codigos.add(r.status_code)
+
+    # Memoria en una pasada aparte: tracemalloc distorsiona la latencia
+    tracemalloc.start()
+    r = _peticion(ctx, spec)
+    pico = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    _despues(ctx, spec, r)
+
+    tiempos.sort()
+    return {
+        "n": reps,
+        "p50_ms": round(_percentil(tiempos, 50), 3),
+        "p95_ms": round(_percentil(tiempos, 95), 3),
+        "p99_ms": round(_percentil(tiempos, 99), 3),
+        "consultas": max(consultas),
+        "memoria_pico_kb": round(pico / 1024, 1),
+        "codigos": sorted(codigos),
+    }
+
+
+def comparar(actual, baseline, umbral):
+    """Lista de regresiones (texto) de `actual` frente a `baseline`."""
+    regresiones = []
+    for tamano, endpoints in baseline.get("resultados", {}).items():
+        for nombre, ref in endpoints.items():
+            med = actual["resultados"].get(tamano, {}).get(nombre)
+            if med is None:
+                continue
+            if med["p95_ms"] > ref["p95_ms"] * (1 + umbral):
+                regresiones.append(f"[{tamano}] {nombre}: p95 {ref['p95_ms']}ms -> {med['p95_ms']}ms")
+            if med["consultas"] > ref["consultas"]:
+                regresiones.append(f"[{tamano}] {nombre}: consultas {ref['consultas']} -> {med['consultas']}")
+    return regresiones
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tamanos", default="100,1000,10000", help="Nº de personajes por conjunto, separados por comas.")
+    parser.add_argument("--repeticiones", type=int, default=30)
+    parser.add_argument("--solo", default="", help="Nombres de endpoint a medir (comas); vacío = todos.")
+    parser.add_argument("--salida", default=str(RESULTADOS / "ultimo.json"))
+    parser.add_argument("--baseline", default=None, help="JSON de referencia con el que comparar.")
+    parser.add_argument("--umbral", type=float, default=0.25, help="Regresión tolerada en p95 (0.25 = +25%%).")
+    parser.add_argument("--guardar-baseline", action="store_true", help="Escribe también baseline.json.")
+    args = parser.parse_args(argv)
+
+    tamanos = [int(x) for x in args.tamanos.split(",") if x]
+    solo = {x for x in args.solo.split(",") if x}
+    resultado = {
+        "meta": {"python": platform.python_version(), "plataforma": platform.platform(),
+                 "repeticiones": args.repeticiones, "fecha": time.strftime("%Y-%m-%dT%H:%M:%S")},
+        "resultados": {},
+    }
+
+    with bd_temporal("endpoints"):
+        from core import auditoria
+        for tamano in tamanos:
+            gm, jugador = poblar(tamano, semilla=tamano)
+            ctx = Contexto(gm, jugador)
+            por_endpoint = resultado["resultados"][str(tamano)] = {}
+            print(f"\n== {tamano} personajes ==")
+            print(f"{'endpoint':<26}{'p50':>9}{'p95':>9}{'p99':>9}{'consultas':>11}{'mem KB':>10}")
+            for spec in _endpoints():
+                if solo and spec[0] not in solo:
+                    continue
+                m = por_endpoint[spec[0]] = medir(ctx, spec, args.repeticiones)
+                print(f"{spec[0]:<26}{m['p50_ms']:>9.2f}{m['p95_ms']:>9.2f}{m['p99_ms']:>9.2f}"
+                      f"{m['consultas']:>11}{m['memoria_pico_kb']:>10.0f}  {m['codigos']}")
+            auditoria.vaciar()
+
+    salida = Path(args.salida)
+    salida.parent.mkdir(parents=True, exist_ok=True)
+    salida.write_text(json.dumps(resultado, indent=2, ensure_ascii=False))
+    print(f"\nResultados en {salida}")
+    if args.guardar_baseline:
+        (salida.parent / "baseline.json").write_text(json.dumps(resultado, indent=2, ensure_ascii=False))
+        print(f"Baseline en {salida.parent / 'baseline.json'}")
+
+    if args.baseline:
+        regresiones = comparar(resultado, json.loads(Path(args.baseline).read_text()), args.umbral)
+        for r in regresiones:
+            print(f"REGRESIÓN {r}", file=sys.stderr)
+        if regresiones:
+            return 1
+        print("Sin regresiones frente a la baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,84 @@
+"""Arranque común de los benchmarks: Django + BD de prueba en un fichero temporal."""
+import atexit
+import contextlib
+import os
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+BACKEND = Path(__file__).resolve().parent.parent
+
+
+def configurar_django():
+    if str(BACKEND) not in sys.path:
+        sys.path.insert(0, str(BACKEND))
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "rpg.settings")
+    # Caché propia (y con ella cubos de throttling) y eventos solo en proceso:
+    # las claves de la BD de prueba no deben mezclarse con las de un runserver
+    if "RPG_BENCH_CACHE" not in os.environ:
+        directorio = tempfile.mkdtemp(prefix="rpg-bench-cache-")
+        atexit.register(shutil.rmtree, directorio, True)
+        os.environ["RPG_BENCH_CACHE"] = os.environ["DJANGO_CACHE_DIR"] = directorio
+        os.environ.pop("THROTTLE_DB", None)
+        os.environ.pop("EVENTOS_FICHERO", None)
+    # Se mide el coste de las vistas, no el 429 del throttling
+    os.environ.setdefault("DRF_THROTTLE_ANON", "1000000/min")
+    os.environ.setdefault("DRF_THROTTLE_USER", "1000000/min")
+    import django
+    from django.conf import settings
+    django.setup()
+    # Sin DEBUG: connection.queries crecería sin límite durante la medición
+    settings.DEBUG = False
+
+
+@contextlib.contextmanager
+def bd_temporal(nombre="bench"):
+    """
+    Crea (y al salir destruye) una BD de prueba migrada en un fichero SQLite,
+    compartida por todos los hilos del proceso.
+    """
+    configurar_django()
+    from django.db import connection
+
+    directorio = tempfile.mkdtemp(prefix="rpg-bench-")
+    connection.settings_dict.setdefault("TEST", {})["NAME"] = os.path.join(directorio, f"{nombre}.sqlite3")
+    # Espera de cerrojo generosa: los benchmarks concurrentes escriben a la vez
+    connection.settings_dict.setdefault("OPTIONS", {}).setdefault("timeout", 30)
+    nombre_original = connection.settings_dict["NAME"]
+    connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+    try:
+        yield connection.settings_dict["NAME"]
+    finally:
+        # La auditoría diferida debe escribirse aquí, no tras restaurar la BD real
+        from core import auditoria
+        auditoria.vaciar()
+        connection.creation.destroy_test_db(nombre_original, verbosity=0)
+
+
+def catalogos_minimos():
+    """Un registro por catálogo (idempotente); devuelve dict con las instancias."""
+    from core.models import Equipamiento, Habilidad, Poder, Raza
+    return {
+        "raza": Raza.objects.get_or_create(nombre="Raza-bench")[0],
+        "poder": Poder.objects.get_or_create(nombre="Poder-bench")[0],
+        "equipamiento": Equipamiento.objects.get_or_create(nombre="Eq-bench")[0],
+        "habilidad": Habilidad.objects.get_or_create(nombre="Hab-bench")[0],
+    }
+
+
+def poblar(personajes, semilla=1, **kwargs):
+    """
+    Vacía personajes y usuarios y genera un conjunto nuevo con core.generador.
+    Devuelve (gm, jugador): el primer GM y el primer jugador generados.
+    """
+    from core.generador import generar
+    from core.models import Personaje, Usuario
+    Personaje.objects.all().delete()
+    Usuario.objects.all().delete()
+    kwargs.setdefault("usuarios", max(10, personajes // 50))
+    prefijo = f"B{semilla}-"
+    generar(personajes=personajes, semilla=semilla, prefijo=prefijo, **kwargs)
+    gm = Usuario.objects.filter(rol=Usuario.Rol.GM).order_by("id").first()
+    jugador = Usuario.objects.filter(rol=Usuario.Rol.JUGADOR).order_by("id").first()
+    return gm, jugador
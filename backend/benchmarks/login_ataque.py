@@ -0,0 +1,125 @@
+"""
+Relleno de credenciales contra /api/auth/login/: logins fallidos/s con el
+handler de axes en BD (AxesDatabaseHandler) frente al de caché
+(core.bloqueos.ManejadorAxesCache).
+
+Cada hilo ataca varias cuentas con contraseñas malas; pasado AXES_FAILURE_LIMIT
+las cuentas quedan bloqueadas y el resto de intentos solo cuesta lo que cueste
+comprobar el bloqueo. Informa de intentos/s, p50/p95 por intento y consultas a
+la BD por intento. Se usa MD5 como hasher para que el PBKDF2 de los primeros
+intentos no tape el coste de axes (--hasher-real para medir con el de verdad).
+
+    python -m benchmarks.login_ataque --hilos 8 --cuentas 50 --intentos 40
+"""
+import argparse
+import logging
+import statistics
+import threading
+import time
+
+from benchmarks.entorno import bd_temporal
+
+HANDLERS = {
+    "bd": "axes.handlers.database.AxesDatabaseHandler",
+    "cache": "core.bloqueos.ManejadorAxesCache",
+}
+
+
+def _preparar(n_cuentas):
+    from axes.models import AccessAttempt, AccessLog
+    from django.core.cache import cache
+    from core.models import Usuario
+    AccessAttempt.objects.all().delete()
+    AccessLog.objects.all().delete()
+    cache.clear()
+    if Usuario.objects.count() != n_cuentas:
+        Usuario.objects.all().delete()
+        for i in range(n_cuentas):
+            Usuario.objects.create_user(username=f"victima{i}", password="Passw0rd!")
+    return list(Usuario.objects.order_by("id").values_list("username", flat=True))
+
+
+def _ataque(nombre, cuentas, hilos, intentos):
+    from axes.models import AccessAttempt
+    from django.db import connection
+    from django.test import Client
+    from django.urls import reverse
+
+    url = reverse("token_obtain_pair")
+    tiempos, consultas, codigos = [], [0], {}
+    lock = threading.Lock()
+    barrera = threading.Barrier(hilos)
+
+    def contar(execute, sql, params, many, context):
+        with lock:
+            consultas[0] += 1
+        return execute(sql, params, many, context)
+
+    def hilo(indice):
+        # Los 500 (p. ej. "database is locked" del handler en BD) cuentan como resultado
+        c = Client(raise_request_exception=False, REMOTE_ADDR=f"10.0.{indice // 250}.{indice % 250 + 1}")
+        propias = cuentas[indice::hilos]
+        locales, cods = [], {}
+        barrera.wait()
+        try:
+            with connection.execute_wrapper(contar):
+                for i in range(intentos):
+                    usuario = propias[i % len(propias)]
+                    t0 = time.perf_counter()
+                    r = c.post(url, {"username": usuario, "password": f"mala{i}"})
+                    locales.append(time.perf_counter() - t0)
+                    cods[r.status_code] = cods.get(r.status_code, 0) + 1
+        finally:
+            connection.close()
+        with lock:
+            tiempos.extend(locales)
+            for k, v in cods.items():
+                codigos[k] = codigos.get(k, 0) + v
+
+    t0 = time.perf_counter()
+    ths = [threading.Thread(target=hilo, args=(i,)) for i in range(hilos)]
+    for h in ths:
+        h.start()
+    for h in ths:
+        h.join()
+    segundos = time.perf_counter() - t0
+
+    from core import bloqueos
+    bloqueos.vaciar()
+    n = len(tiempos)
+    tiempos.sort()
+    print(f"{nombre:<6} {n / segundos:9.0f} intentos/s  p50={statistics.median(tiempos) * 1000:6.2f}ms  "
+          f"p95={tiempos[int(n * 0.95) - 1] * 1000:6.2f}ms  consultas/intento={consultas[0] / n:5.2f}  "
+          f"filas AccessAttempt={AccessAttempt.objects.count()}  códigos={dict(sorted(codigos.items()))}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--hilos", type=int, default=8)
+    parser.add_argument("--cuentas", type=int, default=50, help="cuentas atacadas (repartidas entre hilos)")
+    parser.add_argument("--intentos", type=int, default=40, help="intentos por hilo")
+    parser.add_argument("--solo", choices=sorted(HANDLERS), help="medir un solo handler")
+    parser.add_argument("--hasher-real", action="store_true", help="no sustituir PBKDF2 por MD5")
+    args = parser.parse_args(argv)
+
+    # axes deja un WARNING por intento fallido y django.request otro por cada 500
+    for nombre in ("axes", "django.request"):
+        logging.getLogger(nombre).setLevel(logging.CRITICAL)
+    with bd_temporal("login"):
+        from django.conf import settings
+        from django.test import override_settings
+        if not args.hasher_real:
+            settings.PASSWORD_HASHERS = ["django.contrib.auth.hashers.MD5PasswordHasher"]
+        print(f"{args.hilos} hilos x {args.intentos} intentos contra {args.cuentas} cuentas "
+              f"(límite {settings.AXES_FAILURE_LIMIT})")
+        for nombre, handler in HANDLERS.items():
+            if args.solo and nombre != args.solo:
+                continue
+            with override_settings(AXES_HANDLER=handler):
+                cuentas = _preparar(args.cuentas)
+                _ataque(nombre, cuentas, args.hilos, args.intentos)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
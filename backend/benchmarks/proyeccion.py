@@ -0,0 +1,65 @@
+"""
+Filas/s del listado de personajes: PersonajeListaSerializer frente a la
+proyección de core.proyecciones (values_list + dict precompuesto).
+
+Mide dos cosas por camino, sobre páginas de --pagina filas:
+- "total": consulta + construcción de los dicts + render a JSON
+- "cpu": solo la construcción de los dicts (filas ya leídas de la BD)
+
+    python -m benchmarks.proyeccion --personajes 20000 --pagina 500 --repeticiones 20
+"""
+import argparse
+import statistics
+import time
+
+from benchmarks.entorno import bd_temporal, poblar
+
+
+def _medir(funcion, repeticiones):
+    tiempos = []
+    for _ in range(repeticiones):
+        t0 = time.perf_counter()
+        funcion()
+        tiempos.append(time.perf_counter() - t0)
+    return statistics.median(tiempos)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--personajes", type=int, default=20000)
+    parser.add_argument("--pagina", type=int, default=500)
+    parser.add_argument("--repeticiones", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    with bd_temporal("proyeccion"):
+        from rest_framework.renderers import JSONRenderer
+        from core.models import Personaje
+        from core.proyecciones import PERSONAJE_LISTA
+        from core.serializers import PersonajeListaSerializer
+
+        poblar(args.personajes)
+        render = JSONRenderer().render
+        qs = Personaje.objects.con_relaciones().order_by("id")[: args.pagina]
+        instancias = list(qs)
+        tuplas = list(PERSONAJE_LISTA.consulta(qs))
+        assert render(PersonajeListaSerializer(instancias, many=True).data) == render(PERSONAJE_LISTA.filas(tuplas))
+
+        casos = {
+            "serializer total": lambda: render(PersonajeListaSerializer(list(qs.all()), many=True).data),
+            "proyección total": lambda: render(PERSONAJE_LISTA.datos(qs.all())),
+            "serializer cpu": lambda: PersonajeListaSerializer(instancias, many=True).data,
+            "proyección cpu": lambda: PERSONAJE_LISTA.filas(tuplas),
+        }
+        filas_s = {}
+        print(f"{args.personajes} personajes, páginas de {args.pagina} filas, mediana de {args.repeticiones}")
+        for nombre, funcion in casos.items():
+            funcion()  # calentamiento
+            filas_s[nombre] = args.pagina / _medir(funcion, args.repeticiones)
+            print(f"{nombre:<18} {filas_s[nombre]:12,.0f} filas/s")
+        for tipo in ("total", "cpu"):
+            print(f"ganancia {tipo}: x{filas_s[f'proyección {tipo}'] / filas_s[f'serializer {tipo}']:.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,61 @@
+"""
+Coste de un refresco del frontend: carga completa (/api/sync/ sin cursor,
+lo mismo que volver a pedir todos los listados) frente al delta desde el
+último cursor con --cambios escrituras entre refrescos.
+
+    python -m benchmarks.sincronizacion --personajes 20000 --cambios 10 --repeticiones 20
+
+El delta debe costar lo mismo con 1.000 que con 100.000 filas: solo depende
+de los cambios.
+"""
+import argparse
+import statistics
+import time
+
+from benchmarks.entorno import bd_temporal, poblar
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--personajes", type=int, default=20000)
+    parser.add_argument("--cambios", type=int, default=10)
+    parser.add_argument("--repeticiones", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    with bd_temporal("sincronizacion"):
+        from django.urls import reverse
+        from rest_framework.test import APIClient
+        from core.autenticacion import tokens_para
+        from core.models import Personaje
+
+        gm, _ = poblar(args.personajes)
+        cliente = APIClient()
+        cliente.credentials(HTTP_AUTHORIZATION=f"Bearer {tokens_para(gm)['access']}")
+        url = reverse("sync")
+        ids = list(Personaje.objects.order_by("id").values_list("id", flat=True)[: args.cambios])
+
+        def refresco(since=None):
+            t0 = time.perf_counter()
+            r = cliente.get(url, {} if since is None else {"since": since})
+            assert r.status_code == 200, r.content
+            return time.perf_counter() - t0, r.json()
+
+        refresco()  # calentamiento
+        completo, delta, filas = [], [], 0
+        for _ in range(args.repeticiones):
+            t, datos = refresco()
+            completo.append(t)
+            Personaje.objects.filter(id__in=ids).subir_nivel()
+            t, datos = refresco(datos["cursor"])
+            delta.append(t)
+            filas = len(datos["personajes"]["cambiados"])
+
+        print(f"{args.personajes} personajes, {args.cambios} cambios entre refrescos, mediana de {args.repeticiones}")
+        print(f"{'completo':<10} {statistics.median(completo) * 1000:10.1f} ms")
+        print(f"{'delta':<10} {statistics.median(delta) * 1000:10.1f} ms  ({filas} filas)")
+        print(f"ganancia: x{statistics.median(completo) / statistics.median(delta):.0f}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
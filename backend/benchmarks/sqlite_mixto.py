@@ -0,0 +1,127 @@
+"""
+Carga mixta de lectura/escritura sobre SQLite: configuración de serie frente
+al perfil de producción (core.sqlite: WAL + PRAGMAs + conexión persistente).
+
+Lectores: páginas del listado con JOINs. Escritores: acción de GM típica
+(UPDATE de nivel + fila de auditoría en una transacción). Cada operación es una
+"petición": entre una y otra se llama a close_old_connections(), como hace
+Django al terminar cada request (con CONN_MAX_AGE=0 se reabre la conexión).
+Informa de ops/s y p95 por tipo y de errores "database is locked".
+
+    python -m benchmarks.sqlite_mixto --lectores 8 --escritores 2 --segundos 5
+"""
+import argparse
+import random
+import threading
+import time
+
+from benchmarks.entorno import bd_temporal, poblar
+
+PERFILES = ("serie", "produccion")
+
+
+def _perfil(nombre, pragmas_produccion):
+    """Aplica el perfil a la BD de prueba (el modo de journal queda en el fichero)."""
+    from django.conf import settings
+    from django.db import connection, connections
+    connections.close_all()
+    if nombre == "serie":
+        settings.SQLITE_PRAGMAS = {}
+        connection.settings_dict["CONN_MAX_AGE"] = 0
+        connection.settings_dict["OPTIONS"]["timeout"] = 5
+        with connection.cursor() as c:
+            c.execute("PRAGMA journal_mode=DELETE")
+    else:
+        settings.SQLITE_PRAGMAS = pragmas_produccion
+        connection.settings_dict["CONN_MAX_AGE"] = 600
+        connection.ensure_connection()
+    connections.close_all()
+
+
+def _lector(ids, paso):
+    from core.models import Personaje
+    desde = random.choice(ids[:-paso] or ids)
+    list(Personaje.objects.con_relaciones().filter(id__gte=desde).order_by("id")[:paso])
+
+
+def _escritor(ids, usuario_id):
+    from django.db import transaction
+    from django.db.models import F
+    from core.models import AuditLog, Personaje
+    pk = random.choice(ids)
+    with transaction.atomic():
+        Personaje.objects.filter(pk=pk).update(nivel=F("nivel") + 1)
+        AuditLog.objects.create(usuario_id=usuario_id, accion="SUBIR_NIVEL", detalle=f"bench {pk}")
+
+
+def _carga(nombre, n_lectores, n_escritores, segundos, ids, usuario_id):
+    from django.db import OperationalError, close_old_connections, connection
+    resultados = {"lectura": [], "escritura": []}
+    errores = {"lectura": 0, "escritura": 0}
+    lock = threading.Lock()
+    barrera = threading.Barrier(n_lectores + n_escritores)
+    fin = [0.0]
+
+    def hilo(tipo, trabajo):
+        tiempos, fallos = [], 0
+        barrera.wait()
+        try:
+            while time.perf_counter() < fin[0]:
+                t0 = time.perf_counter()
+                try:
+                    trabajo()
+                    tiempos.append(time.perf_counter() - t0)
+                except OperationalError:
+                    fallos += 1
+                finally:
+                    close_old_connections()
+        finally:
+            connection.close()
+        with lock:
+            resultados[tipo].extend(tiempos)
+            errores[tipo] += fallos
+
+    hilos = [threading.Thread(target=hilo, args=("lectura", lambda: _lector(ids, 50))) for _ in range(n_lectores)]
+    hilos += [threading.Thread(target=hilo, args=("escritura", lambda: _escritor(ids, usuario_id)))
+              for _ in range(n_escritores)]
+    fin[0] = time.perf_counter() + segundos
+    for h in hilos:
+        h.start()
+    for h in hilos:
+        h.join()
+
+    partes = []
+    for tipo, tiempos in resultados.items():
+        tiempos.sort()
+        p95 = tiempos[int(len(tiempos) * 0.95) - 1] * 1000 if tiempos else float("nan")
+        partes.append(f"{tipo}: {len(tiempos) / segundos:7.0f} ops/s p95={p95:7.2f}ms errores={errores[tipo]}")
+    print(f"{nombre:<11} " + "  |  ".join(partes))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lectores", type=int, default=8)
+    parser.add_argument("--escritores", type=int, default=2)
+    parser.add_argument("--segundos", type=float, default=5.0)
+    parser.add_argument("--personajes", type=int, default=5000)
+    args = parser.parse_args(argv)
+
+    with bd_temporal("mixto"):
+        from django.conf import settings
+        from core.models import Personaje
+        # BD temporal: WAL aunque SQLITE_WAL no esté activado
+        pragmas_produccion = {"journal_mode": "WAL", "synchronous": "NORMAL", **settings.SQLITE_PRAGMAS}
+        pragmas_originales = dict(settings.SQLITE_PRAGMAS)
+        gm, _ = poblar(args.personajes)
+        ids = list(Personaje.objects.order_by("id").values_list("id", flat=True))
+        print(f"{args.lectores} lectores + {args.escritores} escritores, {args.segundos:g}s por perfil, "
+              f"{len(ids)} personajes")
+        for nombre in PERFILES:
+            _perfil(nombre, pragmas_produccion)
+            _carga(nombre, args.lectores, args.escritores, args.segundos, ids, gm.id)
+        settings.SQLITE_PRAGMAS = pragmas_originales
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,4 +1,5 @@
 from django.contrib import admin
+from . import busqueda
 from .models import Usuario, Raza, Habilidad, Poder, Equipamiento, Personaje
 from .models import AuditLog
 
@@ -31,8 +32,18 @@ class PersonajeAdmin(admin.ModelAdmin):
     search_fields = ("nombre", "propietario__username")
     filter_horizontal = ("habilidades",)
 
+    def get_search_results(self, request, queryset, search_term):
+        # Con FTS5, índice de texto completo en vez de LIKE '%...%' (ver core/busqueda.py)
+        if not search_term.strip() or not busqueda.fts_disponible(queryset.db):
+            return super().get_search_results(request, queryset, search_term)
+        return busqueda.buscar(queryset, search_term, ordenar=False), False
+
 @admin.register(AuditLog)
 class AuditLogAdmin(admin.ModelAdmin):
     list_display = ("fecha", "usuario", "accion", "detalle")
     list_filter = ("accion", "fecha")
-    search_fields = ("usuario__username", "detalle")
\ No newline at end of file
+    search_fields = ("usuario__username", "detalle")
+    # Tabla grande: orden por índice, usuario en el mismo JOIN y sin COUNT(*) total
+    ordering = ("-fecha",)
+    list_select_related = ("usuario",)
+    show_full_result_count = False
\ No newline at end of file
@@ -4,3 +4,17 @@ from django.apps import AppConfig
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core'
+
+    def ready(self):
+        from .catalogos import conectar_senales
+        conectar_senales()
+        from . import autenticacion
+        autenticacion.conectar_senales()
+        from . import sqlite
+        sqlite.conectar_senales()
+        from . import versiones
+        versiones.conectar_senales()
+        from . import eventos
+        eventos.conectar_senales()
+        from . import metricas
+        metricas.conectar_senales()
@@ -0,0 +1,345 @@
+"""
+Escritura de AuditLog fuera del camino de la petición.
+
+- `registrar()` solo encola (O(1), sin INSERT ni bloqueo de escritura de SQLite).
+- Un hilo de fondo vacía la cola con `bulk_create` cuando se juntan
+  AUDITORIA_LOTE entradas o pasan AUDITORIA_INTERVALO segundos.
+- Cola acotada (AUDITORIA_MAX_COLA). Si se llena, hay contrapresión: quien
+  registra espera hasta AUDITORIA_ESPERA segundos y, si sigue llena, escribe
+  su entrada de forma síncrona. Nunca se descarta una entrada.
+- Si la BD falla, el hilo no muere: conserva el lote y lo reintenta en el
+  siguiente intervalo. Mientras falle retiene como mucho AUDITORIA_MAX_COLA
+  entradas fuera de la cola; después deja de sacar y la cola llena pasa la
+  contrapresión a quien registra. Solo al apagar el proceso con la BD caída
+  se pierde lo pendiente, y queda en el log.
+- `registrar()` dentro de una transacción encola al hacer COMMIT: una acción
+  deshecha no deja auditoría.
+- `atexit` vacía lo pendiente al apagar el proceso.
+- AUDITORIA_ASINCRONA=False (tests) escribe en el momento, como antes.
+
+Retención: `archivar()` mueve las filas anteriores al corte a ficheros NDJSON
+comprimidos, uno por mes (AUDITORIA_ARCHIVO_DIR/AAAA-MM.ndjson.gz), y las
+borra de la tabla; el fichero solo crece si el borrado hace COMMIT.
+`consultar()` lee por igual archivo y tabla viva.
+"""
+import atexit
+import functools
+import gzip
+import json
+import logging
+import os
+import queue
+import shutil
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+from pathlib import Path
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+
+from .models import AuditLog
+
+log = logging.getLogger(__name__)
+
+
+class _Marca:
+    """Elemento de control en la cola: pide vaciar (y opcionalmente parar)."""
+    def __init__(self, parar=False):
+        self.parar = parar
+        self.hecho = threading.Event()
+
+
+class EscritorAuditoria:
+    def __init__(self, guardar=None, max_cola=10_000, lote=500, intervalo=1.0, espera=0.05):
+        self._guardar = guardar or (lambda entradas: AuditLog.objects.bulk_create(entradas))
+        self.lote = lote
+        self.intervalo = intervalo
+        self.espera = espera
+        self._cola = queue.Queue(maxsize=max_cola)
+        self._lock = threading.Lock()
+        self._hilo = None
+        self._pid = None
+        # Contadores (útiles para métricas y tests)
+        self.escritas = 0
+        self.sincronas = 0
+        self.fallos = 0
+
+    # ---------- Productores ----------
+    def registrar(self, entrada):
+        self._arrancar()
+        try:
+            self._cola.put(entrada, timeout=self.espera)
+        except queue.Full:
+            # Contrapresión: la cola va por detrás; esta entrada se escribe aquí
+            self.sincronas += 1
+            self._guardar_con_reintento([entrada])
+
+    def registrar_varios(self, entradas):
+        for entrada in entradas:
+            self.registrar(entrada)
+
+    # ---------- Consumidor ----------
+    def _vivo(self):
+        # Tras un fork (gunicorn --preload) el hilo del padre no existe en el hijo
+        return self._hilo is not None and self._pid == os.getpid() and self._hilo.is_alive()
+
+    def _arrancar(self):
+        if self._vivo():
+            return
+        with self._lock:
+            if self._vivo():
+                return
+            self._pid = os.getpid()
+            self._hilo = threading.Thread(target=self._bucle, name="auditoria", daemon=True)
+            self._hilo.start()
+
+    def _bucle(self):
+        pendientes = []
+        fallando = False
+        limite = time.monotonic() + self.intervalo
+        while True:
+            espera = max(0.0, limite - time.monotonic())
+            if fallando and len(pendientes) >= self._cola.maxsize:
+                # Memoria acotada: no se saca nada más de la cola hasta que escriba
+                time.sleep(espera)
+                item = None
+            else:
+                try:
+                    item = self._cola.get(timeout=espera)
+                except queue.Empty:
+                    item = None
+
+            if isinstance(item, _Marca):
+                if self._escribir(pendientes):
+                    pendientes = []
+                elif item.parar:
+                    log.error("Auditoría: se pierden %d entradas al parar sin BD", len(pendientes))
+                # Siempre: quien espera en vaciar()/cerrar() no se queda colgado
+                item.hecho.set()
+                if item.parar:
+                    break
+            elif item is not None:
+                pendientes.append(item)
+
+            if len(pendientes) >= self.lote or time.monotonic() >= limite:
+                fallando = not self._escribir(pendientes)
+                if not fallando:
+                    pendientes = []
+                limite = time.monotonic() + self.intervalo
+        close_old_connections()
+
+    def _guardar_con_reintento(self, entradas):
+        try:
+            self._guardar(entradas)
+        except Exception:
+            # La BD pudo cerrar la conexión: un reintento con conexión nueva
+            close_old_connections()
+            self._guardar(entradas)
+        self.escritas += len(entradas)
+
+    def _escribir(self, entradas):
+        """Desde el hilo: nunca lanza. False si el lote sigue sin escribir."""
+        if not entradas:
+            return True
+        try:
+            self._guardar_con_reintento(entradas)
+        except Exception:
+            self.fallos += 1
+            log.exception("Auditoría: no se pudo escribir un lote de %d entradas; se reintentará", len(entradas))
+            return False
+        return True
+
+    # ---------- Control ----------
+    def _marcar(self, parar, timeout):
+        if not self._vivo():
+            return
+        marca = _Marca(parar=parar)
+        self._cola.put(marca, timeout=timeout)
+        marca.hecho.wait(timeout)
+
+    def vaciar(self, timeout=5.0):
+        """Bloquea hasta que todo lo encolado antes de la llamada esté escrito."""
+        self._marcar(parar=False, timeout=timeout)
+
+    def cerrar(self, timeout=5.0):
+        """Escribe lo pendiente y para el hilo (se vuelve a arrancar si hace falta)."""
+        self._marcar(parar=True, timeout=timeout)
+        if self._hilo is not None:
+            self._hilo.join(timeout)
+        self._hilo = None
+
+
+# ---------- Instancia del proceso ----------
+_escritor = EscritorAuditoria(
+    max_cola=getattr(settings, "AUDITORIA_MAX_COLA", 10_000),
+    lote=getattr(settings, "AUDITORIA_LOTE", 500),
+    intervalo=getattr(settings, "AUDITORIA_INTERVALO", 1.0),
+    espera=getattr(settings, "AUDITORIA_ESPERA", 0.05),
+)
+atexit.register(_escritor.cerrar)
+
+
+def _entrada(usuario, accion, detalle):
+    # Solo hace falta el id: vale para Usuario o para un usuario "ligero"
+    return AuditLog(usuario_id=getattr(usuario, "id", None), accion=accion, detalle=detalle)
+
+
+def registrar(usuario, accion, detalle=""):
+    """Registra una acción de auditoría (encolada salvo AUDITORIA_ASINCRONA=False)."""
+    registrar_varios([(usuario, accion, detalle)])
+
+
+def registrar_varios(acciones):
+    """
+    acciones: iterable de (usuario, accion, detalle). Dentro de una
+    transacción se encolan al confirmarla (fuera, en el momento).
+    """
+    entradas = [_entrada(*a) for a in acciones]
+    if not getattr(settings, "AUDITORIA_ASINCRONA", True):
+        # Mismo INSERT que la acción: si se deshace, se deshace con ella
+        AuditLog.objects.bulk_create(entradas)
+        return
+    transaction.on_commit(lambda: _escritor.registrar_varios(entradas))
+
+
+def vaciar(timeout=5.0):
+    _escritor.vaciar(timeout)
+
+
+# ---------- Retención y archivo ----------
+CAMPOS_ARCHIVO = ("id", "usuario_id", "usuario__username", "accion", "detalle", "fecha")
+
+
+def directorio_archivo():
+    return Path(getattr(settings, "AUDITORIA_ARCHIVO_DIR", Path(settings.BASE_DIR) / "auditoria_archivo"))
+
+
+def _a_dict(fila):
+    return {
+        "id": fila["id"],
+        "usuario_id": fila["usuario_id"],
+        # Se guarda el nombre: el usuario puede no existir cuando se consulte
+        "usuario": fila["usuario__username"],
+        "accion": fila["accion"],
+        "detalle": fila["detalle"],
+        "fecha": fila["fecha"].isoformat(),
+    }
+
+
+def _anadir_al_archivo(pendiente, destino):
+    """Tras el COMMIT: pega el miembro gzip de `pendiente` al final de `destino`."""
+    with open(pendiente, "rb") as origen, open(destino, "ab") as f:
+        shutil.copyfileobj(origen, f)
+    os.remove(pendiente)
+
+
+def archivar(antes_de, directorio=None, lote=5000):
+    """
+    Mueve a archivo las entradas con fecha < `antes_de`, por lotes de `lote`
+    filas. Cada lote se escribe en un temporal por mes y se borra de la tabla
+    en una transacción; al hacer COMMIT el temporal se añade (gzip admite
+    concatenar miembros) al fichero de su mes. Si la transacción se deshace,
+    las filas siguen en la tabla y el archivo no cambia: otra pasada no las
+    duplica (si la deshecha es una transacción exterior, quedan temporales
+    .tmp que nadie lee). Devuelve el número de filas archivadas.
+    """
+    directorio = Path(directorio or directorio_archivo())
+    directorio.mkdir(parents=True, exist_ok=True)
+    total = 0
+    while True:
+        with transaction.atomic():
+            filas = list(
+                AuditLog.objects.filter(fecha__lt=antes_de)
+                .order_by("fecha", "id")
+                .values(*CAMPOS_ARCHIVO)[:lote]
+            )
+            if not filas:
+                break
+            por_mes = {}
+            for fila in filas:
+                por_mes.setdefault(fila["fecha"].strftime("%Y-%m"), []).append(_a_dict(fila))
+            pendientes = []
+            try:
+                for mes, datos in por_mes.items():
+                    fd, pendiente = tempfile.mkstemp(prefix=f".{mes}-", suffix=".tmp", dir=directorio)
+                    pendientes.append(pendiente)
+                    with os.fdopen(fd, "wb") as crudo, gzip.open(crudo, "wt", encoding="utf-8") as f:
+                        f.writelines(json.dumps(d, ensure_ascii=False) + "\n" for d in datos)
+                    transaction.on_commit(functools.partial(
+                        _anadir_al_archivo, pendiente, directorio / f"{mes}.ndjson.gz"))
+                AuditLog.objects.filter(id__in=[f["id"] for f in filas]).delete()
+            except BaseException:
+                # Se deshace el lote: sus temporales no deben llegar al archivo
+                for pendiente in pendientes:
+                    os.remove(pendiente)
+                raise
+        total += len(filas)
+    return total
+
+
+def aplicar_retencion(dias=None, directorio=None):
+    """Archiva todo lo que supere AUDITORIA_RETENCION_DIAS (o `dias`)."""
+    dias = dias if dias is not None else getattr(settings, "AUDITORIA_RETENCION_DIAS", 90)
+    return archivar(timezone.now() - timedelta(days=dias), directorio=directorio)
+
+
+def _consciente(fecha):
+    """Fecha con zona (las ingenuas, en la zona del proyecto) pasada a UTC."""
+    if fecha is None:
+        return None
+    if timezone.is_naive(fecha):
+        fecha = timezone.make_aware(fecha)
+    return fecha.astimezone(dt_timezone.utc)
+
+
+def _meses_archivados(directorio, desde, hasta):
+    for ruta in sorted(directorio.glob("*.ndjson.gz")):
+        mes = ruta.name.split(".")[0]
+        if desde is not None and mes < desde.strftime("%Y-%m"):
+            continue
+        if hasta is not None and mes > hasta.strftime("%Y-%m"):
+            continue
+        yield ruta
+
+
+def consultar(desde=None, hasta=None, accion=None, usuario_id=None, directorio=None):
+    """
+    Entradas (dicts) en [desde, hasta), de más antigua a más reciente,
+    leyendo primero los ficheros de archivo del rango y después la tabla.
+    Es un generador: memoria constante aunque el rango tenga millones de filas.
+    """
+    directorio = Path(directorio or directorio_archivo())
+    # Los ficheros guardan fechas con zona (UTC): se compara todo con zona
+    desde, hasta = _consciente(desde), _consciente(hasta)
+
+    def coincide(d):
+        fecha = _consciente(datetime.fromisoformat(d["fecha"]))
+        return (
+            (desde is None or fecha >= desde)
+            and (hasta is None or fecha < hasta)
+            and (accion is None or d["accion"] == accion)
+            and (usuario_id is None or d["usuario_id"] == usuario_id)
+        )
+
+    if directorio.exists():
+        for ruta in _meses_archivados(directorio, desde, hasta):
+            with gzip.open(ruta, "rt", encoding="utf-8") as f:
+                for linea in f:
+                    d = json.loads(linea)
+                    if coincide(d):
+                        yield d
+
+    qs = AuditLog.objects.order_by("fecha", "id")
+    if desde is not None:
+        qs = qs.filter(fecha__gte=desde)
+    if hasta is not None:
+        qs = qs.filter(fecha__lt=hasta)
+    if accion is not None:
+        qs = qs.filter(accion=accion)
+    if usuario_id is not None:
+        qs = qs.filter(usuario_id=usuario_id)
+    for fila in qs.values(*CAMPOS_ARCHIVO).iterator(chunk_size=2000):
+        yield _a_dict(fila)
@@ -0,0 +1,216 @@
+"""
+Autenticación JWT sin consultar la BD en cada petición.
+
+- Los tokens emitidos por login (/auth/login/) y registro llevan `username`,
+  `rol` e `is_staff` como claims (ver `tokens_para` / `TokenConRolSerializer`).
+- `JWTSinBD` construye un `UsuarioToken` a partir de esos claims: los permisos
+  (EsGM, EsPropietarioOGM, EsGMOStaff), `get_queryset` y `yo` solo necesitan
+  id, username y rol.
+- Revocación: caché corta (JWT_REVOCACION_TTL segundos) con el rol e
+  is_staff vigentes de cada usuario ("" si está inactivo o borrado). Se refresca
+  al guardar/borrar un Usuario, así que desactivar, cambiar el rol o quitar
+  is_staff desde el admin corta el token al momento; con TTL=0 no se comprueba
+  nada (solo caduca el token).
+- /auth/refresh/ (`RefrescoConRolSerializer`) vuelve a leer el usuario: un
+  inactivo o borrado no renueva y el nuevo access lleva los claims actuales,
+  no los que se copiaron en el refresh al hacer login.
+- Tokens antiguos (sin claims) siguen funcionando: se carga el usuario de la BD.
+- Conexiones largas (SSE): `aautenticar_token` (o `aautenticar_claims` con un
+  ticket) al abrir y `atoken_vigente` mientras sigan abiertas; la revocación
+  se mira con la caché y el ORM asíncronos (`JWTSinBD.aget_user`).
+"""
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save
+from django.utils.functional import cached_property
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+CLAIMS = ("username", "rol")
+
+
+def _clave(usuario_id):
+    return f"auth:cred:{usuario_id}"
+
+
+def _huella(rol, is_staff):
+    """Lo que se compara para revocar: rol e is_staff en una cadena cacheable."""
+    return f"{rol}|{int(bool(is_staff))}"
+
+
+def _ttl():
+    return int(getattr(settings, "JWT_REVOCACION_TTL", 60))
+
+
+# ---------- Emisión ----------
+def anadir_claims(token, usuario):
+    """Copia en el token lo que necesitan los permisos (el access hereda del refresh)."""
+    token["username"] = usuario.username
+    token["rol"] = getattr(usuario, "rol", None)
+    token["is_staff"] = bool(usuario.is_staff)
+    return token
+
+
+def tokens_para(usuario):
+    """Par refresh/access con claims de rol, para el autologin del registro."""
+    refresh = anadir_claims(RefreshToken.for_user(usuario), usuario)
+    return {"refresh": str(refresh), "access": str(refresh.access_token)}
+
+
+class TokenConRolSerializer(TokenObtainPairSerializer):
+    """Serializer de /auth/login/ (SIMPLE_JWT['TOKEN_OBTAIN_SERIALIZER'])."""
+
+    @classmethod
+    def get_token(cls, user):
+        return anadir_claims(super().get_token(user), user)
+
+
+class RefrescoConRolSerializer(TokenRefreshSerializer):
+    """
+    Serializer de /auth/refresh/ (SIMPLE_JWT['TOKEN_REFRESH_SERIALIZER']):
+    una consulta por renovación para no arrastrar claims caducados.
+    """
+
+    def validate(self, attrs):
+        from .models import Usuario
+        refresh = self.token_class(attrs["refresh"])
+        usuario = Usuario.objects.filter(
+            pk=refresh.get(api_settings.USER_ID_CLAIM), is_active=True).first()
+        if usuario is None:
+            raise AuthenticationFailed("Usuario inactivo o inexistente.", code="user_inactive")
+        return super().validate({"refresh": str(anadir_claims(refresh, usuario))})
+
+
+# ---------- Usuario ligero ----------
+class UsuarioToken(TokenUser):
+    """Usuario respaldado por el token: id, username, rol e is_staff; sin BD."""
+
+    @cached_property
+    def rol(self):
+        return self.token.get("rol")
+
+    def __str__(self):
+        return f"{self.username} ({self.rol})"
+
+
+# ---------- Revocación ----------
+def credenciales_vigentes(usuario_id):
+    """_huella() actual del usuario ("" si inactivo/borrado), con caché de TTL corto."""
+    clave = _clave(usuario_id)
+    huella = cache.get(clave)
+    if huella is None:
+        from .models import Usuario
+        fila = (
+            Usuario.objects.filter(pk=usuario_id, is_active=True)
+            .values_list("rol", "is_staff").first()
+        )
+        huella = _huella(*fila) if fila else ""
+        cache.set(clave, huella, _ttl())
+    return huella
+
+
+async def acredenciales_vigentes(usuario_id):
+    """credenciales_vigentes() con la caché y el ORM asíncronos."""
+    clave = _clave(usuario_id)
+    huella = await cache.aget(clave)
+    if huella is None:
+        from .models import Usuario
+        fila = await (
+            Usuario.objects.filter(pk=usuario_id, is_active=True)
+            .values_list("rol", "is_staff").afirst()
+        )
+        huella = _huella(*fila) if fila else ""
+        await cache.aset(clave, huella, _ttl())
+    return huella
+
+
+def _huella_token(validated_token):
+    return _huella(validated_token.get("rol"), validated_token.get("is_staff"))
+
+
+def _al_guardar(sender, instance, **kwargs):
+    if _ttl():
+        huella = _huella(instance.rol, instance.is_staff) if instance.is_active else ""
+        cache.set(_clave(instance.pk), huella, _ttl())
+
+
+def _al_borrar(sender, instance, **kwargs):
+    if _ttl():
+        cache.set(_clave(instance.pk), "", _ttl())
+
+
+def conectar_senales():
+    from .models import Usuario
+    post_save.connect(_al_guardar, sender=Usuario, dispatch_uid="autenticacion_guardar")
+    post_delete.connect(_al_borrar, sender=Usuario, dispatch_uid="autenticacion_borrar")
+
+
+# ---------- Backend DRF ----------
+class JWTSinBD(JWTAuthentication):
+    """
+    Igual que JWTAuthentication, pero si el token trae los claims de rol
+    devuelve un UsuarioToken en lugar de cargar el Usuario.
+    """
+
+    def get_user(self, validated_token):
+        if not all(c in validated_token for c in (api_settings.USER_ID_CLAIM, *CLAIMS)):
+            return super().get_user(validated_token)
+
+        usuario = UsuarioToken(validated_token)
+        if _ttl() and credenciales_vigentes(validated_token[api_settings.USER_ID_CLAIM]) != _huella_token(validated_token):
+            raise AuthenticationFailed("Usuario inactivo o con rol o permisos cambiados.", code="user_inactive")
+        return usuario
+
+    async def aget_user(self, validated_token):
+        if not all(c in validated_token for c in (api_settings.USER_ID_CLAIM, *CLAIMS)):
+            # Token antiguo: carga el Usuario como JWTAuthentication
+            return await sync_to_async(super().get_user)(validated_token)
+
+        usuario = UsuarioToken(validated_token)
+        if _ttl() and (await acredenciales_vigentes(validated_token[api_settings.USER_ID_CLAIM])
+                       != _huella_token(validated_token)):
+            raise AuthenticationFailed("Usuario inactivo o con rol o permisos cambiados.", code="user_inactive")
+        return usuario
+
+
+# ---------- Fuera de DRF (SSE) ----------
+async def aautenticar_token(crudo):
+    """(usuario, token validado) de un access token; None si no vale."""
+    autenticacion = JWTSinBD()
+    try:
+        validado = autenticacion.get_validated_token(crudo)
+        return await autenticacion.aget_user(validado), validado
+    except (InvalidToken, AuthenticationFailed):
+        return None
+
+
+async def aautenticar_claims(claims):
+    """(usuario, claims) de un token validado antes (tickets de SSE); None si ya no vale."""
+    if claims["exp"] <= time.time():
+        return None
+    try:
+        return await JWTSinBD().aget_user(claims), claims
+    except (InvalidToken, AuthenticationFailed):
+        return None
+
+
+async def atoken_vigente(validated_token):
+    """
+    ¿Sigue valiendo un token ya aceptado? Para conexiones largas (SSE), que
+    solo se autentican al abrirse: sin caducar y sin revocar.
+    """
+    if validated_token["exp"] <= time.time():
+        return False
+    if not _ttl():
+        return True
+    huella = await acredenciales_vigentes(validated_token[api_settings.USER_ID_CLAIM])
+    if not all(c in validated_token for c in CLAIMS):
+        return huella != ""  # token antiguo: basta con que siga activo
+    return huella == _huella_token(validated_token)
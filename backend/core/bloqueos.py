@@ -0,0 +1,160 @@
+"""
+Bloqueo de logins (django-axes) con contadores en caché.
+
+- `ManejadorAxesCache` (AXES_HANDLER) cuenta los fallos en la caché compartida
+  (AxesCacheHandler): login y login fallido no leen ni escriben filas en la BD.
+  Los contadores van en su propio alias (AXES_CACHE = "axes"), que nunca
+  purga: un ataque contra miles de cuentas no puede borrar los bloqueos.
+  Se respetan AXES_FAILURE_LIMIT, AXES_COOLOFF_TIME (= caducidad de la clave)
+  y AXES_ONLY_USER_FAILURES (= parámetros de bloqueo de axes).
+- Para que el admin siga mostrando quién está atacando, cada cliente deja una
+  fila resumen en AccessAttempt (fallos acumulados). Los resúmenes se agrupan
+  por cliente en memoria y un hilo los escribe cada AXES_RESUMEN_INTERVALO
+  segundos: una ráfaga de 10.000 fallos contra una cuenta es UNA escritura.
+  Con AXES_RESUMEN_INTERVALO=0 (tests) se escriben en el momento.
+- Los resúmenes son informativos: si se acumulan más de AXES_RESUMEN_MAX
+  clientes pendientes, los nuevos se descartan (el bloqueo no depende de ellos).
+- DRF entrega a `authenticate()` su propio Request: el bloqueo se copia a la
+  HttpRequest para que AxesMiddleware responda con AXES_HTTP_RESPONSE_CODE.
+"""
+import atexit
+import logging
+import os
+import threading
+import time
+
+from axes.handlers.cache import AxesCacheHandler
+from axes.helpers import get_client_username
+from axes.models import AccessAttempt
+from django.conf import settings
+from django.db import close_old_connections, transaction
+
+log = logging.getLogger(__name__)
+
+
+def _propagar_a_httprequest(request):
+    """Copia los atributos axes_* del Request de DRF a la HttpRequest subyacente."""
+    original = getattr(request, "_request", None)
+    if original is None:
+        return
+    for nombre, valor in vars(request).items():
+        if nombre.startswith("axes_"):
+            setattr(original, nombre, valor)
+
+
+# ---------- Resúmenes diferidos ----------
+def _guardar(resumenes):
+    with transaction.atomic():
+        for r in resumenes:
+            AccessAttempt.objects.update_or_create(
+                username=r["username"], ip_address=r["ip_address"], user_agent=r["user_agent"],
+                defaults={
+                    "failures_since_start": r["fallos"],
+                    "path_info": r["path_info"],
+                    "http_accept": r["http_accept"],
+                    "get_data": "",
+                    "post_data": "",
+                },
+            )
+
+
+class Resumenes:
+    """Último resumen pendiente por cliente; un hilo de fondo los vuelca a la BD."""
+
+    def __init__(self):
+        self._pendientes = {}
+        self._lock = threading.Lock()
+        self._hilo = None
+        self._pid = None
+        self.descartados = 0
+
+    def anotar(self, resumen):
+        if not getattr(settings, "AXES_RESUMEN_INTERVALO", 5.0):
+            _guardar([resumen])
+            return
+        self._arrancar()
+        clave = (resumen["username"], resumen["ip_address"], resumen["user_agent"])
+        with self._lock:
+            if clave not in self._pendientes and len(self._pendientes) >= getattr(settings, "AXES_RESUMEN_MAX", 10_000):
+                self.descartados += 1
+                return
+            self._pendientes[clave] = resumen
+
+    def descartar(self, username=None, ip_address=None):
+        """Olvida lo pendiente de un cliente (p. ej. tras `axes_reset_username`)."""
+        with self._lock:
+            for clave in list(self._pendientes):
+                if (username is None or clave[0] == username) and (ip_address is None or clave[1] == ip_address):
+                    del self._pendientes[clave]
+
+    def vaciar(self):
+        with self._lock:
+            lote, self._pendientes = list(self._pendientes.values()), {}
+        if lote:
+            _guardar(lote)
+        return len(lote)
+
+    def _arrancar(self):
+        if self._hilo is not None and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._hilo is not None and self._pid == os.getpid():
+                return
+            # Tras un fork el hilo del padre no existe en el hijo
+            self._pendientes = {}
+            self._pid = os.getpid()
+            self._hilo = threading.Thread(target=self._bucle, name="axes-resumenes", daemon=True)
+            self._hilo.start()
+
+    def _bucle(self):
+        while True:
+            time.sleep(getattr(settings, "AXES_RESUMEN_INTERVALO", 5.0) or 1.0)
+            try:
+                self.vaciar()
+            except Exception:
+                log.exception("No se pudieron guardar los resúmenes de axes")
+            finally:
+                close_old_connections()
+
+
+resumenes = Resumenes()
+atexit.register(lambda: resumenes._pid == os.getpid() and resumenes.vaciar())
+
+
+def vaciar():
+    """Escribe ya los resúmenes pendientes (tests, benchmarks, apagado)."""
+    return resumenes.vaciar()
+
+
+# ---------- Handler de axes ----------
+class ManejadorAxesCache(AxesCacheHandler):
+    def user_login_failed(self, sender, credentials, request=None, **kwargs):
+        super().user_login_failed(sender, credentials, request=request, **kwargs)
+        if request is None:
+            return
+        _propagar_a_httprequest(request)
+        fallos = getattr(request, "axes_failures_since_start", None)
+        # None = no se contó (lista blanca o intento durante el bloqueo)
+        if fallos:
+            resumenes.anotar({
+                "username": get_client_username(request, credentials),
+                "ip_address": request.axes_ip_address,
+                "user_agent": request.axes_user_agent[:255],
+                "path_info": request.axes_path_info[:255],
+                "http_accept": request.axes_http_accept[:1025],
+                "fallos": fallos,
+            })
+
+    def reset_attempts(self, *, ip_address=None, username=None, ip_or_username=False):
+        contados = super().reset_attempts(ip_address=ip_address, username=username, ip_or_username=ip_or_username)
+        resumenes.descartar(username=username, ip_address=ip_address)
+        filtros = {k: v for k, v in (("username", username), ("ip_address", ip_address)) if v is not None}
+        AccessAttempt.objects.filter(**filtros).delete()
+        return contados
+
+    # axes avisa de cada save/delete de AccessAttempt; aquí son solo resúmenes
+    def post_save_access_attempt(self, instance, **kwargs):
+        pass
+
+    def post_delete_access_attempt(self, instance, **kwargs):
+        pass
@@ -0,0 +1,97 @@
+"""
+Búsqueda de personajes por nombre y por username del propietario.
+
+En SQLite con FTS5 (migración 0010) se consulta la tabla virtual
+core_personaje_fts: cada término es una búsqueda por prefijo ("gan" encuentra
+"Gandalf") y el orden es por relevancia (bm25, el nombre pesa más que el
+dueño). El coste depende de las coincidencias, no del tamaño de la tabla,
+a diferencia de `LIKE '%...%'`, que la recorre entera.
+
+En otros motores (o sin FTS5) se degrada a prefijo de palabra por término
+(istartswith del campo o icontains tras un SEPARADOR): mismas coincidencias
+salvo los diacríticos ("angel" no encuentra "Ángel", FTS5 sí) y el orden, que
+pasa a ser por nombre. Recorre la tabla entera.
+
+La tabla y sus triggers los crea la migración 0010_personaje_fts, con el SQL
+congelado en ella. SQLite rehace la tabla entera en muchos AddField/
+AlterField, y los triggers no sobreviven a eso: esas migraciones deben
+envolver sus operaciones con `quitar_triggers` / `poner_triggers` de 0010 (ver
+0011_personaje_version) y de 0012_cambio (diario de core.sincronizacion).
+"""
+import re
+
+from django.db import connections
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+TABLA = "core_personaje_fts"
+MAX_TERMINOS = 8
+# Lo que separa palabras en los nombres y usernames del fallback sin FTS5
+SEPARADORES = " -_'."
+
+
+# ---------- Consultas ----------
+def _tabla_creada(connection):
+    return connection.vendor == "sqlite" and TABLA in connection.introspection.table_names()
+
+
+# alias de BD -> ¿existe la tabla FTS? (se mira una vez por proceso)
+_disponible = {}
+
+
+def fts_disponible(using):
+    if using not in _disponible:
+        _disponible[using] = _tabla_creada(connections[using])
+    return _disponible[using]
+
+
+def terminos(texto):
+    """Palabras del texto (letras/dígitos); el resto de símbolos separa términos."""
+    return re.findall(r"\w+", texto or "")[:MAX_TERMINOS]
+
+
+def _prefijo_de_palabra(campo, termino):
+    """Q de `campo` con alguna palabra que empieza por `termino`."""
+    condicion = Q(**{f"{campo}__istartswith": termino})
+    for separador in SEPARADORES:
+        condicion |= Q(**{f"{campo}__icontains": separador + termino})
+    return condicion
+
+
+def consulta_fts(terms):
+    # Cada término entre comillas (sin operadores de FTS5 del usuario) y con *
+    return " ".join(f'"{t}"*' for t in terms)
+
+
+def buscar(queryset, texto, ordenar=True):
+    """
+    Filtra `queryset` (ya limitado por permisos/filtros) a los que coinciden
+    con todos los términos de `texto`. Con `ordenar`, por relevancia.
+    """
+    terms = terminos(texto)
+    if not terms:
+        return queryset.none()
+
+    if not fts_disponible(queryset.db):
+        condicion = Q()
+        for t in terms:
+            condicion &= _prefijo_de_palabra("nombre", t) | _prefijo_de_palabra("propietario__username", t)
+        queryset = queryset.filter(condicion)
+        return queryset.order_by("nombre", "id") if ordenar else queryset
+
+    consulta = consulta_fts(terms)
+    if not ordenar:
+        return queryset.filter(
+            id__in=RawSQL(f"SELECT rowid FROM {TABLA} WHERE {TABLA} MATCH %s", (consulta,))
+        )
+    # JOIN con la tabla FTS: un solo MATCH recorre las coincidencias y trae el
+    # rank de cada una (bm25 configurado en la migración: menor = más
+    # relevante). Una subconsulta correlacionada repetiría el MATCH por fila,
+    # coste cuadrático con prefijos frecuentes. El ORM no une tablas sin
+    # modelo: de ahí extra().
+    return queryset.extra(
+        tables=[TABLA],
+        where=[f'{TABLA}.rowid = "core_personaje"."id"', f"{TABLA} MATCH %s"],
+        params=[consulta],
+        select={"relevancia": f"{TABLA}.rank"},
+    ).order_by("relevancia", "id")
@@ -0,0 +1,163 @@
+"""
+Caché de lectura de catálogos (Raza, Habilidad, Poder, Equipamiento).
+
+- Cada catálogo tiene un número de versión en la caché compartida.
+  Las claves de datos incluyen la versión, así que invalidar = subir la versión
+  (lo viejo simplemente deja de leerse y caduca solo).
+- Cualquier escritura (viewsets, admin, seed_testdata...) pasa por
+  post_save/post_delete y sube la versión. Las escrituras masivas que no emiten
+  señales (bulk_create, update) deben llamar a `invalidar()` a mano.
+- Las respuestas llevan ETag fuerte derivado de la versión: un
+  If-None-Match coincidente devuelve 304 sin tocar BD ni serializer.
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models.signals import post_delete, post_save
+from django.http import Http404
+from django.utils.cache import get_conditional_response
+from rest_framework.response import Response
+
+from . import proyecciones
+from .models import Equipamiento, Habilidad, Poder, Raza
+
+MODELOS_CATALOGO = (Raza, Habilidad, Poder, Equipamiento)
+
+TIMEOUT = getattr(settings, "CATALOGO_CACHE_TIMEOUT", 60 * 60)
+
+
+def _clave_version(modelo):
+    return f"catalogo:{modelo._meta.model_name}:v"
+
+
+def version(modelo):
+    """Versión actual del catálogo (se inicializa si la caché no la tiene)."""
+    clave = _clave_version(modelo)
+    v = cache.get(clave)
+    if v is None:
+        # Arranque en milisegundos: si la clave se pierde, nunca se reutiliza
+        # una versión antigua que pudiera seguir en caché.
+        cache.add(clave, int(time.time() * 1000), timeout=None)
+        v = cache.get(clave)
+    return v
+
+
+async def aversion(modelo):
+    """version() con la caché asíncrona (core.vistas_asincronas)."""
+    clave = _clave_version(modelo)
+    v = await cache.aget(clave)
+    if v is None:
+        await cache.aadd(clave, int(time.time() * 1000), timeout=None)
+        v = await cache.aget(clave)
+    return v
+
+
+def invalidar(modelo):
+    """Sube la versión del catálogo; las lecturas siguientes recalculan."""
+    try:
+        cache.incr(_clave_version(modelo))
+    except ValueError:
+        version(modelo)
+
+
+def _etag(modelo, v, pk=None):
+    base = f"{modelo._meta.model_name}-v{v}"
+    return f'"{base}-{pk}"' if pk is not None else f'"{base}"'
+
+
+def etag(modelo, pk=None):
+    return _etag(modelo, version(modelo), pk)
+
+
+async def aetag(modelo, pk=None):
+    return _etag(modelo, await aversion(modelo), pk)
+
+
+def _clave_lista(modelo, v):
+    return f"catalogo:{modelo._meta.model_name}:{v}:lista"
+
+
+def _consulta_lista(modelo):
+    # Desde la primaria: una réplica atrasada dejaría en caché datos viejos
+    # bajo la versión nueva hasta la siguiente invalidación
+    return modelo.objects.using(DEFAULT_DB_ALIAS).order_by("id")
+
+
+def listado(modelo, serializer_class):
+    """Datos serializados del catálogo completo (lectura a través de la caché)."""
+    clave = _clave_lista(modelo, version(modelo))
+    datos = cache.get(clave)
+    if datos is None:
+        qs = _consulta_lista(modelo)
+        proyeccion = proyecciones.para(serializer_class)
+        if proyeccion is not None:
+            datos = proyeccion.datos(qs)
+        else:
+            datos = [dict(x) for x in serializer_class(qs, many=True).data]
+        cache.set(clave, datos, TIMEOUT)
+    return datos
+
+
+async def alistado(modelo, serializer_class):
+    """listado() con caché y ORM asíncronos; solo catálogos con proyección."""
+    clave = _clave_lista(modelo, await aversion(modelo))
+    datos = await cache.aget(clave)
+    if datos is None:
+        datos = await proyecciones.para(serializer_class).adatos(_consulta_lista(modelo))
+        await cache.aset(clave, datos, TIMEOUT)
+    return datos
+
+
+# ---------- Mixin para los viewsets de catálogo ----------
+class CatalogoCacheMixin:
+    """
+    list/retrieve servidos desde la caché versionada, con ETag fuerte.
+    Los permisos ya se han comprobado (APIView.initial) antes de llegar aquí.
+    """
+
+    def _condicional(self, request, valor_etag):
+        # Devuelve 304 si If-None-Match coincide; None en otro caso
+        response = get_conditional_response(request, etag=valor_etag)
+        if response is not None:
+            response["ETag"] = valor_etag
+        return response
+
+    def list(self, request, *args, **kwargs):
+        modelo = self.queryset.model
+        valor_etag = etag(modelo)
+        no_modificado = self._condicional(request, valor_etag)
+        if no_modificado is not None:
+            return no_modificado
+        response = Response(listado(modelo, self.get_serializer_class()))
+        response["ETag"] = valor_etag
+        return response
+
+    def retrieve(self, request, *args, **kwargs):
+        modelo = self.queryset.model
+        pk = str(kwargs[self.lookup_url_kwarg or self.lookup_field])
+        valor_etag = etag(modelo, pk)
+        no_modificado = self._condicional(request, valor_etag)
+        if no_modificado is not None:
+            return no_modificado
+        item = next((x for x in listado(modelo, self.get_serializer_class()) if str(x["id"]) == pk), None)
+        if item is None:
+            raise Http404
+        response = Response(item)
+        response["ETag"] = valor_etag
+        return response
+
+
+# ---------- Invalidación por señales ----------
+def _al_escribir(sender, **kwargs):
+    invalidar(sender)
+    # Segunda subida al confirmar: una lectura concurrente que rellenó la caché
+    # antes del COMMIT (con datos viejos) queda descartada.
+    transaction.on_commit(lambda: invalidar(sender))
+
+
+def conectar_senales():
+    for modelo in MODELOS_CATALOGO:
+        post_save.connect(_al_escribir, sender=modelo, dispatch_uid=f"catalogo-save-{modelo._meta.model_name}")
+        post_delete.connect(_al_escribir, sender=modelo, dispatch_uid=f"catalogo-delete-{modelo._meta.model_name}")
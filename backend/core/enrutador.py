@@ -0,0 +1,130 @@
+"""
+Lecturas a réplicas, escrituras a la primaria ("default").
+
+- Solo se lee de una réplica dentro de una petición GET/HEAD/OPTIONS (lo
+  marca `EnrutamientoMiddleware` en una ContextVar). Fuera de peticiones
+  (comandos, shell, señales de arranque) y en POST/PATCH/DELETE todo va a la
+  primaria, así una vista que escribe lee lo que acaba de escribir.
+- Lee-lo-que-escribes: tras una escritura con éxito de un usuario, sus
+  lecturas van a la primaria durante BD_FIJAR_PRIMARIA_SEGUNDOS (el retraso
+  máximo esperado de las réplicas). La marca vive en la caché compartida, así
+  que vale entre workers.
+- Réplicas: settings.BD_REPLICAS (alias en DATABASES, desde DATABASE_REPLICA_URLS).
+  Sin réplicas el enrutador no opina y todo sigue en "default".
+"""
+import base64
+import json
+import random
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+
+METODOS_SEGUROS = ("GET", "HEAD", "OPTIONS")
+
+# True mientras se atiende una petición de solo lectura que puede usar réplica
+_leer_de_replica = ContextVar("leer_de_replica", default=False)
+
+
+def replicas():
+    return getattr(settings, "BD_REPLICAS", [])
+
+
+def _clave(usuario_id):
+    return f"bd:primaria:{usuario_id}"
+
+
+def fijar_primaria(usuario_id):
+    """Durante unos segundos, las lecturas de este usuario van a la primaria."""
+    cache.set(_clave(usuario_id), 1, getattr(settings, "BD_FIJAR_PRIMARIA_SEGUNDOS", 5))
+
+
+async def afijar_primaria(usuario_id):
+    await cache.aset(_clave(usuario_id), 1, getattr(settings, "BD_FIJAR_PRIMARIA_SEGUNDOS", 5))
+
+
+def usuario_del_token(request):
+    """
+    user_id del JWT SIN verificar la firma: solo decide a qué BD se lee
+    (equivocarse manda a la primaria, nunca da acceso). La autenticación
+    de verdad la hace DRF en la vista.
+    """
+    cabecera = request.META.get("HTTP_AUTHORIZATION", "")
+    if not cabecera.startswith("Bearer "):
+        return None
+    try:
+        carga = cabecera[7:].split(".")[1]
+        datos = json.loads(base64.urlsafe_b64decode(carga + "=" * (-len(carga) % 4)))
+        return datos.get("user_id")
+    except (IndexError, ValueError, AttributeError):
+        return None
+
+
+class EnrutadorLecturaEscritura:
+    def db_for_read(self, model, **hints):
+        lista = replicas()
+        if lista and _leer_de_replica.get():
+            return random.choice(lista)
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Primaria y réplicas tienen los mismos datos
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Las réplicas se copian de la primaria, no se migran
+        return db not in replicas()
+
+
+class EnrutamientoMiddleware:
+    """Síncrono o asíncrono (bajo ASGI no obliga a pasar la petición por un hilo)."""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.asincrono = iscoroutinefunction(get_response)
+        if self.asincrono:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.asincrono:
+            return self._acall(request)
+        if not replicas():
+            return self.get_response(request)
+
+        usuario_id = usuario_del_token(request)
+        segura = request.method in METODOS_SEGUROS
+        replica = segura and not (usuario_id is not None and cache.get(_clave(usuario_id)))
+        marca = _leer_de_replica.set(replica)
+        try:
+            response = self.get_response(request)
+        finally:
+            _leer_de_replica.reset(marca)
+
+        if not segura and usuario_id is not None and response.status_code < 400:
+            fijar_primaria(usuario_id)
+        return response
+
+    async def _acall(self, request):
+        if not replicas():
+            return await self.get_response(request)
+
+        usuario_id = usuario_del_token(request)
+        segura = request.method in METODOS_SEGUROS
+        replica = segura and not (usuario_id is not None and await cache.aget(_clave(usuario_id)))
+        # La ContextVar viaja con el contexto a los hilos de sync_to_async (ORM)
+        marca = _leer_de_replica.set(replica)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _leer_de_replica.reset(marca)
+
+        if not segura and usuario_id is not None and response.status_code < 400:
+            await afijar_primaria(usuario_id)
+        return response
@@ -0,0 +1,319 @@
+"""
+Cambios de personajes en tiempo real: pub/sub en proceso + SSE (/api/eventos/).
+
+- Publicar (código síncrono: señales, vistas): `publicar_cambio()` tras el
+  COMMIT. El evento lleva el id, la versión si se conoce y `propietarios`: los
+  dueños afectados, donde null = el pool (liberar: [null]; elegir: [null, id]).
+- Bus en proceso: cada conexión SSE es una Suscripcion con una asyncio.Queue
+  acotada en el loop del worker ASGI; el bus entrega con call_soon_threadsafe,
+  así que se puede publicar desde cualquier hilo. Una conexión inactiva cuesta
+  una corrutina dormida y una cola vacía: miles por worker.
+- Entre procesos: sustituto local de un pub/sub externo (Redis, LISTEN/NOTIFY)
+  con un fichero NDJSON compartido (EVENTOS_FICHERO; sin configurar, "-": solo
+  en proceso, lo normal con un único worker o bajo WSGI). Cada publicación se
+  añade al fichero; en cada proceso con suscriptores una tarea lo sigue y
+  reparte lo que escribieron los demás (su propio pid lo ignora: ya lo entregó
+  en local). Al pasar de EVENTOS_FICHERO_MAX se rota: los lectores terminan el
+  fichero viejo antes de abrir el nuevo (un lector que se quede dos
+  rotaciones atrás pierde la del medio; con el tamaño por defecto no ocurre).
+- Filtro por suscriptor: GM recibe todo; jugador, sus personajes y (con
+  ?pool=1, por defecto) los cambios del pool.
+- Si la cola de un cliente lento se llena, se descartan eventos y se le envía
+  `resync`: debe volver a pedir el listado (barato con ETag, core.versiones).
+- Credenciales: EventSource no envía cabeceras y un token en la URL acaba en
+  los logs del servidor y de los proxies. El cliente pide antes un ticket de un
+  solo uso (POST /api/eventos/ticket/, con el token en la cabecera) que caduca
+  en EVENTOS_TICKET_TTL segundos. La conexión se corta con `caducado` cuando
+  expira el token o se revoca (se comprueba en cada latido).
+
+Los eventos son avisos, no datos: el cliente recarga lo que le interesa.
+"""
+import asyncio
+import json
+import os
+import secrets
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+
+def _ajuste(nombre, defecto):
+    return getattr(settings, nombre, defecto)
+
+
+def ruta_fichero():
+    ruta = _ajuste("EVENTOS_FICHERO", "-")
+    if ruta in ("", "-"):
+        return None  # solo en proceso
+    return ruta
+
+
+# ---------- Bus en proceso ----------
+class Suscripcion:
+    def __init__(self, usuario_id, es_gm, pool, loop, maximo):
+        self.usuario_id = usuario_id
+        self.es_gm = es_gm
+        self.pool = pool
+        self.loop = loop
+        self.cola = asyncio.Queue(maxsize=maximo)
+        self.desbordada = False
+
+    def le_interesa(self, evento):
+        if self.es_gm:
+            return True
+        afectados = evento.get("propietarios", ())
+        return self.usuario_id in afectados or (self.pool and None in afectados)
+
+    def _entregar(self, evento):
+        # Siempre en self.loop (call_soon_threadsafe)
+        try:
+            self.cola.put_nowait(evento)
+        except asyncio.QueueFull:
+            self.desbordada = True
+
+
+class Bus:
+    def __init__(self):
+        self._suscripciones = set()
+        self._lock = threading.Lock()
+        self._seguidores = {}  # loop -> tarea que sigue el fichero
+
+    def __len__(self):
+        return len(self._suscripciones)
+
+    def suscribir(self, usuario_id, es_gm, pool=True):
+        """Desde una corrutina: la suscripción queda ligada al loop actual."""
+        loop = asyncio.get_running_loop()
+        sub = Suscripcion(usuario_id, es_gm, pool, loop, _ajuste("EVENTOS_COLA", 100))
+        with self._lock:
+            self._suscripciones.add(sub)
+            seguidor = self._seguidores.get(loop)
+            if ruta_fichero() and (seguidor is None or seguidor.done()):
+                self._seguidores[loop] = loop.create_task(self._seguir(ruta_fichero(), loop))
+        return sub
+
+    def cancelar(self, sub):
+        with self._lock:
+            self._suscripciones.discard(sub)
+
+    def entregar(self, evento):
+        """Reparte a las suscripciones de este proceso (desde cualquier hilo)."""
+        with self._lock:
+            suscripciones = list(self._suscripciones)
+        for sub in suscripciones:
+            if sub.le_interesa(evento) and not sub.loop.is_closed():
+                sub.loop.call_soon_threadsafe(sub._entregar, evento)
+
+    def _hay_en(self, loop):
+        with self._lock:
+            return any(s.loop is loop for s in self._suscripciones)
+
+    async def _seguir(self, ruta, loop):
+        """Sigue el fichero compartido mientras haya suscriptores en este loop."""
+        lector = LectorFichero(ruta)
+        try:
+            while self._hay_en(loop):
+                for evento in lector.nuevos():
+                    if evento.pop("pid", None) != os.getpid():
+                        self.entregar(evento)
+                await asyncio.sleep(_ajuste("EVENTOS_INTERVALO", 0.25))
+        finally:
+            lector.cerrar()
+            with self._lock:
+                if self._seguidores.get(loop) is asyncio.current_task():
+                    del self._seguidores[loop]
+
+
+bus = Bus()
+
+
+# ---------- Flujo SSE de una conexión ----------
+def _sse(nombre, datos):
+    return f"event: {nombre}\ndata: {json.dumps(datos, separators=(',', ':'))}\n\n"
+
+
+async def flujo(usuario_id, es_gm, pool=True, caduca=None, vigente=None):
+    """
+    Generador asíncrono para StreamingHttpResponse. Se suscribe al empezar a
+    iterar y se da de baja al cerrarse (el servidor ASGI lo cancela cuando el
+    cliente se desconecta). Cada EVENTOS_LATIDO segundos sin eventos manda un
+    comentario para que proxies y navegador no den la conexión por muerta.
+
+    Con `caduca` (timestamp) termina al llegar esa hora, y con `vigente`
+    (corrutina sin argumentos) vuelve a comprobar el acceso una vez por latido:
+    si ya no vale, envía `caducado` y cierra.
+    """
+    latido = _ajuste("EVENTOS_LATIDO", 15)
+    sub = bus.suscribir(usuario_id, es_gm, pool)
+    try:
+        yield f"retry: {_ajuste('EVENTOS_RECONEXION_MS', 3000)}\n: conectado\n\n"
+        proxima_comprobacion = time.monotonic() + latido
+        while True:
+            espera = latido if caduca is None else min(latido, caduca - time.time())
+            try:
+                ev = await asyncio.wait_for(sub.cola.get(), timeout=max(espera, 0))
+            except asyncio.TimeoutError:
+                ev = None
+            if caduca is not None and time.time() >= caduca:
+                yield _sse("caducado", {})
+                return
+            if vigente is not None and time.monotonic() >= proxima_comprobacion:
+                if not await vigente():
+                    yield _sse("caducado", {})
+                    return
+                proxima_comprobacion = time.monotonic() + latido
+            if ev is None:
+                yield ": ping\n\n"
+                continue
+            if sub.desbordada:
+                # Cliente lento: lo encolado ya no es completo, que recargue
+                while not sub.cola.empty():
+                    sub.cola.get_nowait()
+                sub.desbordada = False
+                yield _sse("resync", {})
+                continue
+            yield _sse("personaje", ev)
+    finally:
+        bus.cancelar(sub)
+
+
+# ---------- Tickets de conexión ----------
+def _clave_ticket(ticket):
+    return f"eventos:ticket:{ticket}"
+
+
+def emitir_ticket(token):
+    """
+    Ticket opaco de un solo uso que representa `token` (access ya validado)
+    en la URL. En la caché van sus claims (jti, exp, usuario, rol), no el
+    JWT firmado: leer el fichero de caché no da una credencial reutilizable.
+    """
+    ticket = secrets.token_urlsafe(24)
+    cache.set(_clave_ticket(ticket), dict(token.payload), _ajuste("EVENTOS_TICKET_TTL", 30))
+    return ticket
+
+
+async def acanjear_ticket(ticket):
+    """Claims del token del ticket (y lo invalida); None si no existe, ya caducó o ya se canjeó."""
+    clave = _clave_ticket(ticket)
+    claims = await cache.aget(clave)
+    # Solo canjea quien lo borra: dos aperturas a la vez no pueden usarlo ambas
+    if claims is None or not await cache.adelete(clave):
+        return None
+    return claims
+
+
+# ---------- Fichero compartido entre procesos ----------
+_escritura = threading.Lock()
+
+
+def escribir_fichero(ruta, evento):
+    linea = json.dumps({**evento, "pid": os.getpid()}, separators=(",", ":")) + "\n"
+    with _escritura:
+        try:
+            if os.path.getsize(ruta) > _ajuste("EVENTOS_FICHERO_MAX", 1024 * 1024):
+                os.replace(ruta, ruta + ".1")
+        except FileNotFoundError:
+            os.makedirs(os.path.dirname(ruta) or ".", exist_ok=True)
+        # O_APPEND: cada línea entera al final aunque escriban varios procesos
+        with open(ruta, "a", encoding="utf-8") as f:
+            f.write(linea)
+
+
+class LectorFichero:
+    """Lee las líneas nuevas desde que se abrió (empieza al final del fichero)."""
+
+    def __init__(self, ruta):
+        self.ruta = ruta
+        self.f = None
+        self._pendiente = ""
+        self._abrir(al_final=True)
+
+    def _abrir(self, al_final):
+        try:
+            self.f = open(self.ruta, "r", encoding="utf-8")
+        except FileNotFoundError:
+            self.f = None
+            return
+        if al_final:
+            self.f.seek(0, os.SEEK_END)
+        self._pendiente = ""
+
+    def _leer(self):
+        eventos = []
+        texto = self._pendiente + self.f.read()
+        lineas = texto.split("\n")
+        self._pendiente = lineas.pop()  # línea a medio escribir
+        for linea in lineas:
+            try:
+                eventos.append(json.loads(linea))
+            except ValueError:
+                continue
+        return eventos
+
+    def nuevos(self):
+        if self.f is None:
+            # El fichero aún no existía: lo que haya ahora es todo nuevo
+            self._abrir(al_final=False)
+            return self._leer() if self.f else []
+        eventos = self._leer()
+        try:
+            rotado = os.stat(self.ruta).st_ino != os.fstat(self.f.fileno()).st_ino
+        except FileNotFoundError:
+            rotado = False
+        if rotado:
+            # Ya se terminó el viejo (arriba); el nuevo se lee desde el principio
+            self.f.close()
+            self._abrir(al_final=False)
+            if self.f:
+                eventos += self._leer()
+        return eventos
+
+    def cerrar(self):
+        if self.f:
+            self.f.close()
+            self.f = None
+
+
+# ---------- Publicar ----------
+def evento(pk, propietarios, accion, version=None):
+    return {
+        "id": pk,
+        "accion": accion,
+        "version": version,
+        "propietarios": sorted(set(propietarios), key=lambda p: -1 if p is None else p),
+    }
+
+
+def _difundir(ev):
+    bus.entregar(ev)
+    ruta = ruta_fichero()
+    if ruta:
+        escribir_fichero(ruta, ev)
+
+
+def publicar_cambio(pk, propietarios, accion, version=None):
+    """Encola el aviso para después del COMMIT (si se deshace, no se avisa)."""
+    ev = evento(pk, propietarios, accion, version)
+    transaction.on_commit(lambda: _difundir(ev))
+
+
+# ---------- Señales ----------
+def _al_guardar(sender, instance, created, **kwargs):
+    propietarios = {instance.propietario_id, getattr(instance, "_propietario_cargado", instance.propietario_id)}
+    publicar_cambio(instance.pk, propietarios, "creado" if created else "cambio", instance.version)
+    instance._propietario_cargado = instance.propietario_id
+
+
+def _al_borrar(sender, instance, **kwargs):
+    publicar_cambio(instance.pk, {instance.propietario_id}, "borrado")
+
+
+def conectar_senales():
+    from django.db.models.signals import post_delete, post_save
+    from .models import Personaje
+    post_save.connect(_al_guardar, sender=Personaje, dispatch_uid="eventos_guardar")
+    post_delete.connect(_al_borrar, sender=Personaje, dispatch_uid="eventos_borrar")
@@ -0,0 +1,122 @@
+"""
+Filtros de servidor para los listados de Personaje (?raza=&estado=&nivel_min=...).
+
+Cada parámetro se traduce a una condición SQL apoyada en un índice
+(ver Personaje.Meta.indexes): el cliente recibe solo las filas que muestra,
+paginadas por core.pagination.PaginacionPorClave, en vez de descargar todo
+y filtrar en el navegador.
+
+    raza, poder, equipamiento   id o lista "1,2,3"    índice de la FK
+    estado                      VIVO,MUERTO,...       core_pj_estado_idx
+    nivel_min, nivel_max        enteros               core_pj_nivel_id_idx
+    propietario                 id de usuario         core_pj_prop_*_idx
+    nombre                      prefijo (sin mayúsculas/minúsculas)
+                                                      core_pj_nombre_min_idx
+
+Los parámetros se combinan con AND. Un valor mal formado es un 400 con el
+parámetro culpable, nunca un filtro ignorado en silencio.
+"""
+from django.db.models.functions import Lower
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend
+
+from .models import Personaje
+
+MAX_VALORES = 50
+MAX_PREFIJO = 50
+# Enteros de SQLite (64 bits con signo): fuera de rango el driver lanza OverflowError
+MIN_ENTERO, MAX_ENTERO = -2 ** 63, 2 ** 63 - 1
+ULTIMO_CARACTER = chr(0x10FFFF)
+
+
+def _en_rango(n):
+    if not MIN_ENTERO <= n <= MAX_ENTERO:
+        raise ValueError(n)
+    return n
+
+
+def _ids(valor, param):
+    try:
+        ids = [_en_rango(int(v)) for v in valor.split(",") if v.strip()]
+    except ValueError:
+        raise ValidationError({param: "Debe ser un id o una lista de ids separados por comas."})
+    if not ids or len(ids) > MAX_VALORES:
+        raise ValidationError({param: f"Entre 1 y {MAX_VALORES} ids."})
+    return ids
+
+
+def _entero(valor, param):
+    try:
+        return _en_rango(int(valor))
+    except ValueError:
+        raise ValidationError({param: "Debe ser un entero de 64 bits."})
+
+
+def minusculas_ascii(texto):
+    """Como LOWER() de SQLite (sin ICU): solo pasa a minúsculas A-Z."""
+    return "".join(c.lower() if c.isascii() else c for c in texto)
+
+
+def prefijo_nombre(queryset, prefijo):
+    """
+    `LOWER(nombre) >= p AND LOWER(nombre) < p'` (p' = p con la última letra +1):
+    un rango sobre el índice de expresión, que un `LIKE 'p%'` no usaría
+    (SQLite solo optimiza LIKE con case_sensitive_like o columnas NOCASE).
+    Si p solo tiene U+10FFFF (no hay letra siguiente), sin cota superior.
+    """
+    p = minusculas_ascii(prefijo)
+    filtros = {"nombre_min__gte": p}
+    base = p.rstrip(ULTIMO_CARACTER)
+    if base:
+        siguiente = ord(base[-1]) + 1
+        if 0xD800 <= siguiente <= 0xDFFF:
+            siguiente = 0xE000  # los sustitutos no son caracteres (no van a UTF-8)
+        filtros["nombre_min__lt"] = base[:-1] + chr(siguiente)
+    return queryset.alias(nombre_min=Lower("nombre")).filter(**filtros)
+
+
+class FiltroPersonajes(BaseFilterBackend):
+    """Filter backend de DRF: lo aplican list/disponibles y el bootstrap."""
+
+    # parámetro -> campo con __in
+    POR_ID = (("raza", "raza_id"), ("poder", "poder_id"), ("equipamiento", "equipamiento_id"))
+
+    def filter_queryset(self, request, queryset, view):
+        params = request.query_params
+        filtros = {}
+
+        for param, campo in self.POR_ID:
+            if params.get(param):
+                ids = _ids(params[param], param)
+                if len(ids) == 1:
+                    filtros[campo] = ids[0]
+                else:
+                    filtros[f"{campo}__in"] = ids
+
+        if params.get("estado"):
+            estados = [e.strip().upper() for e in params["estado"].split(",") if e.strip()]
+            invalidos = sorted(set(estados) - set(Personaje.Estado.values))
+            if not estados or invalidos:
+                raise ValidationError(
+                    {"estado": f"Estado no válido. Opciones: {', '.join(Personaje.Estado.values)}"}
+                )
+            filtros["estado__in"] = estados
+
+        if params.get("nivel_min"):
+            filtros["nivel__gte"] = _entero(params["nivel_min"], "nivel_min")
+        if params.get("nivel_max"):
+            filtros["nivel__lte"] = _entero(params["nivel_max"], "nivel_max")
+
+        # Para un jugador el queryset ya viene limitado a los suyos: filtrar
+        # por otro propietario da una lista vacía, no los de otro
+        if params.get("propietario"):
+            filtros["propietario_id"] = _entero(params["propietario"], "propietario")
+
+        queryset = queryset.filter(**filtros)
+
+        prefijo = params.get("nombre", "").strip()
+        if prefijo:
+            if len(prefijo) > MAX_PREFIJO:
+                raise ValidationError({"nombre": f"Máximo {MAX_PREFIJO} caracteres."})
+            queryset = prefijo_nombre(queryset, prefijo)
+        return queryset
@@ -0,0 +1,102 @@
+"""
+Generador de datos sintéticos a escala (benchmarks / reproducir problemas).
+
+- Determinista: misma `semilla` y parámetros => mismos datos.
+- Todo con bulk_create por lotes; nunca borra nada (a diferencia de
+  seed_testdata). Los nombres llevan `prefijo` para no chocar con lo existente
+  y ignore_conflicts hace que repetir una ejecución sea inocuo.
+- `progreso(tabla, hechas, total)` se llama tras cada lote.
+"""
+import random
+import time
+
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+
+from . import catalogos
+from .models import Equipamiento, Habilidad, Personaje, Poder, Raza, Usuario
+
+PASSWORD_POR_DEFECTO = "Passw0rd!"
+
+
+def _en_lotes(total, lote):
+    for inicio in range(0, total, lote):
+        yield inicio, min(inicio + lote, total)
+
+
+def _catalogo(modelo, prefijo, n):
+    nombres = [f"{prefijo}{modelo.__name__}-{i}" for i in range(n)]
+    modelo.objects.bulk_create([modelo(nombre=x) for x in nombres], ignore_conflicts=True)
+    # bulk_create no emite señales: la caché de catálogos se invalida a mano
+    catalogos.invalidar(modelo)
+    return list(modelo.objects.filter(nombre__in=nombres).order_by("id").values_list("id", flat=True))
+
+
+def generar(
+    usuarios=100, gms=1, razas=10, habilidades=30, poderes=10, equipamientos=10,
+    personajes=10_000, ratio_pool=0.2, ratio_opciones=0.5, ratio_seleccion=0.5,
+    semilla=1, prefijo=None, lote=5000, progreso=None,
+):
+    """
+    Inserta usuarios, catálogos y personajes. Devuelve un dict con lo creado.
+
+    ratio_pool: fracción de personajes sin propietario.
+    ratio_opciones: fracción con 3 opciones de habilidad fijadas por el GM.
+    ratio_seleccion: de esos, fracción que ya eligió 2 habilidades.
+    """
+    rnd = random.Random(semilla)
+    prefijo = f"Gen{semilla}-" if prefijo is None else prefijo
+    progreso = progreso or (lambda *a: None)
+    estados = [Personaje.Estado.VIVO] * 8 + [Personaje.Estado.CONGELADO, Personaje.Estado.MUERTO]
+
+    # ---------- Usuarios (un único hash de contraseña para todos) ----------
+    hash_pw = make_password(PASSWORD_POR_DEFECTO)
+    for ini, fin in _en_lotes(usuarios, lote):
+        Usuario.objects.bulk_create(
+            [Usuario(username=f"{prefijo}u{i}", password=hash_pw,
+                     rol=Usuario.Rol.GM if i < gms else Usuario.Rol.JUGADOR)
+             for i in range(ini, fin)],
+            ignore_conflicts=True,
+        )
+        progreso("usuarios", fin, usuarios)
+    jugadores = list(
+        Usuario.objects.filter(username__startswith=f"{prefijo}u", rol=Usuario.Rol.JUGADOR)
+        .order_by("id").values_list("id", flat=True)
+    )
+
+    # ---------- Catálogos ----------
+    ids = {
+        "raza": _catalogo(Raza, prefijo, razas),
+        "habilidad": _catalogo(Habilidad, prefijo, habilidades),
+        "poder": _catalogo(Poder, prefijo, poderes),
+        "equipamiento": _catalogo(Equipamiento, prefijo, equipamientos),
+    }
+    progreso("catalogos", 1, 1)
+
+    # ---------- Personajes ----------
+    t0 = time.perf_counter()
+    for ini, fin in _en_lotes(personajes, lote):
+        filas = []
+        for i in range(ini, fin):
+            dueno = None if (not jugadores or rnd.random() < ratio_pool) else rnd.choice(jugadores)
+            pj = Personaje(
+                nombre=f"{prefijo}pj{i}",
+                propietario_id=dueno,
+                raza_id=rnd.choice(ids["raza"]),
+                poder_id=rnd.choice(ids["poder"]),
+                equipamiento_id=rnd.choice(ids["equipamiento"]),
+                estado=rnd.choice(estados),
+                nivel=rnd.randint(1, 60),
+            )
+            if len(ids["habilidad"]) >= 3 and rnd.random() < ratio_opciones:
+                o = rnd.sample(ids["habilidad"], 3)
+                pj.opcion_hab1_id, pj.opcion_hab2_id, pj.opcion_hab3_id = o
+                if dueno is not None and rnd.random() < ratio_seleccion:
+                    pj.habilidad1_id, pj.habilidad2_id = rnd.sample(o, 2)
+            filas.append(pj)
+        with transaction.atomic():
+            Personaje.objects.bulk_create(filas, ignore_conflicts=True)
+        progreso("personajes", fin, personajes, time.perf_counter() - t0)
+
+    return {"usuarios": usuarios, "jugadores": len(jugadores), "personajes": personajes,
+            **{k: len(v) for k, v in ids.items()}}
@@ -0,0 +1,210 @@
+"""
+Importación / exportación de personajes en NDJSON (un JSON por línea).
+
+Formato de cada línea (catálogos y dueño por NOMBRE, no por id):
+    {"nombre": "Thrall", "raza": "Orco", "poder": "Fuego", "equipamiento": "Hacha",
+     "estado": "VIVO", "nivel": 3, "propietario": "jug1" | null,
+     "opciones": ["Sigilo", ...], "seleccion": ["Sigilo", ...]}
+
+- exportar(): generador de líneas sobre `values_list(...).iterator(chunk_size)`:
+  memoria constante, sin instanciar modelos.
+- importar(): lee línea a línea, resuelve nombres con mapas en memoria
+  (catálogos completos; usuarios por lote) y escribe con bulk_create por lotes.
+  Valida como PersonajeSerializer.validate_nombre + Personaje.clean.
+"""
+import json
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import IntegrityError, transaction
+from rest_framework.exceptions import ValidationError as DRFValidationError
+
+from .models import Equipamiento, Habilidad, Personaje, Poder, Raza, Usuario
+from .serializers import PersonajeSerializer
+
+CHUNK = 2000
+MAX_ERRORES = 100
+
+_COLUMNAS = (
+    "nombre", "raza__nombre", "poder__nombre", "equipamiento__nombre", "estado", "nivel",
+    "propietario__username",
+    "opcion_hab1__nombre", "opcion_hab2__nombre", "opcion_hab3__nombre",
+    "habilidad1__nombre", "habilidad2__nombre",
+)
+
+
+# ---------- Exportación ----------
+def exportar(queryset=None, chunk_size=CHUNK):
+    """Genera líneas NDJSON (str con '\\n') para los personajes de `queryset`."""
+    queryset = Personaje.objects.all() if queryset is None else queryset
+    filas = queryset.order_by("id").values_list(*_COLUMNAS).iterator(chunk_size=chunk_size)
+    for (nombre, raza, poder, equipamiento, estado, nivel, propietario, o1, o2, o3, h1, h2) in filas:
+        yield json.dumps({
+            "nombre": nombre,
+            "raza": raza,
+            "poder": poder,
+            "equipamiento": equipamiento,
+            "estado": estado,
+            "nivel": nivel,
+            "propietario": propietario,
+            "opciones": [h for h in (o1, o2, o3) if h],
+            "seleccion": [h for h in (h1, h2) if h],
+        }, ensure_ascii=False) + "\n"
+
+
+# ---------- Importación ----------
+class _Mapas:
+    """Nombre -> id de cada catálogo, cargados una vez (son tablas pequeñas)."""
+    def __init__(self):
+        self.raza = dict(Raza.objects.values_list("nombre", "id"))
+        self.poder = dict(Poder.objects.values_list("nombre", "id"))
+        self.equipamiento = dict(Equipamiento.objects.values_list("nombre", "id"))
+        self.habilidad = dict(Habilidad.objects.values_list("nombre", "id"))
+
+
+# Una sola instancia: crear un serializer por fila cuesta más que validar
+_SERIALIZER = PersonajeSerializer()
+
+
+_MAX_NOMBRE = Personaje._meta.get_field("nombre").max_length
+
+
+def _validar_nombre(nombre):
+    if nombre is not None and not isinstance(nombre, str):
+        raise ValueError("nombre: debe ser texto.")
+    try:
+        nombre = _SERIALIZER.validate_nombre(nombre or "")
+    except DRFValidationError as e:
+        raise ValueError(e.detail[0])
+    # SQLite no aplica el max_length de la columna: se comprueba aquí
+    if len(nombre) > _MAX_NOMBRE:
+        raise ValueError(f"nombre: como mucho {_MAX_NOMBRE} caracteres.")
+    return nombre
+
+
+def _construir(datos, mapas):
+    """Dict de una línea -> (Personaje sin guardar, username del dueño). ValueError si no es válido."""
+    if not isinstance(datos, dict):
+        raise ValueError("Cada línea debe ser un objeto JSON.")
+    nombre = _validar_nombre(datos.get("nombre"))
+
+    def fk(catalogo, clave):
+        valor = datos.get(clave)
+        try:
+            return getattr(mapas, catalogo)[valor]
+        except (KeyError, TypeError):
+            raise ValueError(f"{clave} desconocido: {valor!r}")
+
+    def habilidades(clave, maximo):
+        nombres = datos.get(clave) or []
+        if not isinstance(nombres, list) or len(nombres) > maximo:
+            raise ValueError(f"{clave}: lista de hasta {maximo} habilidades.")
+        ids = []
+        for n in nombres:
+            # Solo texto: una lista u objeto no se puede buscar en el mapa
+            if not isinstance(n, str) or n not in mapas.habilidad:
+                raise ValueError(f"Habilidad desconocida en {clave}: {n!r}")
+            ids.append(mapas.habilidad[n])
+        return ids + [None] * (maximo - len(ids))
+
+    estado = datos.get("estado", Personaje.Estado.VIVO)
+    if not isinstance(estado, str) or estado not in Personaje.Estado.values:
+        raise ValueError(f"estado inválido: {estado!r}")
+    nivel = datos.get("nivel", 1)
+    # bool es subclase de int: true no es el nivel 1
+    if type(nivel) is not int:
+        raise ValueError("nivel debe ser un entero.")
+    if not -2 ** 63 <= nivel < 2 ** 63:
+        raise ValueError("nivel fuera de rango.")
+    propietario = datos.get("propietario")
+    if propietario is not None and not isinstance(propietario, str):
+        raise ValueError(f"propietario debe ser un username o null: {propietario!r}")
+
+    o1, o2, o3 = habilidades("opciones", 3)
+    h1, h2 = habilidades("seleccion", 2)
+    pj = Personaje(
+        nombre=nombre, estado=estado, nivel=nivel,
+        raza_id=fk("raza", "raza"), poder_id=fk("poder", "poder"), equipamiento_id=fk("equipamiento", "equipamiento"),
+        opcion_hab1_id=o1, opcion_hab2_id=o2, opcion_hab3_id=o3,
+        habilidad1_id=h1, habilidad2_id=h2,
+    )
+    try:
+        pj.clean()
+    except DjangoValidationError as e:
+        raise ValueError(e.messages[0])
+    return pj, propietario
+
+
+def importar(lineas, lote=CHUNK):
+    """
+    Importa personajes desde un iterable de líneas NDJSON (str o bytes).
+    Las líneas inválidas (o con nombre ya existente) se saltan y se informan.
+    Devuelve {"creados": n, "errores": n, "detalle_errores": [...primeros MAX_ERRORES]}.
+    """
+    mapas = _Mapas()
+    resumen = {"creados": 0, "errores": 0, "detalle_errores": []}
+
+    def error(num, msg):
+        resumen["errores"] += 1
+        if len(resumen["detalle_errores"]) < MAX_ERRORES:
+            resumen["detalle_errores"].append({"linea": num, "error": str(msg)})
+
+    pendientes = []  # (num_linea, personaje, username)
+    for num, linea in enumerate(lineas, start=1):
+        try:
+            if isinstance(linea, bytes):
+                linea = linea.decode("utf-8")
+            if not linea.strip():
+                continue
+            pj, usuario = _construir(json.loads(linea), mapas)
+        except UnicodeDecodeError:
+            error(num, "La línea no es UTF-8 válido.")
+            continue
+        except (ValueError, json.JSONDecodeError) as e:
+            error(num, e)
+            continue
+        pendientes.append((num, pj, usuario))
+        if len(pendientes) >= lote:
+            _volcar(pendientes, resumen, error)
+            pendientes = []
+    _volcar(pendientes, resumen, error)
+    return resumen
+
+
+def _volcar(pendientes, resumen, error):
+    """Resuelve dueños y nombres repetidos del lote y hace un bulk_create."""
+    if not pendientes:
+        return
+    usernames = {u for _, _, u in pendientes if u}
+    usuarios = dict(Usuario.objects.filter(username__in=usernames).values_list("username", "id"))
+    existentes = set(
+        Personaje.objects.filter(nombre__in=[pj.nombre for _, pj, _ in pendientes]).values_list("nombre", flat=True)
+    )
+
+    nuevos = []
+    for num, pj, username in pendientes:
+        if pj.nombre in existentes:
+            error(num, f"Ya existe un personaje llamado {pj.nombre!r}.")
+            continue
+        if username and username not in usuarios:
+            error(num, f"propietario desconocido: {username!r}")
+            continue
+        pj.propietario_id = usuarios.get(username)
+        existentes.add(pj.nombre)  # repetidos dentro del propio fichero
+        nuevos.append((num, pj))
+
+    try:
+        with transaction.atomic():
+            Personaje.objects.bulk_create([pj for _, pj in nuevos], batch_size=len(nuevos) or 1)
+        resumen["creados"] += len(nuevos)
+    except IntegrityError:
+        # Otro proceso creó alguno de estos nombres entre la comprobación y el
+        # INSERT: se reintenta fila a fila para saber cuáles chocan
+        for num, pj in nuevos:
+            pj.pk = None
+            try:
+                with transaction.atomic():
+                    Personaje.objects.bulk_create([pj])
+            except IntegrityError:
+                error(num, f"Conflicto: {pj.nombre!r} se ha creado a la vez en otra importación.")
+            else:
+                resumen["creados"] += 1
@@ -0,0 +1,19 @@
+# backend/core/management/commands/archivar_auditoria.py
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.auditoria import aplicar_retencion, directorio_archivo
+
+
+class Command(BaseCommand):
+    help = "Mueve el AuditLog antiguo a ficheros NDJSON comprimidos (uno por mes) y lo borra de la tabla."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dias", type=int, default=settings.AUDITORIA_RETENCION_DIAS,
+                            help="Conserva en la tabla solo los últimos N días.")
+        parser.add_argument("--dir", default=None, help="Directorio de archivo (por defecto AUDITORIA_ARCHIVO_DIR).")
+
+    def handle(self, *args, **options):
+        directorio = options["dir"] or directorio_archivo()
+        n = aplicar_retencion(dias=options["dias"], directorio=directorio)
+        self.stdout.write(self.style.SUCCESS(f"{n} entradas archivadas en {directorio}"))
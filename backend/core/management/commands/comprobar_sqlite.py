@@ -0,0 +1,32 @@
+# backend/core/management/commands/comprobar_sqlite.py
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from core import sqlite
+
+
+class Command(BaseCommand):
+    help = "Comprueba que la conexión SQLite tiene aplicados los PRAGMAs de settings.SQLITE_PRAGMAS."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--database", default="default", help="Alias de la BD a comprobar.")
+
+    def handle(self, *args, **options):
+        conexion = connections[options["database"]]
+        if conexion.vendor != "sqlite":
+            self.stdout.write(f"{options['database']}: {conexion.vendor}, nada que comprobar")
+            return
+        valores = sqlite.pragmas()
+        if not valores:
+            raise CommandError("SQLITE_PRAGMAS está vacío: SQLite con la configuración de serie.")
+
+        conexion.ensure_connection()
+        en_memoria = conexion.is_in_memory_db()
+        actuales = sqlite.leer(conexion.connection, valores)
+        fallos = sqlite.diferencias(conexion.connection, valores, en_memoria)
+        for nombre in valores:
+            self.stdout.write(f"  {nombre:<14} {actuales[nombre]}")
+        if fallos:
+            detalle = ", ".join(f"{n}={a} (esperado {e})" for n, e, a in fallos)
+            raise CommandError(f"PRAGMAs sin aplicar: {detalle}")
+        self.stdout.write(self.style.SUCCESS(f"{conexion.settings_dict['NAME']}: PRAGMAs correctos"))
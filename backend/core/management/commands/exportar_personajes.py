@@ -0,0 +1,26 @@
+# backend/core/management/commands/exportar_personajes.py
+import sys
+
+from django.core.management.base import BaseCommand
+
+from core.intercambio import CHUNK, exportar
+
+
+class Command(BaseCommand):
+    help = "Exporta todos los personajes como NDJSON (memoria constante)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--salida", default="-", help="Fichero de salida ('-' = stdout).")
+        parser.add_argument("--chunk", type=int, default=CHUNK, help="Filas por lectura a la BD.")
+
+    def handle(self, *args, **options):
+        destino = sys.stdout if options["salida"] == "-" else open(options["salida"], "w", encoding="utf-8")
+        n = 0
+        try:
+            for linea in exportar(chunk_size=options["chunk"]):
+                destino.write(linea)
+                n += 1
+        finally:
+            if destino is not sys.stdout:
+                destino.close()
+        self.stderr.write(self.style.SUCCESS(f"{n} personajes exportados."))
@@ -0,0 +1,44 @@
+# backend/core/management/commands/generar_datos.py
+from django.core.management.base import BaseCommand, CommandError
+
+from core.generador import PASSWORD_POR_DEFECTO, generar
+
+
+class Command(BaseCommand):
+    help = ("Genera datos sintéticos a escala (usuarios, catálogos y personajes) con bulk_create. "
+            "Determinista por --semilla; no borra nada.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--usuarios", type=int, default=100)
+        parser.add_argument("--gms", type=int, default=1, help="Cuántos de los usuarios son GM.")
+        parser.add_argument("--razas", type=int, default=10)
+        parser.add_argument("--habilidades", type=int, default=30)
+        parser.add_argument("--poderes", type=int, default=10)
+        parser.add_argument("--equipamientos", type=int, default=10)
+        parser.add_argument("--personajes", type=int, default=10_000)
+        parser.add_argument("--ratio-pool", type=float, default=0.2, help="Fracción sin propietario (0-1).")
+        parser.add_argument("--ratio-opciones", type=float, default=0.5, help="Fracción con 3 opciones de habilidad.")
+        parser.add_argument("--ratio-seleccion", type=float, default=0.5, help="De ésos, fracción con 2 elegidas.")
+        parser.add_argument("--semilla", type=int, default=1)
+        parser.add_argument("--prefijo", default=None, help="Prefijo de nombres (por defecto Gen<semilla>-).")
+        parser.add_argument("--lote", type=int, default=5000, help="Filas por bulk_create.")
+
+    def handle(self, *args, **o):
+        for clave in ("ratio_pool", "ratio_opciones", "ratio_seleccion"):
+            if not 0 <= o[clave] <= 1:
+                raise CommandError(f"--{clave.replace('_', '-')} debe estar entre 0 y 1.")
+
+        def progreso(tabla, hechas, total, segundos=None):
+            ritmo = f" ({hechas / segundos:,.0f} filas/s)" if segundos else ""
+            self.stdout.write(f"  {tabla}: {hechas:,}/{total:,}{ritmo}")
+
+        resumen = generar(
+            usuarios=o["usuarios"], gms=o["gms"], razas=o["razas"], habilidades=o["habilidades"],
+            poderes=o["poderes"], equipamientos=o["equipamientos"], personajes=o["personajes"],
+            ratio_pool=o["ratio_pool"], ratio_opciones=o["ratio_opciones"],
+            ratio_seleccion=o["ratio_seleccion"], semilla=o["semilla"], prefijo=o["prefijo"],
+            lote=o["lote"], progreso=progreso,
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Datos generados: {resumen}. Contraseña de los usuarios: {PASSWORD_POR_DEFECTO}"
+        ))
@@ -0,0 +1,28 @@
+# backend/core/management/commands/importar_personajes.py
+import sys
+
+from django.core.management.base import BaseCommand
+
+from core.intercambio import CHUNK, importar
+
+
+class Command(BaseCommand):
+    help = "Importa personajes desde NDJSON (nombres de catálogo y de dueño), con bulk_create por lotes."
+
+    def add_arguments(self, parser):
+        parser.add_argument("archivo", help="Fichero NDJSON ('-' = stdin).")
+        parser.add_argument("--lote", type=int, default=CHUNK, help="Filas por bulk_create.")
+
+    def handle(self, *args, **options):
+        # En binario: importar() decodifica cada línea y un byte inválido es
+        # un error de esa línea, no una excepción que corta la importación
+        origen = sys.stdin.buffer if options["archivo"] == "-" else open(options["archivo"], "rb")
+        try:
+            resumen = importar(origen, lote=options["lote"])
+        finally:
+            if origen is not sys.stdin.buffer:
+                origen.close()
+        for e in resumen["detalle_errores"]:
+            self.stderr.write(f"línea {e['linea']}: {e['error']}")
+        estilo = self.style.SUCCESS if not resumen["errores"] else self.style.WARNING
+        self.stdout.write(estilo(f"{resumen['creados']} creados, {resumen['errores']} con errores."))
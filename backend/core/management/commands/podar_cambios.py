@@ -0,0 +1,17 @@
+# backend/core/management/commands/podar_cambios.py
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.sincronizacion import podar
+
+
+class Command(BaseCommand):
+    help = "Borra las entradas antiguas del diario de cambios de /api/sync/ (los clientes con cursores más viejos reciben reset)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dias", type=int, default=settings.SYNC_RETENCION_DIAS,
+                            help="Conserva solo los últimos N días del diario.")
+
+    def handle(self, *args, **options):
+        n = podar(dias=options["dias"])
+        self.stdout.write(self.style.SUCCESS(f"{n} entradas del diario borradas"))
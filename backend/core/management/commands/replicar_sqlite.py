@@ -0,0 +1,51 @@
+# backend/core/management/commands/replicar_sqlite.py
+import sqlite3
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from core.sqlite import replicar
+
+
+class Command(BaseCommand):
+    help = (
+        "Sustituto local de la replicación: copia la BD SQLite primaria sobre las "
+        "réplicas SQLite de DATABASE_REPLICA_URLS (una vez o cada N segundos)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--cada", type=float, default=0,
+                            help="Repite cada N segundos (0 = una sola copia).")
+        parser.add_argument("--destino", action="append", default=None,
+                            help="Fichero réplica (por defecto, las réplicas SQLite configuradas).")
+
+    def handle(self, *args, **options):
+        origen = connections["default"].settings_dict
+        if origen["ENGINE"] != "django.db.backends.sqlite3":
+            raise CommandError("La BD primaria no es SQLite: usa la replicación del motor.")
+        destinos = options["destino"] or [
+            connections[alias].settings_dict["NAME"] for alias in settings.BD_REPLICAS
+            if connections[alias].settings_dict["ENGINE"] == "django.db.backends.sqlite3"
+        ]
+        if not destinos:
+            raise CommandError("No hay réplicas SQLite (DATABASE_REPLICA_URLS) ni --destino.")
+
+        while True:
+            t0 = time.perf_counter()
+            fallos = 0
+            for destino in destinos:
+                try:
+                    replicar(str(origen["NAME"]), str(destino))
+                except sqlite3.OperationalError as exc:
+                    # p. ej. "database is locked": con --cada se reintenta en la siguiente vuelta
+                    if not options["cada"]:
+                        raise CommandError(f"{destino}: {exc}") from exc
+                    self.stderr.write(f"{destino}: {exc}; se reintentará en {options['cada']:g} s")
+                    fallos += 1
+            al_dia = len(destinos) - fallos
+            self.stdout.write(f"{al_dia} réplica(s) al día en {(time.perf_counter() - t0) * 1000:.0f} ms")
+            if not options["cada"]:
+                return
+            time.sleep(options["cada"])
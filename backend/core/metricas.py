@@ -0,0 +1,255 @@
+"""
+Instrumentación por petición: fases, consultas, Server-Timing e histogramas.
+
+Fases (ms):
+- mw:     middleware de Django (Axes, sesiones, CORS...) y todo lo que no es vista
+- auth:   APIView.initial de DRF (autenticación, permisos, throttling)
+- db:     tiempo dentro de la BD (connection.execute_wrapper)
+- vista:  handler de la vista sin la BD (lógica + serializer.data)
+- render: renderizado de la respuesta (JSON)
+- total
+
+`InstrumentacionMiddleware` (primero en MIDDLEWARE) mide el total;
+`InstrumentacionVistaMiddleware` (último) marca dónde empieza la vista;
+`MedirFasesMixin` (vistas de clase de DRF) separa auth y render. En vistas de
+función (@api_view y core.vistas_asincronas) auth y render quedan dentro de
+"vista". La BD se mide con un execute_wrapper puesto en cada conexión al
+abrirse: bajo ASGI las consultas corren en otros hilos (sync_to_async), con
+sus propias conexiones, y la medición les llega por la ContextVar.
+
+Los dos middlewares son síncronos y asíncronos: bajo ASGI no obligan a pasar
+la petición por un hilo (las vistas async de core.vistas_asincronas corren
+en el event loop).
+
+Los histogramas son por proceso; /api/metrics/ muestra los del worker que
+atiende la petición, en formato de texto de Prometheus.
+"""
+import contextvars
+import threading
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db.backends.signals import connection_created
+
+FASES = ("mw", "auth", "db", "vista", "render", "total")
+LIMITES_MS = (1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+_actual = contextvars.ContextVar("rpg_medicion", default=None)
+
+
+class Medicion:
+    __slots__ = ("t0", "fases", "consultas", "en_vista")
+
+    def __init__(self):
+        self.t0 = time.perf_counter()
+        self.fases = dict.fromkeys(FASES, 0.0)
+        self.consultas = 0
+        self.en_vista = 0.0
+
+
+def _medir_sql(execute, sql, params, many, context):
+    medicion = _actual.get()
+    if medicion is None:
+        return execute(sql, params, many, context)
+    t = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        medicion.fases["db"] += time.perf_counter() - t
+        medicion.consultas += 1
+
+
+def _al_conectar(sender, connection, **kwargs):
+    # Una vez por conexión (connect() se repite al reabrirla)
+    if _medir_sql not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_medir_sql)
+
+
+def conectar_senales():
+    connection_created.connect(_al_conectar, dispatch_uid="metricas_sql")
+
+
+class Histograma:
+    __slots__ = ("cubos", "suma", "cuenta")
+
+    def __init__(self):
+        self.cubos = [0] * (len(LIMITES_MS) + 1)
+        self.suma = 0.0
+        self.cuenta = 0
+
+    def observar(self, ms):
+        i = 0
+        while i < len(LIMITES_MS) and ms > LIMITES_MS[i]:
+            i += 1
+        self.cubos[i] += 1
+        self.suma += ms
+        self.cuenta += 1
+
+
+class Registro:
+    """Histogramas por (ruta, fase) y consultas por ruta, protegidos por un lock."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._hist = {}
+        self._consultas = {}
+
+    def observar(self, ruta, medicion):
+        with self._lock:
+            for fase, segundos in medicion.fases.items():
+                h = self._hist.get((ruta, fase))
+                if h is None:
+                    h = self._hist[(ruta, fase)] = Histograma()
+                h.observar(segundos * 1000)
+            self._consultas[ruta] = self._consultas.get(ruta, 0) + medicion.consultas
+
+    def limpiar(self):
+        with self._lock:
+            self._hist.clear()
+            self._consultas.clear()
+
+    def texto(self):
+        """Exposición en formato de texto de Prometheus."""
+        with self._lock:
+            hist = sorted(self._hist.items())
+            consultas = sorted(self._consultas.items())
+        lineas = [
+            "# HELP rpg_peticion_ms Duración de la petición por ruta y fase (ms).",
+            "# TYPE rpg_peticion_ms histogram",
+        ]
+        for (ruta, fase), h in hist:
+            etiquetas = f'ruta="{ruta}",fase="{fase}"'
+            acumulado = 0
+            for limite, n in zip(LIMITES_MS + ("+Inf",), h.cubos):
+                acumulado += n
+                lineas.append(f'rpg_peticion_ms_bucket{{{etiquetas},le="{limite}"}} {acumulado}')
+            lineas.append(f"rpg_peticion_ms_sum{{{etiquetas}}} {h.suma:.3f}")
+            lineas.append(f"rpg_peticion_ms_count{{{etiquetas}}} {h.cuenta}")
+        lineas += [
+            "# HELP rpg_consultas_total Consultas SQL por ruta.",
+            "# TYPE rpg_consultas_total counter",
+        ]
+        lineas += [f'rpg_consultas_total{{ruta="{ruta}"}} {n}' for ruta, n in consultas]
+        return "\n".join(lineas) + "\n"
+
+
+registro = Registro()
+
+
+def _ruta(request):
+    match = getattr(request, "resolver_match", None)
+    nombre = (match.view_name or match.route) if match else "sin_ruta"
+    return f"{request.method} {nombre}"
+
+
+def server_timing(medicion):
+    partes = []
+    for fase in FASES:
+        valor = f"{fase};dur={medicion.fases[fase] * 1000:.2f}"
+        if fase == "db":
+            valor += f';desc="{medicion.consultas} consultas"'
+        partes.append(valor)
+    return ", ".join(partes)
+
+
+# ---------- Middleware ----------
+class _MiddlewareMixto:
+    """Síncrono o asíncrono según lo que haya debajo (get_response)."""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, "INSTRUMENTACION", True):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.asincrono = iscoroutinefunction(get_response)
+        if self.asincrono:
+            markcoroutinefunction(self)
+
+
+class InstrumentacionMiddleware(_MiddlewareMixto):
+    """Debe ir el primero de MIDDLEWARE para que "mw" incluya al resto."""
+
+    def __call__(self, request):
+        if self.asincrono:
+            return self._acall(request)
+        medicion = Medicion()
+        token = _actual.set(medicion)
+        try:
+            response = self.get_response(request)
+        finally:
+            _actual.reset(token)
+        return self._terminar(request, response, medicion)
+
+    async def _acall(self, request):
+        medicion = Medicion()
+        token = _actual.set(medicion)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _actual.reset(token)
+        return self._terminar(request, response, medicion)
+
+    def _terminar(self, request, response, medicion):
+        f = medicion.fases
+        f["total"] = time.perf_counter() - medicion.t0
+        f["vista"] = max(0.0, medicion.en_vista - f["auth"] - f["render"] - f["db"])
+        f["mw"] = max(0.0, f["total"] - medicion.en_vista)
+        response["Server-Timing"] = server_timing(medicion)
+        registro.observar(_ruta(request), medicion)
+        return response
+
+
+class InstrumentacionVistaMiddleware(_MiddlewareMixto):
+    """
+    Debe ir el ÚLTIMO de MIDDLEWARE: lo que tarda su get_response es la vista
+    (más process_view y render); el resto del total es middleware.
+    """
+
+    def __call__(self, request):
+        if self.asincrono:
+            return self._acall(request)
+        medicion = _actual.get()
+        if medicion is None:
+            return self.get_response(request)
+        t = time.perf_counter()
+        try:
+            return self.get_response(request)
+        finally:
+            medicion.en_vista += time.perf_counter() - t
+
+    async def _acall(self, request):
+        medicion = _actual.get()
+        if medicion is None:
+            return await self.get_response(request)
+        t = time.perf_counter()
+        try:
+            return await self.get_response(request)
+        finally:
+            medicion.en_vista += time.perf_counter() - t
+
+
+# ---------- Vistas de DRF ----------
+class MedirFasesMixin:
+    """Separa auth (initial) y render dentro de la vista. Sin coste si no hay medición."""
+
+    def initial(self, request, *args, **kwargs):
+        medicion = _actual.get()
+        if medicion is None:
+            return super().initial(request, *args, **kwargs)
+        t = time.perf_counter()
+        try:
+            return super().initial(request, *args, **kwargs)
+        finally:
+            medicion.fases["auth"] += time.perf_counter() - t
+
+    def dispatch(self, request, *args, **kwargs):
+        response = super().dispatch(request, *args, **kwargs)
+        medicion = _actual.get()
+        if medicion is not None and callable(getattr(response, "render", None)) and not response.is_rendered:
+            t = time.perf_counter()
+            response.render()
+            medicion.fases["render"] += time.perf_counter() - t
+        return response
@@ -0,0 +1,17 @@
+# Generated by Django 5.0.6 on 2026-10-18 09:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_auditlog'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='personaje',
+            index=models.Index(fields=['nivel', 'id'], name='core_pj_nivel_id_idx'),
+        ),
+    ]
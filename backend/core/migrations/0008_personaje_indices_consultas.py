@@ -0,0 +1,25 @@
+# Generated by Django 5.0.6 on 2026-10-18 10:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_auditlog_indices'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='personaje',
+            index=models.Index(fields=['propietario', 'nivel', 'id'], name='core_pj_prop_nivel_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='personaje',
+            index=models.Index(fields=['propietario', 'estado'], name='core_pj_prop_estado_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='personaje',
+            index=models.Index(fields=['estado'], name='core_pj_estado_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.6 on 2026-10-18 10:14
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_personaje_indices_consultas'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='personaje',
+            index=models.Index(django.db.models.functions.text.Lower('nombre'), name='core_pj_nombre_min_idx'),
+        ),
+    ]
@@ -0,0 +1,103 @@
+"""
+Índice de texto completo (FTS5) sobre Personaje.nombre + username del propietario.
+
+Tabla virtual core_personaje_fts con rowid = id del personaje; la mantienen
+triggers de SQLite, así que también la actualizan QuerySet.update(),
+bulk_create() y los borrados en cascada (que no emiten señales).
+En otros motores, o en un SQLite sin FTS5, no se crea nada y core.busqueda
+recurre a LIKE por prefijo de palabra.
+
+El SQL está congelado aquí (no se importa de core): una migración aplicada
+debe hacer siempre lo mismo. Las migraciones posteriores que rehagan
+core_personaje o core_usuario importan `quitar_triggers` / `poner_triggers`
+de este módulo (ver 0011_personaje_version).
+"""
+from django.db import migrations
+
+TABLA = "core_personaje_fts"
+
+SQL_TABLA = [
+    # unicode61 sin diacríticos: "angel" encuentra "Ángel". prefix: índices
+    # de prefijo de 2 y 3 caracteres para que "ga*" no recorra el vocabulario
+    f"""CREATE VIRTUAL TABLE {TABLA} USING fts5(
+        nombre, propietario,
+        tokenize = 'unicode61 remove_diacritics 2',
+        prefix = '2 3'
+    )""",
+    # Orden por defecto (columna rank): el nombre pesa más que el dueño
+    f"INSERT INTO {TABLA}({TABLA}, rank) VALUES ('rank', 'bm25(10.0, 1.0)')",
+    f"""INSERT INTO {TABLA}(rowid, nombre, propietario)
+        SELECT p.id, p.nombre, COALESCE(u.username, '')
+        FROM core_personaje p LEFT JOIN core_usuario u ON u.id = p.propietario_id""",
+]
+
+SQL_TRIGGERS = {
+    "core_personaje_fts_ai": f"""CREATE TRIGGER core_personaje_fts_ai AFTER INSERT ON core_personaje BEGIN
+        INSERT INTO {TABLA}(rowid, nombre, propietario) VALUES (
+            new.id, new.nombre,
+            COALESCE((SELECT username FROM core_usuario WHERE id = new.propietario_id), ''));
+    END""",
+    "core_personaje_fts_ad": f"""CREATE TRIGGER core_personaje_fts_ad AFTER DELETE ON core_personaje BEGIN
+        DELETE FROM {TABLA} WHERE rowid = old.id;
+    END""",
+    "core_personaje_fts_au": f"""CREATE TRIGGER core_personaje_fts_au AFTER UPDATE OF nombre, propietario_id ON core_personaje
+    WHEN new.nombre IS NOT old.nombre OR new.propietario_id IS NOT old.propietario_id BEGIN
+        UPDATE {TABLA} SET
+            nombre = new.nombre,
+            propietario = COALESCE((SELECT username FROM core_usuario WHERE id = new.propietario_id), '')
+        WHERE rowid = old.id;
+    END""",
+    "core_usuario_fts_au": f"""CREATE TRIGGER core_usuario_fts_au AFTER UPDATE OF username ON core_usuario
+    WHEN new.username IS NOT old.username BEGIN
+        UPDATE {TABLA} SET propietario = new.username
+        WHERE rowid IN (SELECT id FROM core_personaje WHERE propietario_id = new.id);
+    END""",
+}
+
+
+def _fts5_compilado(connection):
+    if connection.vendor != "sqlite":
+        return False
+    with connection.cursor() as c:
+        c.execute("SELECT sqlite_compileoption_used('ENABLE_FTS5')")
+        return bool(c.fetchone()[0])
+
+
+def _tabla_creada(connection):
+    return connection.vendor == "sqlite" and TABLA in connection.introspection.table_names()
+
+
+def crear(apps, schema_editor):
+    """Tabla FTS rellena con lo existente + triggers. No hace nada sin SQLite/FTS5."""
+    if _fts5_compilado(schema_editor.connection):
+        for sql in SQL_TABLA + list(SQL_TRIGGERS.values()):
+            schema_editor.execute(sql)
+
+
+def borrar(apps, schema_editor):
+    if schema_editor.connection.vendor == "sqlite":
+        quitar_triggers(apps, schema_editor)
+        schema_editor.execute(f"DROP TABLE IF EXISTS {TABLA}")
+
+
+def quitar_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor == "sqlite":
+        for nombre in SQL_TRIGGERS:
+            schema_editor.execute(f"DROP TRIGGER IF EXISTS {nombre}")
+
+
+def poner_triggers(apps, schema_editor):
+    if _tabla_creada(schema_editor.connection):
+        for sql in SQL_TRIGGERS.values():
+            schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_personaje_nombre_min'),
+    ]
+
+    operations = [
+        migrations.RunPython(crear, borrar),
+    ]
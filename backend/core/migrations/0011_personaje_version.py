@@ -0,0 +1,32 @@
+# Generated by Django 5.0.6 on 2026-10-18 10:26
+
+from importlib import import_module
+
+import django.utils.timezone
+from django.db import migrations, models
+
+# Triggers FTS con el SQL congelado en la migración que los creó
+fts = import_module("core.migrations.0010_personaje_fts")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_personaje_fts'),
+    ]
+
+    # AddField NOT NULL rehace core_personaje en SQLite: fuera triggers FTS mientras tanto
+    operations = [
+        migrations.RunPython(fts.quitar_triggers, fts.poner_triggers),
+        migrations.AddField(
+            model_name='personaje',
+            name='actualizado',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+        ),
+        migrations.AddField(
+            model_name='personaje',
+            name='version',
+            field=models.PositiveIntegerField(default=1, editable=False),
+        ),
+        migrations.RunPython(fts.poner_triggers, fts.quitar_triggers),
+    ]
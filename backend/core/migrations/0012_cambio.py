@@ -0,0 +1,95 @@
+# Generated by Django 5.0.6 on 2026-10-18 10:39
+"""
+Diario de cambios para /api/sync/ (core.sincronizacion): tabla core_cambio
+y los triggers de SQLite que la rellenan.
+
+El SQL está congelado aquí (no se importa de core): una migración aplicada
+debe hacer siempre lo mismo. Las migraciones posteriores que rehagan
+core_personaje, core_usuario o un catálogo importan `quitar_triggers` /
+`poner_triggers` de este módulo.
+"""
+import django.utils.timezone
+from django.db import migrations, models
+
+# En cada INSERT/UPDATE/DELETE de personajes y catálogos; renombrar un
+# catálogo o un usuario apunta también los personajes que muestran el nombre
+SQL_TRIGGERS = {
+    "core_cambio_pj_ai": """CREATE TRIGGER core_cambio_pj_ai AFTER INSERT ON core_personaje BEGIN
+        INSERT INTO core_cambio(tabla, objeto_id, propietario_id, anterior_id, fecha) VALUES ('personaje', new.id, new.propietario_id, new.propietario_id, strftime('%Y-%m-%d %H:%M:%f', 'now'));
+        END""",
+    "core_cambio_pj_au": """CREATE TRIGGER core_cambio_pj_au AFTER UPDATE ON core_personaje BEGIN
+        INSERT INTO core_cambio(tabla, objeto_id, propietario_id, anterior_id, fecha) VALUES ('personaje', new.id, new.propietario_id, old.propietario_id, strftime('%Y-%m-%d %H:%M:%f', 'now'));
+        END""",
+    "core_cambio_pj_ad": """CREATE TRIGGER core_cambio_pj_ad AFTER DELETE ON core_personaje BEGIN
+        INSERT INTO core_cambio(tabla, objeto_id, propietario_id, anterior_id, fecha) VALUES ('personaje', old.id, old.propietario_id, old.propietario_id, strftime('%Y-%m-%d %H:%M:%f', 'now'));
+        END""",
+    "core_cambio_usuario_au": """CREATE TRIGGER core_cambio_usuario_au AFTER UPDATE OF username ON core_usuario
+        WHEN new.username IS NOT old.username BEGIN
+        INSERT INTO core_cambio(tabla, objeto_id, propietario_id, anterior_id, fecha) SELECT 'personaje', id, propietario_id, propietario_id, strftime('%Y-%m-%d %H:%M:%f', 'now') FROM core_personaje WHERE propietario_id = new.id;
+        END""",
+    "core_cambio_raza_ai": """CREATE TRIGGER core_cambio_raza_ai AFTER INSERT ON core_raza BEGIN INSERT INTO core_cambio(tabla, objeto_id, propietario_id, anterior_id, fecha) VALUES ('raza', new.id, NULL, NULL, strftime('%Y-%m-%d %H:%M:%f', 'now')); END""",
+    "core_cambio_raza_ad": """CREATE TRIGGER core_cambio_raza_ad AFTER DELETE ON core_raza BEGIN INSERT INTO core_cambio(tabla, objeto_id, propietario_id, anterior_id, fecha) VALUES ('raza', old.id, NULL, NULL, strftime('%Y-%m-%d %H:%M:%f', 'now')); END""",
+    "core_cambio_raza_au": """CREATE TRIGGER core_cambio_raza_au AFTER UPDATE ON core_raza BEGIN INSERT INTO core_cambio(tabla, objeto_id, propietario_id, anterior_id, fecha) VALUES ('raza', new.id, NULL, NULL, strftime('%Y-%m-%d %H:%M:%f', 'now')); END""",
+    "core_cambio_raza_nombre": """CREATE TRIGGER core_cambio_raza_nombre AFTER UPDATE OF nombre ON core_raza
+        WHEN new.nombre IS NOT old.nombre BEGIN
+        INSERT INTO core_cambio(tabla, objeto_id, propietario_id, anterior_id, fecha) SELECT 'personaje', id, propietario_id, propietario_id, strftime('%Y-%m-%d %H:%M:%f', 'now') FROM core_personaje WHERE raza_id = new.id;
+        END""",
+    "core_cambio_habilidad_ai": """CREATE TRIGGER core_cambio_habilidad_ai AFTER INSERT ON core_habilidad BEGIN INSERT INTO core_cambio(tabla, objeto_id, propietario_id, anterior_id, fecha) VALUES ('habilidad', new.id, NULL, NULL, strftime('%Y-%m-%d %H:%M:%f', 'now')); END""",
+    "core_cambio_habilidad_ad": """CREATE TRIGGER core_cambio_habilidad_ad AFTER DELETE ON core_habilidad BEGIN INSERT INTO core_cambio(tabla, objeto_id, propietario_id, anterior_id, fecha) VALUES ('habilidad', old.id, NULL, NULL, strftime('%Y-%m-%d %H:%M:%f', 'now')); END""",
+    "core_cambio_habilidad_au": """CREATE TRIGGER core_cambio_habilidad_au AFTER UPDATE ON core_habilidad BEGIN INSERT INTO core_cambio(tabla, objeto_id, propietario_id, anterior_id, fecha) VALUES ('habilidad', new.id, NULL, NULL, strftime('%Y-%m-%d %H:%M:%f', 'now')); END""",
+    "core_cambio_habilidad_nombre": """CREATE TRIGGER core_cambio_habilidad_nombre AFTER UPDATE OF nombre ON core_habilidad
+        WHEN new.nombre IS NOT old.nombre BEGIN
+        INSERT INTO core_cambio(tabla, objeto_id, propietario_id, anterior_id, fecha) SELECT 'personaje', id, propietario_id, propietario_id, strftime('%Y-%m-%d %H:%M:%f', 'now') FROM core_personaje WHERE opcion_hab1_id = new.id OR opcion_hab2_id = new.id OR opcion_hab3_id = new.id OR habilidad1_id = new.id OR habilidad2_id = new.id;
+        END""",
+    "core_cambio_poder_ai": """CREATE TRIGGER core_cambio_poder_ai AFTER INSERT ON core_poder BEGIN INSERT INTO core_cambio(tabla, objeto_id, propietario_id, anterior_id, fecha) VALUES ('poder', new.id, NULL, NULL, strftime('%Y-%m-%d %H:%M:%f', 'now')); END""",
+    "core_cambio_poder_ad": """CREATE TRIGGER core_cambio_poder_ad AFTER DELETE ON core_poder BEGIN INSERT INTO core_cambio(tabla, objeto_id, propietario_id, anterior_id, fecha) VALUES ('poder', old.id, NULL, NULL, strftime('%Y-%m-%d %H:%M:%f', 'now')); END""",
+    "core_cambio_poder_au": """CREATE TRIGGER core_cambio_poder_au AFTER UPDATE ON core_poder BEGIN INSERT INTO core_cambio(tabla, objeto_id, propietario_id, anterior_id, fecha) VALUES ('poder', new.id, NULL, NULL, strftime('%Y-%m-%d %H:%M:%f', 'now')); END""",
+    "core_cambio_poder_nombre": """CREATE TRIGGER core_cambio_poder_nombre AFTER UPDATE OF nombre ON core_poder
+        WHEN new.nombre IS NOT old.nombre BEGIN
+        INSERT INTO core_cambio(tabla, objeto_id, propietario_id, anterior_id, fecha) SELECT 'personaje', id, propietario_id, propietario_id, strftime('%Y-%m-%d %H:%M:%f', 'now') FROM core_personaje WHERE poder_id = new.id;
+        END""",
+    "core_cambio_equipamiento_ai": """CREATE TRIGGER core_cambio_equipamiento_ai AFTER INSERT ON core_equipamiento BEGIN INSERT INTO core_cambio(tabla, objeto_id, propietario_id, anterior_id, fecha) VALUES ('equipamiento', new.id, NULL, NULL, strftime('%Y-%m-%d %H:%M:%f', 'now')); END""",
+    "core_cambio_equipamiento_ad": """CREATE TRIGGER core_cambio_equipamiento_ad AFTER DELETE ON core_equipamiento BEGIN INSERT INTO core_cambio(tabla, objeto_id, propietario_id, anterior_id, fecha) VALUES ('equipamiento', old.id, NULL, NULL, strftime('%Y-%m-%d %H:%M:%f', 'now')); END""",
+    "core_cambio_equipamiento_au": """CREATE TRIGGER core_cambio_equipamiento_au AFTER UPDATE ON core_equipamiento BEGIN INSERT INTO core_cambio(tabla, objeto_id, propietario_id, anterior_id, fecha) VALUES ('equipamiento', new.id, NULL, NULL, strftime('%Y-%m-%d %H:%M:%f', 'now')); END""",
+    "core_cambio_equipamiento_nombre": """CREATE TRIGGER core_cambio_equipamiento_nombre AFTER UPDATE OF nombre ON core_equipamiento
+        WHEN new.nombre IS NOT old.nombre BEGIN
+        INSERT INTO core_cambio(tabla, objeto_id, propietario_id, anterior_id, fecha) SELECT 'personaje', id, propietario_id, propietario_id, strftime('%Y-%m-%d %H:%M:%f', 'now') FROM core_personaje WHERE equipamiento_id = new.id;
+        END""",
+}
+
+
+def poner_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor == "sqlite":
+        for sql in SQL_TRIGGERS.values():
+            schema_editor.execute(sql)
+
+
+def quitar_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor == "sqlite":
+        for nombre in SQL_TRIGGERS:
+            schema_editor.execute(f"DROP TRIGGER IF EXISTS {nombre}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0011_personaje_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Cambio',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('tabla', models.CharField(choices=[('personaje', 'Personaje'), ('raza', 'Raza'), ('habilidad', 'Habilidad'), ('poder', 'Poder'), ('equipamiento', 'Equipamiento')], max_length=20)),
+                ('objeto_id', models.BigIntegerField()),
+                ('propietario_id', models.BigIntegerField(null=True)),
+                ('anterior_id', models.BigIntegerField(null=True)),
+                ('fecha', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['propietario_id', 'id'], name='core_cambio_prop_idx'), models.Index(fields=['anterior_id', 'id'], name='core_cambio_anterior_idx')],
+            },
+        ),
+        migrations.RunPython(poner_triggers, quitar_triggers),
+    ]
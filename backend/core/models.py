@@ -2,7 +2,9 @@
 # Create your models here.
 from django.contrib.auth.models import AbstractUser
 from django.db import models
+from django.db.models.functions import Lower
 from django.core.exceptions import ValidationError
+from django.utils import timezone
 
 class Usuario(AbstractUser):
     class Rol(models.TextChoices):
@@ -29,6 +31,109 @@ class Equipamiento(models.Model):
     nombre = models.CharField(max_length=50, unique=True)
     def __str__(self): return self.nombre
 
+class PersonajeQuerySet(models.QuerySet):
+    # FKs que recorre PersonajeListaSerializer (nombres de catálogo, dueño,
+    # opciones y selección de habilidades).
+    RELACIONES_LISTADO = (
+        "raza", "poder", "equipamiento", "propietario",
+        "opcion_hab1", "opcion_hab2", "opcion_hab3",
+        "habilidad1", "habilidad2",
+    )
+
+    def con_relaciones(self):
+        """
+        Resuelve con JOINs todas las relaciones del listado:
+        una página completa cuesta UNA consulta, sin importar cuántas filas tenga.
+        """
+        return self.select_related(*self.RELACIONES_LISTADO)
+
+    def visibles_para(self, usuario):
+        """GM ve todos; jugador solo los suyos."""
+        if getattr(usuario, "rol", None) == "GM":
+            return self
+        return self.filter(propietario_id=usuario.id)
+
+    def disponibles(self):
+        """Pool: personajes sin propietario."""
+        return self.filter(propietario__isnull=True)
+
+    def reclamables(self):
+        """Pool que se puede elegir: sin propietario y no muerto."""
+        return self.disponibles().exclude(estado=Personaje.Estado.MUERTO)
+
+    # ---------- Versión de fila (GET condicionales, ver core/versiones.py) ----------
+    def update(self, **kwargs):
+        """Todo UPDATE por conjunto sube `version` y fija `actualizado` en la misma sentencia."""
+        from .versiones import invalidar_coleccion
+        kwargs.setdefault("version", models.F("version") + 1)
+        kwargs.setdefault("actualizado", timezone.now())
+        filas = super().update(**kwargs)
+        if filas:
+            invalidar_coleccion()
+        return filas
+
+    update.alters_data = True
+
+    def bulk_create(self, objs, *args, **kwargs):
+        from .versiones import invalidar_coleccion
+        creados = super().bulk_create(objs, *args, **kwargs)
+        invalidar_coleccion()
+        return creados
+
+    # ---------- Acciones GM en bloque (UPDATE por conjunto) ----------
+    def subir_nivel(self):
+        """+1 nivel en SQL (F) a los que no estén muertos."""
+        return self.exclude(estado=Personaje.Estado.MUERTO).update(nivel=models.F("nivel") + 1)
+
+    def cambiar_estado(self, estado):
+        return self.update(estado=estado)
+
+    def liberar(self):
+        """Devuelve los personajes al pool."""
+        return self.update(propietario=None)
+
+    # ---------- Reclamar del pool (UPDATE condicional, sin carreras) ----------
+    def reclamar(self, pk, usuario_id):
+        """
+        Asigna `pk` a `usuario_id` solo si sigue libre y no está muerto.
+        Una única sentencia `UPDATE ... WHERE propietario IS NULL AND estado != MUERTO`:
+        la BD serializa las escrituras y el nº de filas decide quién gana.
+        """
+        if self.reclamables().filter(pk=pk).update(propietario_id=usuario_id) != 1:
+            return False
+        from .eventos import publicar_cambio
+        publicar_cambio(pk, {None, usuario_id}, "elegido")
+        return True
+
+    def reclamar_varios(self, usuario_id, cantidad, intentos=3):
+        """
+        Reclama hasta `cantidad` personajes cualesquiera de `self` (ya filtrado).
+        Cada ronda: lee candidatos libres y los reclama con un UPDATE condicional;
+        los que otro se lleva entre medias no cuentan y se reintenta con otros.
+        Devuelve la lista de ids conseguidos (puede tener menos de `cantidad`).
+        """
+        conseguidos = []
+        for _ in range(intentos):
+            faltan = cantidad - len(conseguidos)
+            if faltan <= 0:
+                break
+            candidatos = list(self.reclamables().order_by("id").values_list("id", flat=True)[:faltan])
+            if not candidatos:
+                break
+            ganados = self.model.objects.reclamables().filter(id__in=candidatos).update(propietario_id=usuario_id)
+            if ganados:
+                # Entre los candidatos (libres al leerlos), los que ahora son
+                # del usuario son exactamente los que acaba de reclamar
+                conseguidos += list(
+                    self.model.objects.filter(id__in=candidatos, propietario_id=usuario_id)
+                    .exclude(id__in=conseguidos).values_list("id", flat=True)
+                )
+        from .eventos import publicar_cambio
+        for pk in conseguidos:
+            publicar_cambio(pk, {None, usuario_id}, "elegido")
+        return conseguidos
+
+
 class Personaje(models.Model):
     class Estado(models.TextChoices):
         VIVO = "VIVO", "Vivo"
@@ -51,6 +156,28 @@ class Personaje(models.Model):
     habilidad1 = models.ForeignKey(Habilidad, null=True, blank=True, related_name='seleccion1', on_delete=models.SET_NULL)
     habilidad2 = models.ForeignKey(Habilidad, null=True, blank=True, related_name='seleccion2', on_delete=models.SET_NULL)
 
+    # Cambian en cada escritura (save() y PersonajeQuerySet.update()): ETag / Last-Modified
+    version = models.PositiveIntegerField(default=1, editable=False)
+    actualizado = models.DateTimeField(default=timezone.now, editable=False)
+
+    objects = PersonajeQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # Paginación keyset por nivel (core.pagination.PaginacionPorClave)
+            models.Index(fields=["nivel", "id"], name="core_pj_nivel_id_idx"),
+            # Listado por nivel de un jugador (propietario_id = ?) y del pool
+            # (propietario_id IS NULL): ambos son igualdad sobre la 1ª columna, así
+            # que este índice sirve a los dos sin ordenar en memoria. Por id basta
+            # el índice de la FK (SQLite añade el rowid al final).
+            models.Index(fields=["propietario", "nivel", "id"], name="core_pj_prop_nivel_idx"),
+            # Jugador: sus personajes por estado
+            models.Index(fields=["propietario", "estado"], name="core_pj_prop_estado_idx"),
+            # Filtro por estado del admin (raza ya tiene el índice de su FK)
+            models.Index(fields=["estado"], name="core_pj_estado_idx"),
+            # ?nombre= por prefijo sin distinguir mayúsculas (core.filtros.prefijo_nombre)
+            models.Index(Lower("nombre"), name="core_pj_nombre_min_idx"),
+        ]
 
     def clean(self):
         # Validar nivel
@@ -61,6 +188,22 @@ class Personaje(models.Model):
         if any(c in self.nombre for c in ["<", ">", "{", "}", ";"]):
             raise ValidationError("El nombre del personaje contiene caracteres no permitidos.")
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instancia = super().from_db(db, field_names, values)
+        # Dueño al cargar: el aviso de un cambio de dueño va al anterior y al nuevo (core.eventos)
+        instancia._propietario_cargado = instancia.__dict__.get("propietario_id")
+        return instancia
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            self.version = (self.version or 0) + 1
+        self.actualizado = timezone.now()
+        campos = kwargs.get("update_fields")
+        if campos is not None:
+            kwargs["update_fields"] = {*campos, "version", "actualizado"}
+        super().save(*args, **kwargs)
+
     def puede_editar(self):
         return self.estado != self.Estado.MUERTO
 
@@ -73,10 +216,57 @@ class AuditLog(models.Model):
     - Guarda acciones relevantes de usuarios (especialmente GM).
     - Útil para trazabilidad y cumplimiento normativo.
     """
-    usuario = models.ForeignKey(Usuario, null=True, on_delete=models.SET_NULL)
+    # Sin índice propio: lo cubre (usuario, fecha)
+    usuario = models.ForeignKey(Usuario, null=True, on_delete=models.SET_NULL, db_index=False)
     accion = models.CharField(max_length=100)  # ej: "CREAR_PERSONAJE", "CAMBIAR_ESTADO"
     detalle = models.TextField(blank=True)
-    fecha = models.DateTimeField(auto_now_add=True)
+    # default (no auto_now_add): la fecha es la de la acción, no la del
+    # bulk_create diferido de core.auditoria
+    fecha = models.DateTimeField(default=timezone.now, editable=False)
+
+    class Meta:
+        indexes = [
+            # Changelist del admin (orden por fecha) y retención (fecha < corte)
+            models.Index(fields=["fecha"], name="core_audit_fecha_idx"),
+            # Filtros del admin: por acción / por usuario, ordenados por fecha
+            models.Index(fields=["accion", "fecha"], name="core_audit_accion_fecha_idx"),
+            models.Index(fields=["usuario", "fecha"], name="core_audit_usuario_fecha_idx"),
+        ]
 
     def __str__(self):
         return f"{self.fecha} - {self.usuario} - {self.accion}"
+
+
+class Cambio(models.Model):
+    """
+    Diario de cambios para la sincronización incremental (/api/sync/, ver
+    core/sincronizacion.py). Lo escriben triggers de SQLite, no el ORM: así
+    también recoge QuerySet.update(), bulk_create() y borrados en cascada.
+    El id (AUTOINCREMENT: nunca se reutiliza) es el cursor de los clientes.
+    """
+    class Tabla(models.TextChoices):
+        PERSONAJE = "personaje", "Personaje"
+        RAZA = "raza", "Raza"
+        HABILIDAD = "habilidad", "Habilidad"
+        PODER = "poder", "Poder"
+        EQUIPAMIENTO = "equipamiento", "Equipamiento"
+
+    id = models.BigAutoField(primary_key=True)
+    tabla = models.CharField(max_length=20, choices=Tabla.choices)
+    objeto_id = models.BigIntegerField()
+    # Dueño del personaje después y antes del cambio (null = pool o catálogo).
+    # Sin FK: la entrada sobrevive al borrado del personaje o del usuario
+    propietario_id = models.BigIntegerField(null=True)
+    anterior_id = models.BigIntegerField(null=True)
+    fecha = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            # Delta de un jugador: (propietario_id = ? OR anterior_id = ?) AND id > cursor
+            # y del pool (IS NULL). El GM recorre por la PK desde el cursor
+            models.Index(fields=["propietario_id", "id"], name="core_cambio_prop_idx"),
+            models.Index(fields=["anterior_id", "id"], name="core_cambio_anterior_idx"),
+        ]
+
+    def __str__(self):
+        return f"#{self.id} {self.tabla}:{self.objeto_id}"
@@ -0,0 +1,183 @@
+import base64
+import json
+from collections import OrderedDict
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class PaginacionPorClave(BasePagination):
+    """
+    Paginación keyset (cursor) sobre (campo_de_orden, id).
+
+    - El cursor guarda la clave de la última/primera fila vista, así que cada
+      página es un `WHERE (campo, id) > (v, id) ORDER BY campo, id LIMIT n`
+      apoyado en índice: la página 10.000 cuesta lo mismo que la primera.
+    - No ejecuta COUNT(*): se pide una fila extra para saber si hay más.
+    - `?ordering=` admite solo los campos de `campos_orden` (con o sin "-").
+      El id desempata, por lo que el orden es total aunque el campo se repita.
+
+    Respuesta: {"next": url|null, "previous": url|null, "results": [...]}
+    """
+    page_size = 50
+    max_page_size = 500
+    page_size_query_param = "page_size"
+    cursor_query_param = "cursor"
+    ordering_param = "ordering"
+    # Campos NO nulos con índice (campo, id); ver Personaje.Meta.indexes.
+    # nombre: su índice UNIQUE lleva el rowid (= id) al final
+    campos_orden = ("id", "nivel", "nombre")
+    # Tipo del valor `v` que guarda el cursor para cada campo (salvo id)
+    tipos_valor = {"nivel": int, "nombre": str}
+    orden_defecto = "id"
+
+    invalid_cursor_message = "Cursor inválido."
+
+    # ---------- API de DRF ----------
+    def paginate_queryset(self, queryset, request, view=None, base_url=None):
+        """`base_url` permite que otro endpoint (p. ej. bootstrap) entregue una
+        página cuyos enlaces apunten al listado real."""
+        return self._pagina(list(self._consulta(queryset, request, base_url)))
+
+    async def apaginate_queryset(self, queryset, request, view=None, base_url=None):
+        """Igual que paginate_queryset, con el ORM asíncrono (core.vistas_asincronas)."""
+        return self._pagina([fila async for fila in self._consulta(queryset, request, base_url)])
+
+    def _consulta(self, queryset, request, base_url):
+        """Queryset de la página pedida, con una fila extra para saber si hay más."""
+        self.request = request
+        self.base_url = base_url or request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.orden = self.get_ordering(request)
+        self.campo = self.orden.lstrip("-")
+        self.descendente = self.orden.startswith("-")
+
+        cursor = self.cursor = self.decode_cursor(request)
+        atras = bool(cursor and cursor["atras"])
+
+        # Al ir hacia atrás se invierte el orden y luego se da la vuelta a la página
+        desc = self.descendente != atras
+        queryset = queryset.order_by(*self._order_by(desc))
+        if cursor is not None:
+            queryset = queryset.filter(self._despues_de(cursor["v"], cursor["id"], desc))
+        return queryset[: self.page_size + 1]
+
+    def _pagina(self, filas):
+        cursor = self.cursor
+        atras = bool(cursor and cursor["atras"])
+        hay_mas = len(filas) > self.page_size
+        filas = filas[: self.page_size]
+        if atras:
+            filas.reverse()
+            self.has_next, self.has_previous = cursor is not None, hay_mas
+        else:
+            self.has_next, self.has_previous = hay_mas, cursor is not None
+
+        self.page = filas
+        return filas
+
+    def get_paginated_data(self, data):
+        return OrderedDict([
+            ("next", self.get_next_link()),
+            ("previous", self.get_previous_link()),
+            ("results", data),
+        ])
+
+    def get_paginated_response(self, data):
+        return Response(self.get_paginated_data(data))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+    # ---------- Parámetros ----------
+    def get_page_size(self, request):
+        try:
+            valor = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return max(1, min(valor, self.max_page_size))
+
+    def get_ordering(self, request):
+        orden = request.query_params.get(self.ordering_param, self.orden_defecto)
+        if orden.lstrip("-") not in self.campos_orden:
+            raise ValidationError(
+                {self.ordering_param: f"Orden no permitido. Opciones: {', '.join(self.campos_orden)}"}
+            )
+        return orden
+
+    # ---------- Keyset ----------
+    def _order_by(self, desc):
+        signo = "-" if desc else ""
+        if self.campo == "id":
+            return [f"{signo}id"]
+        return [f"{signo}{self.campo}", f"{signo}id"]
+
+    def _despues_de(self, valor, pk, desc):
+        op = "lt" if desc else "gt"
+        if self.campo == "id":
+            return Q(**{f"id__{op}": pk})
+        # campo >= v AND (campo > v OR id > pk): la cota sobre la primera
+        # columna deja a SQLite hacer SEARCH en el índice (campo, id); con solo
+        # el OR lo recorre desde el principio
+        return Q(**{f"{self.campo}__{op}e": valor}) & (
+            Q(**{f"{self.campo}__{op}": valor}) | Q(**{f"id__{op}": pk}))
+
+    # ---------- Cursores ----------
+    def decode_cursor(self, request):
+        crudo = request.query_params.get(self.cursor_query_param)
+        if not crudo:
+            return None
+        try:
+            datos = json.loads(base64.urlsafe_b64decode(crudo.encode("ascii")))
+            cursor = {"o": datos["o"], "v": datos.get("v"), "id": int(datos["id"]), "atras": bool(datos.get("a"))}
+        except (TypeError, ValueError, KeyError):
+            raise NotFound(self.invalid_cursor_message)
+        # Un cursor solo vale para el orden con el que se generó, y su clave
+        # debe poder compararse con la columna (si no, el filtro daría un 500)
+        if cursor["o"] != self.orden or not self._clave_valida(cursor):
+            raise NotFound(self.invalid_cursor_message)
+        return cursor
+
+    def _clave_valida(self, cursor):
+        valores = [cursor["id"]]
+        if self.campo != "id":
+            tipo = self.tipos_valor[self.campo]
+            # bool es subclase de int: true/false no son un nivel
+            if type(cursor["v"]) is not tipo:
+                return False
+            valores.append(cursor["v"])
+        # Enteros de SQLite: 64 bits con signo
+        return all(-2 ** 63 <= v < 2 ** 63 for v in valores if isinstance(v, int))
+
+    def encode_cursor(self, fila, atras):
+        # fila: instancia del modelo o tupla con nombre de core.proyecciones
+        datos = {"o": self.orden, "id": fila.id}
+        if self.campo != "id":
+            datos["v"] = getattr(fila, self.campo)
+        if atras:
+            datos["a"] = 1
+        crudo = base64.urlsafe_b64encode(json.dumps(datos, separators=(",", ":")).encode()).decode("ascii")
+        return replace_query_param(self.base_url, self.cursor_query_param, crudo)
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], atras=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(self.page[0], atras=True)
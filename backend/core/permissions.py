@@ -20,3 +20,14 @@ class EsPropietarioOGM(BasePermission):
     def has_object_permission(self, request, view, obj):
         usuario = request.user
         return (getattr(usuario, "rol", None) == "GM") or (obj.propietario_id == usuario.id)
+
+
+class EsGMOStaff(BasePermission):
+    """
+    Permiso personalizado:
+    - GM o usuario staff de Django (p. ej. para métricas operativas).
+    """
+
+    def has_permission(self, request, view):
+        usuario = request.user
+        return getattr(usuario, "rol", None) == "GM" or bool(getattr(usuario, "is_staff", False))
@@ -0,0 +1,95 @@
+"""
+Camino rápido de solo lectura para los listados: el mismo JSON que los
+serializers, construido directamente desde tuplas de `values_list()`.
+
+PersonajeListaSerializer instancia un modelo (y 8 relacionados) por fila y
+pasa cada campo por la maquinaria de DRF (source="raza.nombre",
+SerializerMethodField...). Aquí cada fila es una tupla de la consulta y una
+función fija la convierte en dict, con las claves en el mismo orden y los
+mismos tipos. test_proyecciones comprueba que el JSON renderizado es
+idéntico byte a byte al del serializer.
+
+Un serializer sin proyección registrada (`para()` devuelve None) sigue por
+el camino normal. Al cambiar los campos de un serializer registrado hay que
+cambiar su proyección: el test de contrato lo detecta.
+"""
+from .serializers import (
+    EquipamientoSerializer,
+    HabilidadSerializer,
+    PersonajeListaSerializer,
+    PoderSerializer,
+    RazaSerializer,
+)
+
+
+class Proyeccion:
+    """`columnas` para values_list(); `construir(fila) -> dict` con la forma del serializer."""
+
+    def __init__(self, columnas, construir):
+        self.columnas = tuple(columnas)
+        self.construir = construir
+
+    def consulta(self, queryset, extra=()):
+        # named=True: el paginador por cursor lee fila.id / fila.nivel / fila.nombre.
+        # `extra`: columnas al final de la tupla que `construir` no mira (p. ej. version)
+        return queryset.values_list(*self.columnas, *extra, named=True)
+
+    def filas(self, filas):
+        construir = self.construir
+        return [construir(f) for f in filas]
+
+    def datos(self, queryset):
+        return self.filas(self.consulta(queryset))
+
+    async def adatos(self, queryset):
+        construir = self.construir
+        return [construir(f) async for f in self.consulta(queryset)]
+
+
+# ---------- Personaje (PersonajeListaSerializer) ----------
+COLUMNAS_PERSONAJE = (
+    "id", "nombre", "nivel", "estado",
+    "raza__nombre", "poder__nombre", "equipamiento__nombre", "propietario__username",
+    "opcion_hab1_id", "opcion_hab1__nombre",
+    "opcion_hab2_id", "opcion_hab2__nombre",
+    "opcion_hab3_id", "opcion_hab3__nombre",
+    "habilidad1_id", "habilidad1__nombre",
+    "habilidad2_id", "habilidad2__nombre",
+)
+_CLAVES_PERSONAJE = (
+    "id", "nombre", "nivel", "estado",
+    "raza_nombre", "poder_nombre", "equipamiento_nombre", "propietario_username",
+)
+# Sin propietario, DRF omite propietario_username (source="propietario.username"
+# sobre None -> SkipField): la clave no aparece, no vale null
+_CLAVES_PERSONAJE_POOL = _CLAVES_PERSONAJE[:-1]
+_OPCIONES = (8, 10, 12)
+_SELECCION = (14, 16)
+
+
+def _personaje(f):
+    d = dict(zip(_CLAVES_PERSONAJE if f[7] is not None else _CLAVES_PERSONAJE_POOL, f))
+    d["opciones"] = [{"id": f[i], "nombre": f[i + 1]} for i in _OPCIONES if f[i] is not None]
+    d["seleccion"] = [{"id": f[i], "nombre": f[i + 1]} for i in _SELECCION if f[i] is not None]
+    return d
+
+
+def _catalogo(f):
+    return {"id": f[0], "nombre": f[1]}
+
+
+PERSONAJE_LISTA = Proyeccion(COLUMNAS_PERSONAJE, _personaje)
+CATALOGO = Proyeccion(("id", "nombre"), _catalogo)
+
+PROYECCIONES = {
+    PersonajeListaSerializer: PERSONAJE_LISTA,
+    RazaSerializer: CATALOGO,
+    HabilidadSerializer: CATALOGO,
+    PoderSerializer: CATALOGO,
+    EquipamientoSerializer: CATALOGO,
+}
+
+
+def para(serializer_class):
+    """Proyección equivalente al serializer, o None si no la hay."""
+    return PROYECCIONES.get(serializer_class)
@@ -72,8 +72,9 @@ class PersonajeSerializer(serializers.ModelSerializer):
     def create(self, validados):
         req = self.context.get("request")
         usuario = getattr(req, "user", None)
-        propietario = None if getattr(usuario, "rol", None) == "GM" else usuario
-        pj = Personaje.objects.create(propietario=propietario, **validados)
+        # request.user puede ser un UsuarioToken (sin fila cargada): se usa el id
+        propietario_id = None if getattr(usuario, "rol", None) == "GM" else usuario.id
+        pj = Personaje.objects.create(propietario_id=propietario_id, **validados)
         return pj
     
     def validate_nombre(self, value):
@@ -147,6 +148,28 @@ class ElegirHabilidadesSerializer(serializers.Serializer):
         return personaje
 
 
+class AccionMasivaSerializer(serializers.Serializer):
+    """
+    Entrada de /personajes/bulk/: una acción GM sobre una lista de ids.
+    {"ids": [1, 2, ...], "accion": "subir_nivel"|"cambiar_estado"|"liberar", "estado": "..."}
+    """
+    ACCIONES = ("subir_nivel", "cambiar_estado", "liberar")
+    MAX_IDS = 1000
+
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1), allow_empty=False, max_length=MAX_IDS
+    )
+    accion = serializers.ChoiceField(choices=ACCIONES)
+    estado = serializers.ChoiceField(choices=Personaje.Estado.choices, required=False)
+
+    def validate(self, data):
+        if data["accion"] == "cambiar_estado" and "estado" not in data:
+            raise serializers.ValidationError({"estado": "Obligatorio para cambiar_estado."})
+        # Sin duplicados, conservando el orden recibido
+        data["ids"] = list(dict.fromkeys(data["ids"]))
+        return data
+
+
 class PersonajeOpcionesSerializer(serializers.ModelSerializer):
     """
     GM fija las 3 opciones de habilidades por personaje.
@@ -0,0 +1,203 @@
+"""
+Sincronización incremental: GET /api/sync/?since=<cursor>.
+
+El frontend guarda sus listados (personajes, pool y, si es GM, catálogos) y
+el cursor de la última respuesta; con `since` recibe solo lo que cambió
+después: filas nuevas o modificadas y "borrados" (ids que ya no debe tener en
+esa sección: eliminados o personajes que dejaron de ser suyos / del pool).
+
+- Diario: tabla core_cambio (modelo Cambio) que rellenan triggers de SQLite
+  en cada INSERT/UPDATE/DELETE de personajes y catálogos, así que no se
+  escapan QuerySet.update(), bulk_create() ni los borrados en cascada. Cada
+  entrada guarda el dueño antes y después: un cambio de dueño llega a los dos
+  (al anterior como borrado). Renombrar un catálogo o un usuario apunta
+  también los personajes que muestran ese nombre.
+- Cursor = id del diario (AUTOINCREMENT). SQLite serializa las escrituras:
+  los ids se asignan en orden de COMMIT y un cursor nunca se salta una
+  entrada que se confirme después.
+- Coste: con un cursor válido, O(cambios): un rango de índice en el diario y
+  una consulta por id para las filas afectadas. Sin cursor, con uno anterior
+  a lo que conserva el diario (`podar`) o posterior a su final (otra BD), la
+  respuesta es `reset`: listados que sustituyen a los del cliente. Personajes
+  y disponibles llegan como primera página (PaginacionPorClave, como
+  bootstrap) con `siguiente`, la URL del listado real para pedir el resto;
+  los catálogos, enteros (pocas filas y en caché). El cursor se toma antes de
+  leer: lo que cambie mientras el cliente pagina llega en el siguiente delta.
+- Como mucho SYNC_LIMITE entradas por respuesta; si hay más, `mas: true` y
+  el cliente repite con el cursor devuelto.
+
+Las filas tienen la forma de los listados (core.proyecciones). Los triggers
+los crea la migración 0012_cambio (SQL congelado en ella) y solo existen en
+SQLite: en otro motor toda respuesta es `reset`. Igual que los de
+core.busqueda, no sobreviven a una migración que rehaga la tabla: envolverla
+con `quitar_triggers` / `poner_triggers` de 0012_cambio.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.models import Q
+from django.urls import reverse
+from django.utils import timezone
+
+from . import catalogos, proyecciones
+from .models import Cambio, Equipamiento, Habilidad, Personaje, Poder, Raza
+from .pagination import PaginacionPorClave
+from .serializers import EquipamientoSerializer, HabilidadSerializer, PoderSerializer, RazaSerializer
+
+# tabla del diario -> (clave en la respuesta, modelo, serializer)
+CATALOGOS = {
+    Cambio.Tabla.RAZA: ("razas", Raza, RazaSerializer),
+    Cambio.Tabla.HABILIDAD: ("habilidades", Habilidad, HabilidadSerializer),
+    Cambio.Tabla.PODER: ("poderes", Poder, PoderSerializer),
+    Cambio.Tabla.EQUIPAMIENTO: ("equipamientos", Equipamiento, EquipamientoSerializer),
+}
+
+
+# ---------- Consultas ----------
+# alias de BD -> ¿hay triggers que alimenten el diario? (se mira una vez por proceso)
+_disponible = {}
+
+
+def diario_disponible(using=DEFAULT_DB_ALIAS):
+    if using not in _disponible:
+        conexion = connections[using]
+        disponible = False
+        if conexion.vendor == "sqlite":
+            with conexion.cursor() as c:
+                c.execute("SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name = %s",
+                          ["core_cambio_pj_au"])
+                disponible = c.fetchone() is not None
+        _disponible[using] = disponible
+    return _disponible[using]
+
+
+def _limites(diario):
+    """(primer id, último id) del diario; (None, 0) si está vacío."""
+    primero = diario.order_by("id").values_list("id", flat=True).first()
+    ultimo = diario.order_by("-id").values_list("id", flat=True).first()
+    return primero, ultimo or 0
+
+
+def cursor_valido(since, primero, ultimo):
+    """Lo posterior a `since` sigue entero en el diario (nada podado) y `since` no es de otra BD."""
+    if since > ultimo:
+        return False
+    return primero is None or since >= primero - 1
+
+
+def _seccion(cambiados=(), borrados=()):
+    return {"cambiados": list(cambiados), "borrados": sorted(borrados)}
+
+
+def _filas(queryset, ids):
+    """Filas actuales (forma del listado) de los `ids` que siguen en `queryset`, y los que no."""
+    if not ids:
+        return _seccion()
+    datos = proyecciones.PERSONAJE_LISTA.datos(queryset.filter(id__in=ids).order_by("id"))
+    return _seccion(datos, set(ids) - {d["id"] for d in datos})
+
+
+def _primera_pagina(request, queryset, nombre_url):
+    """Sección con la página 1 del listado `nombre_url` y `siguiente` (URL del resto o None)."""
+    paginador = PaginacionPorClave()
+    base_url = request.build_absolute_uri(reverse(nombre_url))
+    # ?page_size= y ?ordering= valen también para las páginas siguientes; since no
+    parametros = request.GET.copy()
+    parametros.pop("since", None)
+    if parametros:
+        base_url += "?" + parametros.urlencode()
+    proyeccion = proyecciones.PERSONAJE_LISTA
+    pagina = paginador.paginate_queryset(proyeccion.consulta(queryset), request, base_url=base_url)
+    return {**_seccion(proyeccion.filas(pagina)), "siguiente": paginador.get_next_link()}
+
+
+def _completo(request, con_catalogos, using):
+    base = Personaje.objects.using(using)
+    return {
+        "personajes": _primera_pagina(request, base.visibles_para(request.user), "personaje-list"),
+        "disponibles": _primera_pagina(request, base.disponibles(), "personaje-disponibles"),
+        "catalogos": {
+            nombre: _seccion(catalogos.listado(modelo, serializer))
+            for nombre, modelo, serializer in CATALOGOS.values()
+        } if con_catalogos else None,
+    }
+
+
+def sincronizar(request, since=None, con_catalogos=False):
+    """
+    Respuesta de /api/sync/ para `request.user` desde el cursor `since` (None = reset).
+    Lee siempre de la primaria: diario y filas deben venir de la misma BD.
+    """
+    usuario = request.user
+    using = DEFAULT_DB_ALIAS
+    diario = Cambio.objects.using(using)
+    primero, ultimo = _limites(diario)
+    if not diario_disponible(using) or since is None or not cursor_valido(since, primero, ultimo):
+        # Cursor tomado ANTES de leer: lo que cambie mientras se repite en la siguiente
+        return {"cursor": ultimo, "reset": True, "mas": False, **_completo(request, con_catalogos, using)}
+
+    es_gm = getattr(usuario, "rol", None) == "GM"
+    entradas = diario.filter(id__gt=since, id__lte=ultimo)
+    if not con_catalogos:
+        entradas = entradas.filter(tabla=Cambio.Tabla.PERSONAJE)
+    if not es_gm:
+        # Suyos (antes o después) y del pool (antes o después)
+        entradas = entradas.filter(
+            Q(propietario_id=usuario.id) | Q(anterior_id=usuario.id)
+            | Q(propietario_id__isnull=True) | Q(anterior_id__isnull=True)
+        )
+    limite = getattr(settings, "SYNC_LIMITE", 500)
+    entradas = list(entradas.order_by("id").values_list("id", "tabla", "objeto_id", "propietario_id", "anterior_id")
+                    [:limite + 1])
+    mas = len(entradas) > limite
+    entradas = entradas[:limite]
+
+    suyos, pool, por_catalogo = set(), set(), {tabla: set() for tabla in CATALOGOS}
+    for _, tabla, objeto_id, propietario_id, anterior_id in entradas:
+        if tabla != Cambio.Tabla.PERSONAJE:
+            por_catalogo[tabla].add(objeto_id)
+            continue
+        if es_gm or usuario.id in (propietario_id, anterior_id):
+            suyos.add(objeto_id)
+        if propietario_id is None or anterior_id is None:
+            pool.add(objeto_id)
+
+    base = Personaje.objects.using(using)
+    respuesta = {
+        "cursor": entradas[-1][0] if mas else ultimo,
+        "reset": False,
+        "mas": mas,
+        "personajes": _filas(base.visibles_para(usuario), suyos),
+        "disponibles": _filas(base.disponibles(), pool),
+        "catalogos": None,
+    }
+    if con_catalogos:
+        respuesta["catalogos"] = {}
+        for tabla, (nombre, modelo, _) in CATALOGOS.items():
+            ids = por_catalogo[tabla]
+            datos = proyecciones.CATALOGO.datos(
+                modelo.objects.using(using).filter(id__in=ids).order_by("id")) if ids else []
+            respuesta["catalogos"][nombre] = _seccion(datos, ids - {d["id"] for d in datos})
+    return respuesta
+
+
+# ---------- Retención ----------
+def podar(dias=None):
+    """
+    Borra las entradas de más de SYNC_RETENCION_DIAS (o `dias`). Conserva
+    siempre la última: así el diario sabe hasta dónde llegó y un cursor al día
+    sigue siendo válido. Un cliente con un cursor podado recibe `reset`.
+    """
+    dias = dias if dias is not None else getattr(settings, "SYNC_RETENCION_DIAS", 30)
+    ultimo = Cambio.objects.order_by("-id").values_list("id", flat=True).first()
+    if ultimo is None:
+        return 0
+    # Siempre un prefijo por id (aunque el reloj haya ido hacia atrás): así
+    # basta el primer id conservado para saber qué cursores siguen valiendo
+    corte = timezone.now() - timedelta(days=dias)
+    hasta = Cambio.objects.filter(fecha__lt=corte, id__lt=ultimo).order_by("-id").values_list("id", flat=True).first()
+    if hasta is None:
+        return 0
+    borradas, _ = Cambio.objects.filter(id__lte=hasta).delete()
+    return borradas
@@ -0,0 +1,83 @@
+"""
+Perfil de producción para SQLite: PRAGMAs al abrir cada conexión.
+
+- WAL (solo con SQLITE_WAL=True: queda grabado en el fichero): los lectores
+  no se bloquean mientras el GM escribe (y viceversa).
+- synchronous=NORMAL (junto con WAL): seguro ante caídas del proceso; solo se
+  hace fsync en los checkpoints, no en cada commit.
+- busy_timeout: espera al cerrojo de escritura en vez de fallar al instante.
+- mmap_size / cache_size / temp_store: lecturas y ordenaciones en memoria.
+
+Los valores salen de settings.SQLITE_PRAGMAS (vacío = SQLite de serie) y se
+aplican en la señal `connection_created`; con CONN_MAX_AGE la conexión se
+reutiliza entre peticiones y el coste es una vez por conexión, no por petición.
+`python manage.py comprobar_sqlite` verifica que están aplicados.
+
+`replicar()` es el sustituto local de la replicación (réplicas de lectura de
+core.enrutador): copia la BD primaria sobre un fichero réplica.
+"""
+import sqlite3
+
+from django.conf import settings
+from django.db.backends.signals import connection_created
+
+# Cómo devuelve SQLite los valores que se fijan por nombre
+_NOMBRES = {
+    "synchronous": {"OFF": 0, "NORMAL": 1, "FULL": 2, "EXTRA": 3},
+    "temp_store": {"DEFAULT": 0, "FILE": 1, "MEMORY": 2},
+}
+
+
+def pragmas():
+    return dict(getattr(settings, "SQLITE_PRAGMAS", {}) or {})
+
+
+def aplicar(conexion, valores):
+    """Fija los PRAGMAs en una conexión sqlite3 (DB-API, sin pasar por el cursor de Django)."""
+    for nombre, valor in valores.items():
+        conexion.execute(f"PRAGMA {nombre}={valor}")
+
+
+def leer(conexion, nombres):
+    """Valor actual de cada PRAGMA (None si no aplica, p. ej. mmap_size en memoria)."""
+    filas = {n: conexion.execute(f"PRAGMA {n}").fetchone() for n in nombres}
+    return {n: fila[0] if fila else None for n, fila in filas.items()}
+
+
+def esperado(nombre, valor, en_memoria=False):
+    """Valor que devolverá `PRAGMA nombre` tras fijarlo a `valor`."""
+    if nombre == "journal_mode":
+        # Una BD en memoria (tests) no admite WAL: siempre responde "memory"
+        return "memory" if en_memoria else str(valor).lower()
+    if nombre in _NOMBRES and isinstance(valor, str):
+        return _NOMBRES[nombre][valor.upper()]
+    return int(valor) if str(valor).lstrip("-").isdigit() else valor
+
+
+def diferencias(conexion, valores, en_memoria=False):
+    """[(pragma, esperado, actual)] de los que no coinciden."""
+    actuales = leer(conexion, valores)
+    return [
+        (n, esperado(n, v, en_memoria), actuales[n])
+        for n, v in valores.items()
+        if actuales[n] != esperado(n, v, en_memoria) and not (en_memoria and actuales[n] is None)
+    ]
+
+
+def replicar(origen, destino):
+    """Copia consistente de `origen` sobre `destino` (API de backup de SQLite)."""
+    src, dst = sqlite3.connect(origen), sqlite3.connect(destino)
+    try:
+        src.backup(dst)
+    finally:
+        dst.close()
+        src.close()
+
+
+def _al_conectar(sender, connection, **kwargs):
+    if connection.vendor == "sqlite":
+        aplicar(connection.connection, pragmas())
+
+
+def conectar_senales():
+    connection_created.connect(_al_conectar, dispatch_uid="sqlite_pragmas")
@@ -3,14 +3,54 @@ import pytest
 from django.contrib.auth import get_user_model
 from rest_framework.test import APIClient
 from model_bakery import baker
-from rest_framework_simplejwt.tokens import RefreshToken
+from core.autenticacion import tokens_para
 
 User = get_user_model()
 
+@pytest.fixture(scope="session", autouse=True)
+def cache_aislada(tmp_path_factory):
+    """FileBasedCache en un directorio de la sesión, no en el de runserver."""
+    from django.conf import settings
+    from django.test.utils import override_settings
+    caches = {alias: {**conf, "LOCATION": str(tmp_path_factory.mktemp(f"cache-{alias}"))}
+              for alias, conf in settings.CACHES.items()}
+    with override_settings(CACHES=caches):
+        yield
+
+@pytest.fixture(autouse=True)
+def cache_limpia(cache_aislada):
+    """La caché es compartida (FileBasedCache): cada test parte de cero."""
+    from django.core.cache import caches
+    for c in caches.all():
+        c.clear()
+    yield
+    for c in caches.all():
+        c.clear()
+
+@pytest.fixture(autouse=True)
+def auditoria_sincrona(settings):
+    """En tests la auditoría se escribe en el momento (sin hilo de fondo)."""
+    settings.AUDITORIA_ASINCRONA = False
+
+@pytest.fixture(autouse=True)
+def axes_sincrono(settings):
+    """Resúmenes de axes escritos en el momento (sin hilo de fondo)."""
+    settings.AXES_RESUMEN_INTERVALO = 0
+
+@pytest.fixture(autouse=True)
+def throttle_aislado(settings, tmp_path):
+    """Cubos de throttling en un SQLite propio de cada test."""
+    settings.THROTTLE_DB = str(tmp_path / "throttle.sqlite3")
+
+@pytest.fixture(autouse=True)
+def eventos_aislados(settings, tmp_path):
+    """Fichero de eventos entre procesos propio de cada test."""
+    settings.EVENTOS_FICHERO = str(tmp_path / "eventos.ndjson")
+
 # ---------- Utilidades de autenticación ----------
 def _access_token_for(user):
-    """Genera un token de acceso (SimpleJWT) para un usuario dado."""
-    return str(RefreshToken.for_user(user).access_token)
+    """Token de acceso como el de /auth/login/ (claims de rol: sin consulta de usuario)."""
+    return tokens_para(user)["access"]
 
 @pytest.fixture
 def api_client():
@@ -130,3 +170,29 @@ def personaje_de_jugador(catalogos, jugador):
         equipamiento=equipo,
     )
     return pj
+
+# ---------- Volumen (consultas / rendimiento) ----------
+@pytest.fixture
+def crear_personajes(db, catalogos):
+    """
+    Fábrica que inserta N personajes con TODAS las FKs del listado rellenas
+    (opciones y selección incluidas), para que cualquier N+1 se note.
+    Uso: crear_personajes(1000, propietario=jugador)
+    """
+    from core.models import Personaje
+
+    def _make(n, propietario=None, prefijo="PJ-Masa-", **extra):
+        habs = catalogos["habilidades"]
+        datos = dict(
+            raza=catalogos["razas"][0],
+            poder=catalogos["poderes"][0],
+            equipamiento=catalogos["equipos"][0],
+            opcion_hab1=habs[0], opcion_hab2=habs[1], opcion_hab3=habs[2],
+            habilidad1=habs[0], habilidad2=habs[1],
+        )
+        datos.update(extra)
+        return Personaje.objects.bulk_create(
+            [Personaje(propietario=propietario, nombre=f"{prefijo}{i}", **datos) for i in range(n)],
+            batch_size=2000,
+        )
+    return _make
@@ -0,0 +1,197 @@
+import gzip
+import io
+import json
+import threading
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+import pytest
+from django.core.management import call_command
+from django.db import transaction
+from django.urls import reverse
+from django.utils import timezone
+
+from core.auditoria import EscritorAuditoria, archivar, consultar
+from core.models import AuditLog
+
+
+class Sumidero:
+    """Sustituye a bulk_create: guarda los lotes recibidos."""
+    def __init__(self, retardo=0.0):
+        self.lotes = []
+        self.retardo = retardo
+        self.lock = threading.Lock()
+
+    def __call__(self, entradas):
+        time.sleep(self.retardo)
+        with self.lock:
+            self.lotes.append(list(entradas))
+
+    @property
+    def total(self):
+        return sum(len(x) for x in self.lotes)
+
+
+def test_escritor_vacia_por_tamano_de_lote():
+    sumidero = Sumidero()
+    w = EscritorAuditoria(guardar=sumidero, lote=10, intervalo=60)
+    for i in range(25):
+        w.registrar(i)
+    w.vaciar()
+    w.cerrar()
+    assert sumidero.total == 25
+    # Dos lotes llenos por tamaño + el resto al vaciar
+    assert [len(x) for x in sumidero.lotes] == [10, 10, 5]
+
+
+def test_escritor_vacia_por_tiempo():
+    sumidero = Sumidero()
+    w = EscritorAuditoria(guardar=sumidero, lote=1000, intervalo=0.05)
+    w.registrar("a")
+    fin = time.monotonic() + 2
+    while not sumidero.total and time.monotonic() < fin:
+        time.sleep(0.01)
+    w.cerrar()
+    assert sumidero.lotes == [["a"]]
+
+
+def test_escritor_contrapresion_escribe_sincrono_sin_perder():
+    # Cola de 2 y un consumidor lento: los productores acaban escribiendo ellos
+    sumidero = Sumidero(retardo=0.05)
+    w = EscritorAuditoria(guardar=sumidero, max_cola=2, lote=1, intervalo=60, espera=0.001)
+    for i in range(20):
+        w.registrar(i)
+    w.cerrar()
+    assert w.sincronas > 0
+    assert sorted(x for lote in sumidero.lotes for x in lote) == list(range(20))
+
+
+def test_escritor_cerrar_escribe_lo_pendiente():
+    sumidero = Sumidero()
+    w = EscritorAuditoria(guardar=sumidero, lote=1000, intervalo=60)
+    for i in range(7):
+        w.registrar(i)
+    w.cerrar()
+    assert sumidero.total == 7
+    assert w.escritas == 7
+
+
+def test_escritor_sobrevive_a_fallos_de_bd():
+    sumidero = Sumidero()
+    fallos = {"n": 4}  # dos lotes fallidos (cada uno con su reintento)
+
+    def guardar(entradas):
+        if fallos["n"]:
+            fallos["n"] -= 1
+            raise RuntimeError("BD caída")
+        sumidero(entradas)
+
+    w = EscritorAuditoria(guardar=guardar, lote=1000, intervalo=60)
+    for i in range(5):
+        w.registrar(i)
+    w.vaciar(timeout=1)  # falla, pero no deja colgado a quien espera
+    assert w._vivo() and w.fallos == 1 and sumidero.total == 0
+    w.registrar(5)
+    w.vaciar(timeout=1)
+    w.vaciar(timeout=1)  # ya escribe: nada se perdió
+    w.cerrar()
+    assert sorted(x for lote in sumidero.lotes for x in lote) == list(range(6))
+
+
+@pytest.mark.django_db(transaction=True)
+def test_auditoria_asincrona_espera_al_commit(settings, gm, monkeypatch):
+    from django.db import transaction
+    from core import auditoria
+
+    settings.AUDITORIA_ASINCRONA = True
+    encoladas = []
+    monkeypatch.setattr(auditoria._escritor, "registrar_varios", encoladas.extend)
+    with pytest.raises(RuntimeError):
+        with transaction.atomic():
+            auditoria.registrar(gm, "BULK", "deshecho")
+            raise RuntimeError
+    assert encoladas == []
+    with transaction.atomic():
+        auditoria.registrar(gm, "BULK", "confirmado")
+        assert encoladas == []
+    assert [e.detalle for e in encoladas] == ["confirmado"]
+
+
+@pytest.mark.django_db
+def test_acciones_gm_registran_auditoria(gm, gm_client, personaje_de_jugador):
+    pj = personaje_de_jugador
+    assert gm_client.post(reverse("personaje-subir-nivel", args=[pj.id])).status_code == 200
+    assert gm_client.post(reverse("personaje-cambiar-estado", args=[pj.id]), {"estado": "CONGELADO"}, format="json").status_code == 200
+    assert gm_client.post(reverse("personaje-liberar", args=[pj.id])).status_code == 200
+    acciones = list(AuditLog.objects.order_by("id").values_list("usuario_id", "accion"))
+    assert acciones == [(gm.id, "SUBIR_NIVEL"), (gm.id, "CAMBIAR_ESTADO"), (gm.id, "LIBERAR_PERSONAJE")]
+
+
+# ---------- Retención y archivo ----------
+def _entradas_en(usuario, fechas, accion="SUBIR_NIVEL"):
+    return AuditLog.objects.bulk_create(
+        [AuditLog(usuario=usuario, accion=accion, detalle=f"d{i}", fecha=f) for i, f in enumerate(fechas)]
+    )
+
+
+@pytest.mark.django_db
+def test_archivar_mueve_lo_antiguo_a_ficheros_por_mes(gm, tmp_path, django_capture_on_commit_callbacks):
+    viejas = [datetime(2024, 1, 10, tzinfo=dt_timezone.utc), datetime(2024, 2, 3, tzinfo=dt_timezone.utc)]
+    nueva = timezone.now()
+    _entradas_en(gm, viejas + [nueva])
+
+    with django_capture_on_commit_callbacks(execute=True):
+        n = archivar(datetime(2025, 1, 1, tzinfo=dt_timezone.utc), directorio=tmp_path, lote=1)
+    assert n == 2
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["2024-01.ndjson.gz", "2024-02.ndjson.gz"]
+    assert list(AuditLog.objects.values_list("fecha", flat=True)) == [nueva]
+    with gzip.open(tmp_path / "2024-01.ndjson.gz", "rt") as f:
+        fila = json.loads(f.readline())
+    assert fila["usuario"] == gm.username and fila["accion"] == "SUBIR_NIVEL"
+
+
+@pytest.mark.django_db
+def test_archivar_deshecho_no_toca_el_archivo(gm, tmp_path, django_capture_on_commit_callbacks):
+    _entradas_en(gm, [datetime(2024, 1, d, tzinfo=dt_timezone.utc) for d in (1, 2)])
+    corte = datetime(2025, 1, 1, tzinfo=dt_timezone.utc)
+    with django_capture_on_commit_callbacks(execute=True):
+        with pytest.raises(RuntimeError), transaction.atomic():
+            archivar(corte, directorio=tmp_path)
+            raise RuntimeError("rollback")
+    assert AuditLog.objects.count() == 2
+    assert list(tmp_path.glob("*.ndjson.gz")) == []
+
+    # La siguiente pasada archiva cada fila una sola vez
+    with django_capture_on_commit_callbacks(execute=True):
+        assert archivar(corte, directorio=tmp_path) == 2
+    assert len(list(consultar(directorio=tmp_path))) == 2
+
+
+@pytest.mark.django_db
+def test_consultar_une_archivo_y_tabla(gm, jugador, tmp_path, django_capture_on_commit_callbacks):
+    _entradas_en(gm, [datetime(2024, 3, d, tzinfo=dt_timezone.utc) for d in (1, 2)])
+    _entradas_en(jugador, [datetime(2024, 3, 5, tzinfo=dt_timezone.utc)], accion="LIBERAR_PERSONAJE")
+    with django_capture_on_commit_callbacks(execute=True):
+        archivar(datetime(2024, 3, 3, tzinfo=dt_timezone.utc), directorio=tmp_path)
+    _entradas_en(gm, [datetime(2024, 3, 9, tzinfo=dt_timezone.utc)])
+
+    todas = list(consultar(directorio=tmp_path))
+    assert [d["fecha"][:10] for d in todas] == ["2024-03-01", "2024-03-02", "2024-03-05", "2024-03-09"]
+
+    desde = datetime(2024, 3, 2, tzinfo=dt_timezone.utc)
+    hasta = datetime(2024, 3, 9, tzinfo=dt_timezone.utc)
+    assert len(list(consultar(desde=desde, hasta=hasta, directorio=tmp_path))) == 2
+    # Fechas sin zona: en la del proyecto (UTC), sin TypeError al comparar
+    assert len(list(consultar(desde=desde.replace(tzinfo=None), hasta=hasta.replace(tzinfo=None),
+                              directorio=tmp_path))) == 2
+    assert [d["usuario"] for d in consultar(accion="LIBERAR_PERSONAJE", directorio=tmp_path)] == [jugador.username]
+    assert len(list(consultar(usuario_id=gm.id, directorio=tmp_path))) == 3
+
+
+@pytest.mark.django_db
+def test_comando_archivar_auditoria_aplica_retencion(gm, tmp_path, django_capture_on_commit_callbacks):
+    _entradas_en(gm, [timezone.now() - timedelta(days=400), timezone.now()])
+    with django_capture_on_commit_callbacks(execute=True):
+        call_command("archivar_auditoria", "--dias", "30", "--dir", str(tmp_path), stdout=io.StringIO())
+    assert AuditLog.objects.count() == 1
+    assert len(list(consultar(directorio=tmp_path))) == 2
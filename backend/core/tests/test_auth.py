@@ -0,0 +1,133 @@
+import pytest
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+
+
+def _cliente(token):
+    c = APIClient()
+    c.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+    return c
+
+
+# ---------- Emisión de tokens con claims ----------
+@pytest.mark.django_db
+def test_login_emite_claims_de_rol(gm, password_valida):
+    r = APIClient().post(reverse("token_obtain_pair"), {"username": gm.username, "password": password_valida})
+    assert r.status_code == 200, r.content
+    for clave in ("access", "refresh"):
+        token = AccessToken(r.json()["access"]) if clave == "access" else RefreshToken(r.json()["refresh"])
+        assert token["username"] == gm.username
+        assert token["rol"] == "GM"
+        assert token["is_staff"] is False
+
+
+@pytest.mark.django_db
+def test_registro_emite_claims_y_el_token_sirve_sin_consultas(django_assert_num_queries):
+    r = APIClient().post(
+        reverse("auth-register"),
+        {"username": "nuevo", "email": "n@x.com", "password": "Passw0rd!xyz", "password2": "Passw0rd!xyz"},
+        format="json",
+    )
+    assert r.status_code == 201, r.content
+    access = r.json()["tokens"]["access"]
+    assert AccessToken(access)["rol"] == "JUGADOR"
+    with django_assert_num_queries(0):
+        yo = _cliente(access).get("/api/yo/")
+    assert yo.json() == {"id": r.json()["user"]["id"], "usuario": "nuevo", "rol": "JUGADOR"}
+
+
+# ---------- Usuario desde claims ----------
+@pytest.mark.django_db
+def test_jugador_crea_personaje_con_usuario_del_token(jugador, jugador_client, catalogos):
+    r = jugador_client.post(reverse("personaje-list"), {
+        "nombre": "Desde token", "raza": catalogos["razas"][0].id,
+        "poder": catalogos["poderes"][0].id, "equipamiento": catalogos["equipos"][0].id,
+    }, format="json")
+    assert r.status_code == 201, r.content
+    assert r.json()["propietario"] == jugador.id
+
+
+@pytest.mark.django_db
+def test_token_sin_claims_carga_el_usuario(jugador, django_assert_num_queries):
+    # Tokens emitidos antes de los claims: se sigue buscando el usuario en la BD
+    c = _cliente(RefreshToken.for_user(jugador).access_token)
+    with django_assert_num_queries(1):
+        r = c.get("/api/yo/")
+    assert r.json()["rol"] == "JUGADOR"
+
+
+# ---------- Revocación ----------
+@pytest.mark.django_db
+def test_usuario_desactivado_pierde_acceso_al_momento(jugador, jugador_client):
+    assert jugador_client.get("/api/yo/").status_code == 200
+    jugador.is_active = False
+    jugador.save()
+    assert jugador_client.get("/api/yo/").status_code == 401
+
+
+@pytest.mark.django_db
+def test_cambio_de_rol_invalida_el_token(jugador, jugador_client):
+    jugador.rol = "GM"
+    jugador.save()
+    assert jugador_client.get("/api/yo/").status_code == 401
+
+
+@pytest.mark.django_db
+def test_quitar_is_staff_invalida_el_token(jugador, auth_client):
+    jugador.is_staff = True
+    jugador.save()
+    c = auth_client(jugador)
+    assert c.get(reverse("metricas")).status_code == 200
+    jugador.is_staff = False
+    jugador.save()
+    assert c.get(reverse("metricas")).status_code == 401
+
+
+@pytest.mark.django_db
+def test_revocacion_por_ttl_cubre_cambios_sin_senal(jugador, jugador_client, django_assert_num_queries):
+    from django.core.cache import cache
+    from core.models import Usuario
+    # update() no dispara post_save: la caché expira y se vuelve a consultar
+    Usuario.objects.filter(pk=jugador.pk).update(is_active=False)
+    cache.clear()
+    with django_assert_num_queries(1):
+        assert jugador_client.get("/api/yo/").status_code == 401
+
+
+@pytest.mark.django_db
+def test_revocacion_desactivada_con_ttl_cero(settings, jugador, jugador_client):
+    settings.JWT_REVOCACION_TTL = 0
+    jugador.is_active = False
+    jugador.save()
+    # Sin comprobación: el token vale hasta que caduque
+    assert jugador_client.get("/api/yo/").status_code == 200
+
+
+# ---------- Renovación ----------
+@pytest.mark.django_db
+def test_refresh_reemite_los_claims_vigentes(jugador, password_valida):
+    login = APIClient().post(reverse("token_obtain_pair"),
+                             {"username": jugador.username, "password": password_valida}).json()
+    jugador.rol = "GM"
+    jugador.is_staff = True
+    jugador.save()
+    r = APIClient().post(reverse("token_refresh"), {"refresh": login["refresh"]})
+    assert r.status_code == 200, r.content
+    access = AccessToken(r.json()["access"])
+    assert (access["rol"], access["is_staff"]) == ("GM", True)
+    assert _cliente(r.json()["access"]).get(reverse("metricas")).status_code == 200
+
+
+@pytest.mark.django_db
+def test_refresh_rechaza_usuario_inactivo_o_borrado(jugador, gm):
+    from core.autenticacion import tokens_para
+    refrescos = {u.pk: tokens_para(u)["refresh"] for u in (jugador, gm)}
+    jugador.is_active = False
+    jugador.save()
+    gm_id = gm.pk
+    gm.delete()
+    for pk in (jugador.pk, gm_id):
+        r = APIClient().post(reverse("token_refresh"), {"refresh": refrescos[pk]})
+        assert r.status_code == 401
+        assert "access" not in r.json()
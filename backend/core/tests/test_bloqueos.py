@@ -0,0 +1,72 @@
+import pytest
+from axes.handlers.proxy import AxesProxyHandler
+from axes.models import AccessAttempt
+from django.urls import reverse
+
+from core import bloqueos
+
+LOGIN = "token_obtain_pair"
+
+
+def _fallar(cliente, username, veces):
+    return [cliente.post(reverse(LOGIN), {"username": username, "password": "mala"}).status_code for _ in range(veces)]
+
+
+@pytest.mark.django_db
+def test_bloqueo_tras_limite_de_fallos(api_client, jugador, password_valida):
+    assert _fallar(api_client, jugador.username, 5) == [401] * 4 + [429]
+    # Bloqueado aunque ahora acierte la contraseña
+    r = api_client.post(reverse(LOGIN), {"username": jugador.username, "password": password_valida})
+    assert r.status_code == 429
+
+
+@pytest.mark.django_db
+def test_bloqueo_solo_por_usuario(api_client, jugador, gm, password_valida):
+    # AXES_ONLY_USER_FAILURES: la misma IP puede seguir entrando con otra cuenta
+    _fallar(api_client, jugador.username, 5)
+    r = api_client.post(reverse(LOGIN), {"username": gm.username, "password": password_valida})
+    assert r.status_code == 200
+
+
+@pytest.mark.django_db
+def test_resumen_una_fila_por_cliente(api_client, jugador):
+    _fallar(api_client, jugador.username, 3)
+    assert list(AccessAttempt.objects.values_list("username", "failures_since_start")) == [(jugador.username, 3)]
+
+
+@pytest.mark.django_db
+def test_intento_bloqueado_no_toca_la_bd(settings, api_client, jugador, django_assert_num_queries):
+    settings.AXES_RESUMEN_INTERVALO = 3600  # resúmenes en memoria hasta vaciar()
+    _fallar(api_client, jugador.username, 5)
+    with django_assert_num_queries(0):
+        assert _fallar(api_client, jugador.username, 20) == [429] * 20
+    assert bloqueos.vaciar() == 1
+    assert AccessAttempt.objects.get(username=jugador.username).failures_since_start == 25
+
+
+@pytest.mark.django_db
+def test_reset_desbloquea_y_borra_resumen(api_client, jugador, password_valida):
+    _fallar(api_client, jugador.username, 5)
+    AxesProxyHandler.reset_attempts(username=jugador.username)
+    assert not AccessAttempt.objects.exists()
+    r = api_client.post(reverse(LOGIN), {"username": jugador.username, "password": password_valida})
+    assert r.status_code == 200
+
+
+@pytest.mark.django_db
+def test_bloqueos_sobreviven_a_la_purga_de_la_cache(settings, client):
+    # La caché por defecto purga al pasar de MAX_ENTRIES; los contadores de
+    # axes no pueden perderse aunque se bloqueen más cuentas que ese límite
+    settings.CACHES = {**settings.CACHES, "default": {**settings.CACHES["default"], "OPTIONS": {"MAX_ENTRIES": 10}}}
+    AxesProxyHandler.get_implementation(force=True)  # el manejador guarda su caché
+    nombres = [f"victima{i}" for i in range(15)]
+    for i, nombre in enumerate(nombres):
+        # Una IP por cuenta para no toparse con el throttling anónimo
+        ip = {"REMOTE_ADDR": f"10.0.0.{i + 1}"}
+        for _ in range(5):
+            client.post(reverse(LOGIN), {"username": nombre, "password": "mala"}, **ip)
+    bloqueados = [
+        client.post(reverse(LOGIN), {"username": n, "password": "mala"}, REMOTE_ADDR="10.0.1.1").status_code
+        for n in nombres
+    ]
+    assert bloqueados == [429] * 15
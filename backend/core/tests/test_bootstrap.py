@@ -0,0 +1,53 @@
+import pytest
+from django.urls import reverse
+
+
+@pytest.mark.django_db
+def test_bootstrap_gm_trae_todo_en_una_respuesta(gm, gm_client, catalogos, crear_personajes):
+    crear_personajes(3)
+    r = gm_client.get(reverse("bootstrap"))
+    assert r.status_code == 200
+    body = r.json()
+    assert body["yo"] == {"id": gm.id, "usuario": gm.username, "rol": "GM"}
+    assert set(body["catalogos"]) == {"razas", "habilidades", "poderes", "equipamientos"}
+    assert [x["nombre"] for x in body["catalogos"]["razas"]] == [x.nombre for x in catalogos["razas"]]
+    # Mismo formato que los listados paginados
+    assert len(body["personajes"]["results"]) == 3
+    assert len(body["disponibles"]["results"]) == 3
+
+
+@pytest.mark.django_db
+def test_bootstrap_jugador_sin_catalogos_y_solo_lo_suyo(jugador, jugador_client, crear_personajes):
+    mios = crear_personajes(2, propietario=jugador, prefijo="Mio-")
+    pool = crear_personajes(4, prefijo="Pool-")
+    body = jugador_client.get(reverse("bootstrap")).json()
+    assert body["catalogos"] is None
+    assert [x["id"] for x in body["personajes"]["results"]] == [p.id for p in mios]
+    assert [x["id"] for x in body["disponibles"]["results"]] == [p.id for p in pool]
+
+
+@pytest.mark.django_db
+def test_bootstrap_enlaces_apuntan_a_los_listados(gm_client, crear_personajes):
+    crear_personajes(5)
+    body = gm_client.get(reverse("bootstrap"), {"page_size": 2}).json()
+    assert reverse("personaje-list") in body["personajes"]["next"]
+    assert reverse("personaje-disponibles") in body["disponibles"]["next"]
+    # El cursor sirve tal cual en el listado
+    sig = gm_client.get(body["personajes"]["next"]).json()
+    assert len(sig["results"]) == 2
+
+
+@pytest.mark.django_db
+def test_bootstrap_consultas_minimas(gm_client, crear_personajes, django_assert_num_queries):
+    crear_personajes(100)
+    # En frío: 4 catálogos + 2 páginas (el usuario sale del JWT)
+    with django_assert_num_queries(6):
+        gm_client.get(reverse("bootstrap"))
+    # Con los catálogos ya en caché: solo las 2 páginas
+    with django_assert_num_queries(2):
+        gm_client.get(reverse("bootstrap"))
+
+
+@pytest.mark.django_db
+def test_bootstrap_requiere_autenticacion(api_client):
+    assert api_client.get(reverse("bootstrap")).status_code == 401
@@ -0,0 +1,123 @@
+import re
+
+import pytest
+from django.contrib import admin
+from django.db import DEFAULT_DB_ALIAS
+from django.urls import reverse
+
+from core import busqueda
+from core.models import Personaje, Usuario
+
+SCAN_TABLA = re.compile(r"SCAN core_personaje(?! USING|_fts)")
+
+
+def _nombres(qs):
+    return [p.nombre for p in qs]
+
+
+@pytest.fixture
+def sin_fts(monkeypatch):
+    monkeypatch.setitem(busqueda._disponible, DEFAULT_DB_ALIAS, False)
+
+
+@pytest.fixture
+def elenco(catalogos, crear_personajes, jugador):
+    crear_personajes(1, prefijo="Gandalf el Gris ")
+    crear_personajes(1, prefijo="Galadriel ")
+    crear_personajes(1, prefijo="Ángel Caído ")
+    crear_personajes(200, prefijo="Orco-")
+    # Del jugador "jugador_user": coincide por el username del dueño
+    crear_personajes(1, propietario=jugador, prefijo="Aragorn ")
+    return jugador
+
+
+@pytest.mark.django_db
+def test_fts_disponible_en_sqlite():
+    assert busqueda.fts_disponible(DEFAULT_DB_ALIAS)
+
+
+@pytest.mark.django_db
+def test_prefijos_todos_los_terminos_y_diacriticos(elenco):
+    qs = Personaje.objects.all()
+    assert sorted(_nombres(busqueda.buscar(qs, "ga"))) == ["Galadriel 0", "Gandalf el Gris 0"]
+    assert _nombres(busqueda.buscar(qs, "gand gri")) == ["Gandalf el Gris 0"]
+    assert _nombres(busqueda.buscar(qs, "angel")) == ["Ángel Caído 0"]
+    assert _nombres(busqueda.buscar(qs, "jugador_user")) == ["Aragorn 0"]
+    # Los operadores de FTS5 del usuario no rompen la consulta
+    assert _nombres(busqueda.buscar(qs, '"gandalf*')) == ["Gandalf el Gris 0"]
+    assert not busqueda.buscar(qs, "  ").exists()
+
+
+@pytest.mark.django_db
+def test_el_nombre_pesa_mas_que_el_propietario(elenco, catalogos, crear_personajes):
+    tolkien = Usuario.objects.create(username="tolkien")
+    crear_personajes(1, propietario=tolkien, prefijo="Frodo ")
+    crear_personajes(1, prefijo="Tolkien ")
+    assert _nombres(busqueda.buscar(Personaje.objects.all(), "tolkien")) == ["Tolkien 0", "Frodo 0"]
+
+
+@pytest.mark.django_db
+def test_triggers_mantienen_el_indice(elenco, gm):
+    qs = Personaje.objects.all()
+    Personaje.objects.filter(nombre="Galadriel 0").update(nombre="Arwen 0")
+    assert not busqueda.buscar(qs, "galadriel").exists()
+    assert _nombres(busqueda.buscar(qs, "arwen")) == ["Arwen 0"]
+
+    # Cambio de propietario (reclamar es un UPDATE condicional) y de username
+    pj = Personaje.objects.get(nombre="Arwen 0")
+    assert Personaje.objects.reclamar(pj.id, gm.id)
+    assert _nombres(busqueda.buscar(qs, "gm_user")) == ["Arwen 0"]
+    Usuario.objects.filter(id=gm.id).update(username="elrond")
+    assert _nombres(busqueda.buscar(qs, "elrond")) == ["Arwen 0"]
+
+    Personaje.objects.filter(id=pj.id).delete()
+    assert not busqueda.buscar(qs, "arwen").exists()
+
+
+@pytest.mark.django_db
+def test_sin_fts_degrada_a_prefijo_de_palabra(elenco, sin_fts):
+    qs = Personaje.objects.all()
+    # Prefijo de cualquier palabra como FTS5 ("ga" no encuentra "Aragorn"), orden por nombre
+    assert _nombres(busqueda.buscar(qs, "ga")) == ["Galadriel 0", "Gandalf el Gris 0"]
+    assert _nombres(busqueda.buscar(qs, "gand gri")) == ["Gandalf el Gris 0"]
+    assert _nombres(busqueda.buscar(qs, "ris")) == []
+    assert _nombres(busqueda.buscar(qs, "jugador_user")) == ["Aragorn 0"]
+    assert _nombres(busqueda.buscar(qs, "user")) == ["Aragorn 0"]
+
+
+@pytest.mark.django_db
+def test_la_busqueda_no_recorre_la_tabla(elenco):
+    plan = busqueda.buscar(Personaje.objects.con_relaciones(), "gand").explain()
+    assert "core_personaje_fts VIRTUAL TABLE INDEX" in plan, plan
+    assert not SCAN_TABLA.search(plan), plan
+
+
+@pytest.mark.django_db
+def test_relevancia_con_un_solo_match(elenco):
+    # El rank sale del JOIN, no de una subconsulta por fila (coste cuadrático)
+    plan = busqueda.buscar(Personaje.objects.con_relaciones(), "orco").explain()
+    assert plan.count("core_personaje_fts VIRTUAL TABLE") == 1, plan
+    assert "CORRELATED" not in plan, plan
+
+
+@pytest.mark.django_db
+def test_endpoint_buscar(gm_client, jugador_client, elenco):
+    url = reverse("personaje-buscar")
+    r = gm_client.get(url, {"q": "orco", "limite": 5})
+    assert r.status_code == 200
+    assert len(r.json()["results"]) == 5
+    # Filtros del listado + visibilidad: el jugador solo ve los suyos
+    assert gm_client.get(url, {"q": "orco", "nivel_min": 2}).json()["results"] == []
+    assert [p["nombre"] for p in jugador_client.get(url, {"q": "ar"}).json()["results"]] == ["Aragorn 0"]
+    assert jugador_client.get(url, {"q": "gandalf"}).json()["results"] == []
+    assert gm_client.get(url, {"q": "!!"}).status_code == 400
+    assert gm_client.get(url, {"q": "orco", "limite": "x"}).status_code == 400
+
+
+@pytest.mark.django_db
+def test_admin_busca_con_fts(rf, gm, elenco):
+    modelo_admin = admin.site._registry[Personaje]
+    qs, duplicados = modelo_admin.get_search_results(rf.get("/"), Personaje.objects.all(), "gand")
+    assert _nombres(qs) == ["Gandalf el Gris 0"]
+    assert not duplicados
+    assert "core_personaje_fts" in str(qs.query)
@@ -1,5 +1,6 @@
 import pytest
 from types import SimpleNamespace
+from django.urls import reverse
 from django.contrib.auth import get_user_model
 from core.serializers import (
     RazaSerializer, HabilidadSerializer, PoderSerializer, EquipamientoSerializer,
@@ -87,3 +88,60 @@ def test_register_serializer_password_mismatch():
     })
     assert not ser.is_valid()
     assert "password2" in ser.errors or "non_field_errors" in ser.errors
+
+
+# ---------- Caché versionada + ETag ----------
+@pytest.mark.django_db
+def test_catalogo_listado_etag_y_304_sin_consultar(gm_client, catalogos, django_assert_num_queries):
+    url = reverse("raza-list")
+    r = gm_client.get(url)
+    assert r.status_code == 200
+    assert [x["nombre"] for x in r.json()] == [x.nombre for x in catalogos["razas"]]
+    etag = r["ETag"]
+    # Ni usuario (claims del JWT) ni catálogo ni serializer
+    with django_assert_num_queries(0):
+        r304 = gm_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert r304.status_code == 304
+    assert r304["ETag"] == etag
+    # Lectura repetida sin ETag: sale de la caché
+    with django_assert_num_queries(0):
+        assert gm_client.get(url).json() == r.json()
+
+
+@pytest.mark.django_db
+def test_catalogo_escritura_por_api_invalida(gm_client, catalogos):
+    url = reverse("poder-list")
+    etag = gm_client.get(url)["ETag"]
+    assert gm_client.post(url, {"nombre": "Rayo"}, format="json").status_code == 201
+    r = gm_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert r.status_code == 200
+    assert r["ETag"] != etag
+    assert "Rayo" in [x["nombre"] for x in r.json()]
+
+
+@pytest.mark.django_db
+def test_catalogo_escritura_fuera_de_api_invalida(gm_client, catalogos):
+    # Admin, shell o seed_testdata: las señales suben la versión igualmente
+    url = reverse("equipamiento-list")
+    gm_client.get(url)
+    catalogos["equipos"][0].delete()
+    Equipamiento.objects.create(nombre="Escudo")
+    nombres = [x["nombre"] for x in gm_client.get(url).json()]
+    assert "Escudo" in nombres
+    assert catalogos["equipos"][0].nombre not in nombres
+
+
+@pytest.mark.django_db
+def test_catalogo_detalle_desde_cache(gm_client, catalogos, django_assert_num_queries):
+    h = catalogos["habilidades"][1]
+    url = reverse("habilidad-detail", args=[h.id])
+    r = gm_client.get(url)
+    assert r.json() == {"id": h.id, "nombre": h.nombre}
+    with django_assert_num_queries(0):
+        assert gm_client.get(url, HTTP_IF_NONE_MATCH=r["ETag"]).status_code == 304
+    assert gm_client.get(reverse("habilidad-detail", args=[999999])).status_code == 404
+
+
+@pytest.mark.django_db
+def test_catalogo_jugador_sigue_sin_acceso(jugador_client, catalogos):
+    assert jugador_client.get(reverse("raza-list")).status_code == 403
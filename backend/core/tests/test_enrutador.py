@@ -0,0 +1,140 @@
+import sqlite3
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.http import HttpResponse
+from django.test import RequestFactory
+from django.urls import reverse
+
+from core.autenticacion import tokens_para
+from core.enrutador import EnrutadorLecturaEscritura, EnrutamientoMiddleware, usuario_del_token
+from core.models import Personaje
+from core.sqlite import replicar
+
+enrutador = EnrutadorLecturaEscritura()
+
+
+@pytest.fixture
+def con_replica(settings):
+    settings.BD_REPLICAS = ["replica_1"]
+
+
+def _peticion(metodo, usuario=None, estado=200):
+    """Pasa una petición por el middleware; devuelve la BD de lectura que vio la vista."""
+    vista = {}
+
+    def get_response(request):
+        vista["bd"] = enrutador.db_for_read(Personaje)
+        return HttpResponse(status=estado)
+
+    extra = {"HTTP_AUTHORIZATION": f"Bearer {tokens_para(usuario)['access']}"} if usuario else {}
+    request = getattr(RequestFactory(), metodo.lower())("/api/personajes/", **extra)
+    EnrutamientoMiddleware(get_response)(request)
+    return vista["bd"]
+
+
+def test_sin_replicas_todo_a_default():
+    assert _peticion("GET") == "default"
+    assert enrutador.db_for_write(Personaje) == "default"
+
+
+def test_get_lee_de_replica_y_el_resto_de_la_primaria(con_replica):
+    assert _peticion("GET") == "replica_1"
+    assert _peticion("POST") == "default"
+    # Fuera de una petición (comandos, shell): primaria
+    assert enrutador.db_for_read(Personaje) == "default"
+    assert enrutador.db_for_write(Personaje) == "default"
+
+
+@pytest.mark.django_db
+def test_lee_lo_que_escribes_tras_una_mutacion(con_replica, jugador, gm):
+    assert _peticion("GET", jugador) == "replica_1"
+    _peticion("PATCH", jugador)
+    assert _peticion("GET", jugador) == "default"
+    # Solo para quien escribió
+    assert _peticion("GET", gm) == "replica_1"
+
+
+@pytest.mark.django_db
+def test_mutacion_fallida_no_fija_la_primaria(con_replica, jugador):
+    _peticion("POST", jugador, estado=400)
+    assert _peticion("GET", jugador) == "replica_1"
+
+
+@pytest.mark.django_db
+def test_usuario_del_token_sin_verificar(jugador, rf):
+    token = tokens_para(jugador)["access"]
+    assert usuario_del_token(rf.get("/", HTTP_AUTHORIZATION=f"Bearer {token}")) == jugador.id
+    assert usuario_del_token(rf.get("/", HTTP_AUTHORIZATION="Bearer basura")) is None
+    assert usuario_del_token(rf.get("/")) is None
+
+
+def test_replicas_no_se_migran(con_replica):
+    assert enrutador.allow_migrate("default", "core") is True
+    assert enrutador.allow_migrate("replica_1", "core") is False
+
+
+def test_replicar_copia_la_primaria(tmp_path):
+    primaria, replica = tmp_path / "primaria.sqlite3", tmp_path / "replica.sqlite3"
+    con = sqlite3.connect(primaria)
+    con.execute("CREATE TABLE t (x)")
+    con.executemany("INSERT INTO t VALUES (?)", [(i,) for i in range(100)])
+    con.commit()
+    replicar(primaria, replica)
+    con.execute("DELETE FROM t WHERE x >= 50")
+    con.commit()
+    assert sqlite3.connect(replica).execute("SELECT COUNT(*) FROM t").fetchone() == (100,)
+    replicar(primaria, replica)
+    assert sqlite3.connect(replica).execute("SELECT COUNT(*) FROM t").fetchone() == (50,)
+    con.close()
+
+
+class _Parar(Exception):
+    pass
+
+
+def test_replicar_cada_sobrevive_a_un_cerrojo(monkeypatch, tmp_path, capsys):
+    from core.management.commands import replicar_sqlite
+    llamadas, pausas = [], []
+
+    def replicar_falla_una_vez(origen, destino):
+        llamadas.append(destino)
+        if len(llamadas) == 1:
+            raise sqlite3.OperationalError("database is locked")
+
+    def dormir(segundos):
+        pausas.append(segundos)
+        if len(pausas) == 2:
+            raise _Parar
+
+    monkeypatch.setattr(replicar_sqlite, "replicar", replicar_falla_una_vez)
+    monkeypatch.setattr(replicar_sqlite.time, "sleep", dormir)
+    with pytest.raises(_Parar):
+        call_command("replicar_sqlite", "--cada", "1", "--destino", str(tmp_path / "r.sqlite3"))
+    salida = capsys.readouterr()
+    assert len(llamadas) == 2
+    assert "database is locked; se reintentará" in salida.err
+    assert [linea.split(" en ")[0] for linea in salida.out.splitlines()] == ["0 réplica(s) al día", "1 réplica(s) al día"]
+
+
+def test_replicar_una_vez_informa_del_cerrojo(monkeypatch, tmp_path):
+    from core.management.commands import replicar_sqlite
+
+    def bloqueada(origen, destino):
+        raise sqlite3.OperationalError("database is locked")
+
+    monkeypatch.setattr(replicar_sqlite, "replicar", bloqueada)
+    with pytest.raises(CommandError, match="database is locked"):
+        call_command("replicar_sqlite", "--destino", str(tmp_path / "r.sqlite3"))
+
+
+@pytest.mark.django_db
+def test_listado_condicional_lee_de_la_primaria(con_replica, gm_client, crear_personajes):
+    # El ETag sale de la versión en caché, al día con la primaria: el cuerpo
+    # también (replica_1 no existe en DATABASES: leer de ella fallaría)
+    crear_personajes(3)
+    r = gm_client.get(reverse("personaje-list"))
+    assert r.status_code == 200
+    assert len(r.json()["results"]) == 3
+    assert gm_client.get(reverse("personaje-disponibles")).status_code == 200
@@ -0,0 +1,265 @@
+import asyncio
+import json
+import os
+import time
+
+import pytest
+from asgiref.sync import async_to_sync, sync_to_async
+from django.test import AsyncClient
+from django.urls import reverse
+
+from core import eventos
+from core.autenticacion import tokens_para
+
+
+@pytest.fixture
+def publicados(monkeypatch):
+    """Eventos que llegan al bus (tras el COMMIT)."""
+    lista = []
+    monkeypatch.setattr(eventos.bus, "entregar", lista.append)
+    return lista
+
+
+def _en_cola(sub):
+    return [sub.cola.get_nowait()["id"] for _ in range(sub.cola.qsize())]
+
+
+# ---------- Bus y filtro por suscriptor ----------
+def test_bus_filtra_por_propietario_y_pool(settings):
+    settings.EVENTOS_FICHERO = "-"
+
+    async def escenario():
+        jugador = eventos.bus.suscribir(5, es_gm=False)
+        sin_pool = eventos.bus.suscribir(6, es_gm=False, pool=False)
+        gm = eventos.bus.suscribir(1, es_gm=True)
+        try:
+            eventos.bus.entregar(eventos.evento(10, {5}, "cambio"))
+            eventos.bus.entregar(eventos.evento(11, {6}, "cambio"))
+            eventos.bus.entregar(eventos.evento(12, {None}, "liberar"))
+            eventos.bus.entregar(eventos.evento(13, {None, 6}, "elegido"))
+            await asyncio.sleep(0)  # call_soon_threadsafe entrega en la siguiente vuelta
+            return _en_cola(jugador), _en_cola(sin_pool), _en_cola(gm)
+        finally:
+            for sub in (jugador, sin_pool, gm):
+                eventos.bus.cancelar(sub)
+
+    assert async_to_sync(escenario)() == ([10, 12, 13], [11, 13], [10, 11, 12, 13])
+    assert len(eventos.bus) == 0
+
+
+def test_cola_llena_marca_resync(settings):
+    settings.EVENTOS_FICHERO = "-"
+    settings.EVENTOS_COLA = 2
+
+    async def escenario():
+        sub = eventos.bus.suscribir(1, es_gm=True)
+        try:
+            for i in range(3):
+                eventos.bus.entregar(eventos.evento(i, {None}, "cambio"))
+            await asyncio.sleep(0)
+            return sub.cola.qsize(), sub.desbordada
+        finally:
+            eventos.bus.cancelar(sub)
+
+    assert async_to_sync(escenario)() == (2, True)
+
+
+# ---------- Rutas de escritura que publican ----------
+@pytest.mark.django_db
+def test_acciones_del_gm_publican_a_los_afectados(gm_client, jugador, personaje_de_jugador, publicados,
+                                                  django_capture_on_commit_callbacks):
+    pj = personaje_de_jugador
+    with django_capture_on_commit_callbacks(execute=True):
+        gm_client.post(reverse("personaje-subir-nivel", args=[pj.id]))
+        gm_client.post(reverse("personaje-liberar", args=[pj.id]))
+    subida, liberado = publicados
+    assert subida["propietarios"] == [jugador.id]
+    assert subida["version"] == 2
+    # Liberar avisa al pool y al ex-dueño
+    assert liberado["propietarios"] == [None, jugador.id]
+
+
+@pytest.mark.django_db
+def test_elegir_y_bulk_publican(gm_client, jugador, jugador_client, crear_personajes, publicados,
+                                django_capture_on_commit_callbacks):
+    pjs = crear_personajes(3)
+    with django_capture_on_commit_callbacks(execute=True):
+        jugador_client.post(reverse("personaje-elegir", args=[pjs[0].id]))
+        gm_client.post(reverse("personaje-bulk"), {"ids": [p.id for p in pjs], "accion": "liberar"}, format="json")
+    assert publicados[0] == {"id": pjs[0].id, "accion": "elegido", "version": None, "propietarios": [None, jugador.id]}
+    # Como liberar individual: al pool y al ex-dueño (leído antes del UPDATE)
+    assert [(e["id"], e["propietarios"]) for e in publicados[1:]] == (
+        [(pjs[0].id, [None, jugador.id])] + [(p.id, [None]) for p in pjs[1:]]
+    )
+
+
+@pytest.mark.django_db
+def test_sin_commit_no_se_publica(gm_client, personaje_de_jugador, publicados):
+    # Los tests sin transacción real nunca confirman: los avisos no salen
+    gm_client.post(reverse("personaje-subir-nivel", args=[personaje_de_jugador.id]))
+    assert publicados == []
+
+
+# ---------- Fichero entre procesos ----------
+def test_lector_sigue_el_fichero_y_la_rotacion(settings, tmp_path):
+    ruta = str(tmp_path / "ev.ndjson")
+    settings.EVENTOS_FICHERO_MAX = 400  # ~5 líneas: rota una vez
+    eventos.escribir_fichero(ruta, eventos.evento(0, {None}, "previo"))
+    lector = eventos.LectorFichero(ruta)  # empieza al final: "previo" no sale
+    for i in range(1, 8):
+        eventos.escribir_fichero(ruta, eventos.evento(i, {None}, "cambio"))
+    assert os.path.exists(ruta + ".1")  # rotó por el camino
+    leidos = lector.nuevos()
+    leidos += lector.nuevos()
+    lector.cerrar()
+    assert [e["id"] for e in leidos] == list(range(1, 8))
+    assert {e["pid"] for e in leidos} == {os.getpid()}
+
+
+def test_seguidor_reparte_lo_de_otros_procesos(settings, tmp_path):
+    ruta = tmp_path / "ev.ndjson"
+    settings.EVENTOS_FICHERO = str(ruta)
+    settings.EVENTOS_INTERVALO = 0.01
+
+    async def escenario():
+        sub = eventos.bus.suscribir(1, es_gm=True)
+        try:
+            await asyncio.sleep(0.02)
+            with open(ruta, "a") as f:
+                ajeno = {**eventos.evento(7, {None}, "cambio"), "pid": -1}
+                propio = {**eventos.evento(8, {None}, "cambio"), "pid": os.getpid()}
+                f.write(json.dumps(ajeno) + "\n" + json.dumps(propio) + "\n")
+            return (await asyncio.wait_for(sub.cola.get(), 1))["id"], sub.cola.qsize()
+        finally:
+            eventos.bus.cancelar(sub)
+
+    # El propio ya se entregó en local al publicar: del fichero solo el ajeno
+    assert async_to_sync(escenario)() == (7, 0)
+
+
+# ---------- Endpoint SSE ----------
+def _ticket(client):
+    r = client.post(reverse("eventos-ticket"))
+    assert r.status_code == 201, r.content
+    return r.json()["ticket"]
+
+
+async def _trozos(flujo, n):
+    return [(t.decode() if isinstance(t, bytes) else t) for t in [await flujo.__anext__() for _ in range(n)]]
+
+
+def test_sin_fichero_configurado_solo_en_proceso(settings):
+    del settings.EVENTOS_FICHERO
+    assert eventos.ruta_fichero() is None
+    settings.EVENTOS_FICHERO = ""
+    assert eventos.ruta_fichero() is None
+
+
+@pytest.mark.django_db
+def test_sse_requiere_ticket_y_asgi(jugador, jugador_client, api_client):
+    url = reverse("eventos")
+    assert jugador_client.get(url).status_code == 501  # cliente WSGI
+    assert api_client.post(reverse("eventos-ticket")).status_code == 401
+    # El token ya no vale en la URL (acabaría en los logs): solo el ticket
+    token = tokens_para(jugador)["access"]
+    for params in ({"ticket": "basura"}, {"token": token}, {}):
+        assert async_to_sync(AsyncClient().get)(url, params).status_code == 401
+
+
+@pytest.mark.django_db
+def test_ticket_de_un_solo_uso(settings, jugador_client):
+    settings.EVENTOS_LATIDO = 0.05
+    ticket = _ticket(jugador_client)
+
+    async def abrir():
+        r = await AsyncClient().get(reverse("eventos"), {"ticket": ticket})
+        if r.status_code == 200:
+            await r.streaming_content.__aiter__().aclose()
+        return r.status_code
+
+    assert async_to_sync(abrir)() == 200
+    assert async_to_sync(abrir)() == 401
+
+
+@pytest.mark.django_db
+def test_ticket_se_canjea_una_sola_vez_a_la_vez(jugador, jugador_client):
+    ticket = _ticket(jugador_client)
+    # En la caché, los claims del token (con su jti), no el JWT firmado
+    guardado = eventos.cache.get(eventos._clave_ticket(ticket))
+    assert guardado["user_id"] == jugador.id and "jti" in guardado
+    assert tokens_para(jugador)["access"].split(".")[0] not in repr(guardado)
+
+    async def dos_aperturas():
+        return await asyncio.gather(eventos.acanjear_ticket(ticket), eventos.acanjear_ticket(ticket))
+
+    canjes = async_to_sync(dos_aperturas)()
+    assert sorted(c is None for c in canjes) == [False, True]
+
+
+@pytest.mark.django_db
+def test_sse_entrega_los_eventos_del_jugador(settings, jugador, jugador_client):
+    settings.EVENTOS_FICHERO = "-"
+    settings.EVENTOS_LATIDO = 0.05
+    ticket = _ticket(jugador_client)
+
+    async def escenario():
+        r = await AsyncClient().get(reverse("eventos"), {"ticket": ticket, "pool": "0"})
+        assert r["Content-Type"] == "text/event-stream"
+        flujo = r.streaming_content.__aiter__()
+        trozos = [await flujo.__anext__()]  # retry + comentario de conexión
+        eventos.bus.entregar(eventos.evento(1, {None}, "liberar"))  # pool: no lo pidió
+        eventos.bus.entregar(eventos.evento(2, {jugador.id}, "cambio"))
+        trozos.append(await flujo.__anext__())
+        trozos.append(await flujo.__anext__())  # sin eventos: latido
+        await flujo.aclose()
+        return [t.decode() if isinstance(t, bytes) else t for t in trozos]
+
+    inicio, evento, latido = async_to_sync(escenario)()
+    assert inicio.startswith("retry: ")
+    assert evento.startswith("event: personaje\ndata: ")
+    assert json.loads(evento.split("data: ", 1)[1])["id"] == 2
+    assert latido == ": ping\n\n"
+    assert len(eventos.bus) == 0
+
+
+@pytest.mark.django_db
+def test_sse_se_corta_al_revocar_el_token(settings, jugador, jugador_client):
+    settings.EVENTOS_LATIDO = 0.05
+    ticket = _ticket(jugador_client)
+
+    def desactivar():
+        jugador.is_active = False
+        jugador.save()
+
+    async def escenario():
+        r = await AsyncClient().get(reverse("eventos"), {"ticket": ticket})
+        flujo = r.streaming_content.__aiter__()
+        trozos = await _trozos(flujo, 2)  # conexión y latido: sigue vigente
+        await sync_to_async(desactivar)()
+        while not trozos[-1].startswith("event: caducado"):
+            trozos += await _trozos(flujo, 1)
+        with pytest.raises(StopAsyncIteration):
+            await flujo.__anext__()
+        return trozos
+
+    trozos = async_to_sync(escenario)()
+    assert trozos[1] == ": ping\n\n"
+    assert len(trozos) <= 4  # a lo sumo un latido más antes de comprobar
+    assert len(eventos.bus) == 0
+
+
+def test_flujo_termina_cuando_caduca_el_token(settings):
+    settings.EVENTOS_FICHERO = "-"
+    settings.EVENTOS_LATIDO = 10
+
+    async def escenario():
+        flujo = eventos.flujo(1, False, caduca=time.time() + 0.1).__aiter__()
+        inicio = time.monotonic()
+        trozos = await _trozos(flujo, 2)
+        with pytest.raises(StopAsyncIteration):
+            await flujo.__anext__()
+        return trozos, time.monotonic() - inicio
+
+    (conectado, caducado), duracion = async_to_sync(escenario)()
+    assert caducado == "event: caducado\ndata: {}\n\n"
+    assert duracion < 1  # no espera al siguiente latido
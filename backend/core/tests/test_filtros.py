@@ -0,0 +1,124 @@
+import re
+
+import pytest
+from django.urls import reverse
+
+from core.filtros import prefijo_nombre
+from core.models import Personaje
+
+SCAN_TABLA = re.compile(r"SCAN core_personaje(?! USING)")
+
+
+def _ids(client, url, **params):
+    r = client.get(url, {"page_size": 500, **params})
+    assert r.status_code == 200, r.content
+    return sorted(p["id"] for p in r.json()["results"])
+
+
+def _esperados(qs):
+    return sorted(qs.values_list("id", flat=True))
+
+
+@pytest.fixture
+def surtido(catalogos, crear_personajes, jugador):
+    razas, poderes, equipos = catalogos["razas"], catalogos["poderes"], catalogos["equipos"]
+    crear_personajes(6, prefijo="Elfa-", raza=razas[1], nivel=3)
+    crear_personajes(4, prefijo="elrond-", poder=poderes[1], estado="MUERTO", nivel=7)
+    crear_personajes(5, prefijo="Orco-", equipamiento=equipos[1], estado="CONGELADO", nivel=5)
+    crear_personajes(3, propietario=jugador, prefijo="Suyo-", raza=razas[1], nivel=9)
+    return catalogos
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("params, filtro", [
+    ({"raza": "R1"}, lambda c: {"raza": c["razas"][1]}),
+    ({"raza": "R0,R1"}, lambda c: {"raza__in": c["razas"]}),
+    ({"poder": "P1"}, lambda c: {"poder": c["poderes"][1]}),
+    ({"equipamiento": "E1"}, lambda c: {"equipamiento": c["equipos"][1]}),
+    ({"estado": "muerto,congelado"}, lambda c: {"estado__in": ["MUERTO", "CONGELADO"]}),
+    ({"nivel_min": 4, "nivel_max": 7}, lambda c: {"nivel__range": (4, 7)}),
+    ({"raza": "R1", "nivel_min": 5}, lambda c: {"raza": c["razas"][1], "nivel__gte": 5}),
+])
+def test_filtros_del_listado_gm(params, filtro, gm_client, surtido):
+    c = surtido
+    sustituir = {"R": c["razas"], "P": c["poderes"], "E": c["equipos"]}
+    params = {
+        k: ",".join(str(sustituir[v[0]][int(v[1:])].id) for v in str(p).split(","))
+        if isinstance(p, str) and p[0] in sustituir and p[1:2].isdigit() else p
+        for k, p in params.items()
+    }
+    esperados = _esperados(Personaje.objects.filter(**filtro(c)))
+    assert esperados
+    assert _ids(gm_client, reverse("personaje-list"), **params) == esperados
+
+
+@pytest.mark.django_db
+def test_prefijo_de_nombre_sin_distinguir_mayusculas(gm_client, surtido):
+    url = reverse("personaje-list")
+    # "Elfa-*" y "elrond-*"
+    assert _ids(gm_client, url, nombre="EL") == _esperados(Personaje.objects.filter(nombre__istartswith="el"))
+    assert len(_ids(gm_client, url, nombre="elf")) == 6
+    assert _ids(gm_client, url, nombre="zz") == []
+    # Último punto de código de Unicode (no tiene siguiente) y antesala de los sustitutos
+    assert _ids(gm_client, url, nombre="el\U0010ffff") == []
+    assert _ids(gm_client, url, nombre="\U0010ffff") == []
+    assert _ids(gm_client, url, nombre="el\ud7ff") == []
+
+
+@pytest.mark.django_db
+def test_jugador_filtra_solo_entre_los_suyos(jugador, gm, jugador_client, surtido):
+    url = reverse("personaje-list")
+    assert len(_ids(jugador_client, url, raza=surtido["razas"][1].id)) == 3
+    assert _ids(jugador_client, url, propietario=gm.id) == []
+    # El pool también filtra
+    disponibles = reverse("personaje-disponibles")
+    assert len(_ids(jugador_client, disponibles, estado="VIVO")) == 6
+
+
+@pytest.mark.django_db
+def test_filtros_y_orden_por_nombre_paginan(gm_client, surtido):
+    url = reverse("personaje-list")
+    r = gm_client.get(url, {"raza": surtido["razas"][1].id, "ordering": "-nombre", "page_size": 4}).json()
+    nombres = [p["nombre"] for p in r["results"]]
+    # El cursor conserva los filtros
+    while r["next"]:
+        r = gm_client.get(r["next"]).json()
+        nombres += [p["nombre"] for p in r["results"]]
+    assert nombres == sorted(Personaje.objects.filter(raza=surtido["razas"][1]).values_list("nombre", flat=True),
+                             reverse=True)
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("params", [
+    {"raza": "x"}, {"raza": ","}, {"estado": "ZOMBI"}, {"nivel_min": "alto"},
+    {"propietario": "yo"}, {"nombre": "x" * 51}, {"ordering": "estado"},
+    {"raza": "99999999999999999999999"}, {"poder": "1,-99999999999999999999"},
+    {"propietario": "-9999999999999999999999"}, {"nivel_max": str(2 ** 63)},
+])
+def test_parametros_invalidos_son_400(params, gm_client):
+    r = gm_client.get(reverse("personaje-list"), params)
+    assert r.status_code == 400
+    assert set(r.json()) == {next(iter(params))}
+
+
+@pytest.mark.django_db
+def test_bootstrap_aplica_los_filtros(jugador_client, surtido):
+    datos = jugador_client.get(reverse("bootstrap"), {"estado": "VIVO"}).json()
+    assert len(datos["disponibles"]["results"]) == 6
+    assert len(datos["personajes"]["results"]) == 3
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("filtro", [
+    {"raza_id": 1}, {"poder_id": 1}, {"equipamiento_id": 1}, {"estado__in": ["VIVO"]},
+    {"nivel__gte": 3, "nivel__lte": 5}, {"propietario_id": 1},
+])
+def test_cada_filtro_usa_un_indice(filtro, surtido):
+    plan = Personaje.objects.filter(**filtro).order_by("id").explain()
+    assert not SCAN_TABLA.search(plan), plan
+
+
+@pytest.mark.django_db
+def test_prefijo_de_nombre_usa_el_indice_de_expresion(surtido):
+    plan = prefijo_nombre(Personaje.objects.all(), "El").explain()
+    assert "core_pj_nombre_min_idx" in plan, plan
@@ -0,0 +1,48 @@
+import io
+
+import pytest
+from django.core.management import call_command
+
+from core.generador import generar
+from core.models import Personaje, Raza, Usuario
+
+
+def _huella():
+    return list(Personaje.objects.order_by("nombre").values_list(
+        "nombre", "propietario__username", "raza__nombre", "nivel", "estado", "opcion_hab1__nombre", "habilidad1__nombre",
+    ))
+
+
+@pytest.mark.django_db
+def test_generar_respeta_parametros():
+    r = generar(usuarios=20, gms=2, razas=3, habilidades=6, poderes=2, equipamientos=2,
+                personajes=500, ratio_pool=0.5, ratio_opciones=1.0, ratio_seleccion=1.0, lote=120)
+    assert r["jugadores"] == 18
+    assert Usuario.objects.filter(rol="GM").count() == 2
+    assert Raza.objects.count() == 3
+    assert Personaje.objects.count() == 500
+    pool = Personaje.objects.filter(propietario__isnull=True).count()
+    assert 180 < pool < 320
+    assert not Personaje.objects.filter(opcion_hab1__isnull=True).exists()
+    # Solo los que tienen dueño pueden haber elegido
+    assert not Personaje.objects.filter(propietario__isnull=True, habilidad1__isnull=False).exists()
+
+
+@pytest.mark.django_db
+def test_generar_es_determinista_e_idempotente():
+    generar(usuarios=5, personajes=200, semilla=7)
+    primera = _huella()
+    # Repetir la misma ejecución no duplica ni falla
+    generar(usuarios=5, personajes=200, semilla=7)
+    assert _huella() == primera
+    Personaje.objects.all().delete()
+    generar(usuarios=5, personajes=200, semilla=7)
+    assert _huella() == primera
+
+
+@pytest.mark.django_db
+def test_comando_generar_datos_informa_progreso():
+    out = io.StringIO()
+    call_command("generar_datos", "--usuarios", "3", "--personajes", "250", "--lote", "100", stdout=out)
+    assert "personajes: 250/250" in out.getvalue()
+    assert Personaje.objects.count() == 250
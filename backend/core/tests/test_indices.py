@@ -0,0 +1,63 @@
+"""
+Las consultas calientes de Personaje deben resolverse con índices.
+Se comprueba el plan real de SQLite (EXPLAIN QUERY PLAN vía QuerySet.explain):
+ningún "SCAN core_personaje" sin índice y, donde hay orden, sin ordenar en memoria.
+"""
+import re
+
+import pytest
+from django.db import connection
+
+from core.models import Personaje
+
+# "SCAN core_personaje" a secas = recorrido completo de la tabla
+# ("SCAN core_personaje USING INDEX ..." sí usa índice)
+SCAN_TABLA = re.compile(r"SCAN core_personaje(?! USING)")
+ORDENA_EN_MEMORIA = "USE TEMP B-TREE FOR ORDER BY"
+
+
+def _plan(qs):
+    return qs.explain()
+
+
+def _consultas(jugador, raza):
+    base = Personaje.objects.con_relaciones()
+    return {
+        "jugador_por_id": base.visibles_para(jugador).order_by("id"),
+        "jugador_por_id_cursor": base.visibles_para(jugador).filter(id__gt=100).order_by("id"),
+        "jugador_por_nivel": base.visibles_para(jugador).order_by("nivel", "id"),
+        "jugador_por_estado": Personaje.objects.visibles_para(jugador).filter(estado="VIVO").order_by("id"),
+        "pool_por_id": base.disponibles().order_by("id"),
+        "pool_por_nivel": base.disponibles().order_by("-nivel", "-id"),
+        "reclamables": Personaje.objects.reclamables().order_by("id").values_list("id", flat=True),
+        "gm_por_nivel": base.order_by("nivel", "id"),
+        "admin_estado": Personaje.objects.filter(estado="MUERTO").order_by("-pk"),
+        "admin_raza": Personaje.objects.filter(raza=raza).order_by("-pk"),
+    }
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("nombre", [
+    "jugador_por_id", "jugador_por_id_cursor", "jugador_por_nivel", "jugador_por_estado",
+    "pool_por_id", "pool_por_nivel", "reclamables", "gm_por_nivel", "admin_estado", "admin_raza",
+])
+def test_consulta_caliente_usa_indice(nombre, jugador, catalogos, crear_personajes):
+    crear_personajes(200)
+    crear_personajes(50, propietario=jugador, prefijo="Suyo-")
+    plan = _plan(_consultas(jugador, catalogos["razas"][0])[nombre])
+    assert not SCAN_TABLA.search(plan), plan
+    assert ORDENA_EN_MEMORIA not in plan, plan
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("analizar", [False, True])
+def test_indices_compuestos_con_y_sin_estadisticas(analizar, jugador, catalogos, crear_personajes):
+    crear_personajes(300)
+    crear_personajes(300, propietario=jugador, prefijo="Suyo-")
+    if analizar:
+        with connection.cursor() as c:
+            c.execute("ANALYZE")
+    # El mismo índice sirve al pool (IS NULL) y a un jugador (= ?)
+    assert "core_pj_prop_nivel_idx" in _plan(Personaje.objects.disponibles().order_by("nivel", "id"))
+    assert "core_pj_prop_nivel_idx" in _plan(Personaje.objects.filter(propietario_id=jugador.id).order_by("nivel", "id"))
+    assert "core_pj_prop_estado_idx" in _plan(Personaje.objects.filter(propietario_id=jugador.id, estado="VIVO"))
@@ -0,0 +1,150 @@
+import io
+import json
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+
+from core.intercambio import exportar, importar
+from core.models import Personaje
+
+
+def _linea(catalogos, nombre, **extra):
+    datos = {
+        "nombre": nombre,
+        "raza": catalogos["razas"][0].nombre,
+        "poder": catalogos["poderes"][0].nombre,
+        "equipamiento": catalogos["equipos"][0].nombre,
+    }
+    datos.update(extra)
+    return json.dumps(datos) + "\n"
+
+
+@pytest.mark.django_db
+def test_exportar_e_importar_ida_y_vuelta(jugador, crear_personajes):
+    crear_personajes(5, propietario=jugador, nivel=7)
+    crear_personajes(3, prefijo="Pool-")
+    lineas = list(exportar(chunk_size=2))
+    assert len(lineas) == 8
+    primera = json.loads(lineas[0])
+    assert primera["propietario"] == jugador.username
+    assert len(primera["opciones"]) == 3 and len(primera["seleccion"]) == 2
+
+    antes = sorted(lineas)
+    Personaje.objects.all().delete()
+    resumen = importar(lineas, lote=3)
+    assert resumen == {"creados": 8, "errores": 0, "detalle_errores": []}
+    assert sorted(exportar()) == antes
+
+
+@pytest.mark.django_db
+def test_importar_valida_como_serializer_y_clean(catalogos, jugador):
+    lineas = [
+        _linea(catalogos, "Valido", propietario=jugador.username),
+        _linea(catalogos, "ab"),                            # < 3 caracteres
+        _linea(catalogos, "Malo<script>"),                  # caracteres peligrosos
+        _linea(catalogos, "NivelCero", nivel=0),            # Personaje.clean
+        _linea(catalogos, "SinRaza", raza="NoExiste"),      # catálogo desconocido
+        _linea(catalogos, "Estado", estado="ZOMBI"),
+        _linea(catalogos, "Dueño", propietario="nadie"),
+        _linea(catalogos, "Valido"),                        # repetido
+        "{no es json\n",
+        "\n",
+        _linea(catalogos, "N" * 51),                        # max_length (SQLite no lo aplica)
+        b'{"nombre": "\xff\xfe"}\n',                     # UTF-8 inválido
+    ]
+    resumen = importar(lineas)
+    assert resumen["creados"] == 1
+    assert resumen["errores"] == 10
+    assert [e["linea"] for e in resumen["detalle_errores"]] == [2, 3, 4, 5, 6, 9, 11, 12, 7, 8]
+    assert resumen["detalle_errores"][7]["error"] == "La línea no es UTF-8 válido."
+    assert Personaje.objects.get().propietario_id == jugador.id
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("extra", [
+    {"nombre": ["Lista"]}, {"nombre": 123},
+    {"opciones": [["Sigilo"]]}, {"seleccion": [{"a": 1}]}, {"propietario": ["jug"]}, {"propietario": {"u": 1}},
+    {"estado": ["VIVO"]}, {"nivel": True}, {"nivel": "3"}, {"nivel": 2.5},
+])
+def test_importar_tipos_incorrectos_son_error_de_linea(catalogos, extra):
+    lineas = [_linea(catalogos, **{"nombre": "Tipos", **extra}), _linea(catalogos, "Bien")]
+    resumen = importar(lineas)
+    assert (resumen["creados"], resumen["errores"]) == (1, 1)
+    assert resumen["detalle_errores"][0]["linea"] == 1
+
+
+@pytest.mark.django_db
+def test_api_exportar_stream_por_rol(jugador, jugador_client, gm_client, crear_personajes):
+    crear_personajes(2, propietario=jugador)
+    crear_personajes(3, prefijo="Pool-")
+    url = reverse("personaje-exportar")
+    r = gm_client.get(url)
+    assert r.status_code == 200
+    assert r["Content-Type"] == "application/x-ndjson"
+    assert len(b"".join(r.streaming_content).splitlines()) == 5
+    r = jugador_client.get(url)
+    assert len(b"".join(r.streaming_content).splitlines()) == 2
+
+
+@pytest.mark.django_db
+def test_api_importar_solo_gm(gm_client, jugador_client, catalogos):
+    cuerpo = "".join(_linea(catalogos, f"Imp-{i}") for i in range(4))
+    url = reverse("personaje-importar")
+    r = jugador_client.post(url, data=cuerpo, content_type="application/x-ndjson")
+    assert r.status_code == 403
+    r = gm_client.post(url, data=cuerpo, content_type="application/x-ndjson")
+    assert r.status_code == 200, r.content
+    assert r.json()["creados"] == 4
+    assert Personaje.objects.filter(propietario__isnull=True).count() == 4
+
+    # Bytes que no son UTF-8: error de esa línea, no un 500
+    r = gm_client.post(url, data=b"\xff\xfe\n" + _linea(catalogos, "Imp-5").encode(),
+                       content_type="application/x-ndjson")
+    assert r.status_code == 200, r.content
+    assert (r.json()["creados"], r.json()["errores"]) == (1, 1)
+
+
+@pytest.mark.django_db
+def test_comandos_exportar_importar(tmp_path, crear_personajes):
+    crear_personajes(4)
+    ruta = tmp_path / "pjs.ndjson"
+    call_command("exportar_personajes", "--salida", str(ruta), stderr=io.StringIO())
+    Personaje.objects.all().delete()
+    out = io.StringIO()
+    call_command("importar_personajes", str(ruta), "--lote", "3", stdout=out, stderr=io.StringIO())
+    assert "4 creados" in out.getvalue()
+    assert Personaje.objects.count() == 4
+
+
+@pytest.mark.django_db
+def test_comando_importar_salta_lineas_no_utf8(tmp_path, catalogos):
+    ruta = tmp_path / "pjs.ndjson"
+    ruta.write_bytes(_linea(catalogos, "Antes").encode() + b"\xff\xfe\n" + _linea(catalogos, "Despues").encode())
+    out, err = io.StringIO(), io.StringIO()
+    call_command("importar_personajes", str(ruta), stdout=out, stderr=err)
+    assert "2 creados, 1 con errores" in out.getvalue()
+    assert "línea 2: La línea no es UTF-8 válido." in err.getvalue()
+
+
+@pytest.mark.django_db
+def test_importar_nombre_creado_a_la_vez_es_conflicto(catalogos, monkeypatch):
+    # Otra importación inserta "Carrera" justo después de comprobar los nombres existentes
+    filtrar = Personaje.objects.filter
+
+    def filter(*args, **kwargs):
+        qs = filtrar(*args, **kwargs)
+        if "nombre__in" in kwargs:
+            existentes = list(qs.values_list("nombre", flat=True))
+            Personaje.objects.create(nombre="Carrera", raza=catalogos["razas"][0], poder=catalogos["poderes"][0],
+                                     equipamiento=catalogos["equipos"][0])
+            return filtrar(nombre__in=existentes)
+        return qs
+
+    monkeypatch.setattr(Personaje.objects, "filter", filter)
+    resumen = importar([_linea(catalogos, "Carrera"), _linea(catalogos, "Libre")])
+    monkeypatch.undo()
+    assert (resumen["creados"], resumen["errores"]) == (1, 1)
+    assert resumen["detalle_errores"][0]["linea"] == 1
+    assert "Conflicto" in resumen["detalle_errores"][0]["error"]
+    assert Personaje.objects.filter(nombre__in=["Carrera", "Libre"]).count() == 2
@@ -0,0 +1,60 @@
+import pytest
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from core.metricas import registro
+
+
+@pytest.fixture(autouse=True)
+def registro_limpio():
+    registro.limpiar()
+    yield
+    registro.limpiar()
+
+
+def _fases(header):
+    return {p.split(";")[0].strip(): p for p in header.split(",")}
+
+
+@pytest.mark.django_db
+def test_server_timing_con_fases_y_consultas(gm_client, crear_personajes):
+    crear_personajes(5)
+    r = gm_client.get(reverse("personaje-list"))
+    assert r.status_code == 200
+    fases = _fases(r["Server-Timing"])
+    assert set(fases) == {"mw", "auth", "db", "vista", "render", "total"}
+    # Solo la página: el usuario sale de los claims del JWT
+    assert 'desc="1 consultas"' in fases["db"]
+
+
+@pytest.mark.django_db
+def test_metrics_expone_histogramas_por_ruta(gm_client, jugador_client, crear_personajes):
+    crear_personajes(3)
+    gm_client.get(reverse("personaje-list"))
+    jugador_client.get(reverse("personaje-disponibles"))
+    r = gm_client.get(reverse("metricas"))
+    assert r.status_code == 200
+    assert r["Content-Type"].startswith("text/plain")
+    texto = r.content.decode()
+    assert 'rpg_peticion_ms_count{ruta="GET personaje-list",fase="total"} 1' in texto
+    assert 'rpg_peticion_ms_bucket{ruta="GET personaje-disponibles",fase="db",le="+Inf"} 1' in texto
+    assert 'rpg_consultas_total{ruta="GET personaje-list"} 1' in texto
+
+
+@pytest.mark.django_db
+def test_metrics_solo_gm_o_staff(jugador_client, jugador, auth_client):
+    assert jugador_client.get(reverse("metricas")).status_code == 403
+    jugador.is_staff = True
+    jugador.save()
+    assert auth_client(jugador).get(reverse("metricas")).status_code == 200
+
+
+@pytest.mark.django_db
+def test_instrumentacion_desactivable(settings, gm):
+    settings.INSTRUMENTACION = False
+    client = APIClient()
+    client.force_authenticate(gm)
+    r = client.get("/api/yo/")
+    assert r.status_code == 200
+    assert "Server-Timing" not in r
+    assert registro.texto().count("rpg_peticion_ms_count") == 0
@@ -73,7 +73,7 @@ def test_jugador_no_ve_personajes_de_otros_en_listado():
     url_list = reverse("personaje-list")  # router.register("personajes", PersonajeViewSet)
     r = c.get(url_list)
     assert r.status_code == 200
-    nombres = [x["nombre"] for x in r.json()]
+    nombres = [x["nombre"] for x in r.json()["results"]]
     assert "DeOtro" not in nombres
 
 
@@ -0,0 +1,259 @@
+import base64
+import json
+import re
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from core.pagination import PaginacionPorClave
+from core.serializers import PersonajeListaSerializer
+from core.models import AuditLog, Personaje
+
+
+# Consultas esperadas por petición: 1 (página con JOINs); el usuario sale del JWT
+CONSULTAS_LISTADO = 1
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("n", [10, 1_000, 10_000])
+def test_listado_gm_consultas_constantes(n, gm_client, crear_personajes, django_assert_num_queries):
+    crear_personajes(n)
+    with django_assert_num_queries(CONSULTAS_LISTADO):
+        r = gm_client.get(reverse("personaje-list"))
+    assert r.status_code == 200
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("n", [10, 1_000, 10_000])
+def test_disponibles_consultas_constantes(n, jugador_client, crear_personajes, django_assert_num_queries):
+    crear_personajes(n)
+    with django_assert_num_queries(CONSULTAS_LISTADO):
+        r = jugador_client.get(reverse("personaje-disponibles"))
+    assert r.status_code == 200
+
+
+@pytest.mark.django_db
+def test_detalle_consultas_constantes(jugador, jugador_client, crear_personajes, django_assert_num_queries):
+    pj = crear_personajes(1, propietario=jugador)[0]
+    with django_assert_num_queries(CONSULTAS_LISTADO):
+        r = jugador_client.get(reverse("personaje-detail", args=[pj.id]))
+    assert r.status_code == 200
+    assert r.json()["propietario_username"] == jugador.username
+    assert len(r.json()["opciones"]) == 3
+    assert len(r.json()["seleccion"]) == 2
+
+
+@pytest.mark.django_db
+def test_con_relaciones_serializa_sin_consultas_extra(jugador, crear_personajes, django_assert_num_queries):
+    crear_personajes(50, propietario=jugador)
+    with django_assert_num_queries(1):
+        data = PersonajeListaSerializer(Personaje.objects.con_relaciones(), many=True).data
+    assert len(data) == 50
+    assert all(x["propietario_username"] == jugador.username for x in data)
+
+
+# ---------- Paginación keyset ----------
+def _peticion(**params):
+    return Request(APIRequestFactory().get(reverse("personaje-list"), params))
+
+
+def _recorrer(client, url, **params):
+    """Sigue los enlaces `next` y devuelve (ids, nº de páginas)."""
+    ids, paginas = [], 0
+    r = client.get(url, params)
+    while True:
+        assert r.status_code == 200, r.content
+        body = r.json()
+        ids += [x["id"] for x in body["results"]]
+        paginas += 1
+        if not body["next"]:
+            return ids, paginas
+        r = client.get(body["next"])
+
+
+@pytest.mark.django_db
+def test_paginacion_por_id_recorre_todo_sin_repetir(gm_client, crear_personajes):
+    pjs = crear_personajes(23)
+    ids, paginas = _recorrer(gm_client, reverse("personaje-list"), page_size=5)
+    assert ids == sorted(p.id for p in pjs)
+    assert paginas == 5
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("ordering", ["nivel", "-nivel"])
+def test_paginacion_por_nivel_con_empates(ordering, gm_client, crear_personajes):
+    # Muchos empates de nivel: el id desempata y ninguna fila se pierde o repite
+    for nivel in (3, 1, 2):
+        crear_personajes(7, prefijo=f"N{nivel}-", nivel=nivel)
+    ids, _ = _recorrer(gm_client, reverse("personaje-list"), page_size=4, ordering=ordering)
+    esperado = list(
+        Personaje.objects.order_by(ordering, ("-" if ordering.startswith("-") else "") + "id")
+        .values_list("id", flat=True)
+    )
+    assert ids == esperado
+
+
+@pytest.mark.django_db
+def test_paginacion_previous_vuelve_a_la_pagina_anterior(gm_client, crear_personajes):
+    crear_personajes(12, nivel=5)
+    url = reverse("personaje-list")
+    p1 = gm_client.get(url, {"page_size": 5, "ordering": "-nivel"}).json()
+    assert p1["previous"] is None
+    p2 = gm_client.get(p1["next"]).json()
+    atras = gm_client.get(p2["previous"]).json()
+    assert [x["id"] for x in atras["results"]] == [x["id"] for x in p1["results"]]
+
+
+@pytest.mark.django_db
+def test_paginacion_pagina_profunda_sin_count(gm_client, crear_personajes):
+    crear_personajes(300)
+    url = reverse("personaje-list")
+    profunda = gm_client.get(url, {"page_size": 250}).json()["next"]
+    with CaptureQueriesContext(connection) as ctx:
+        r = gm_client.get(profunda)
+    assert r.status_code == 200
+    assert len(r.json()["results"]) == 50
+    assert len(ctx.captured_queries) == CONSULTAS_LISTADO
+    assert not any("COUNT(" in q["sql"].upper() for q in ctx.captured_queries)
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("ordering", ["nivel", "-nivel", "nombre", "-nombre"])
+def test_pagina_profunda_busca_en_el_indice(ordering, crear_personajes):
+    # El cursor acota la primera columna: SEARCH (nivel>?) en el índice, no un SCAN desde el principio
+    for nivel in range(1, 11):
+        crear_personajes(100, prefijo=f"N{nivel}-", nivel=nivel)
+    paginador = PaginacionPorClave()
+    primera = paginador.paginate_queryset(Personaje.objects.order_by("id"), _peticion(ordering=ordering))
+    cursor = parse_qs(urlsplit(paginador.encode_cursor(primera[-1], atras=False)).query)["cursor"][0]
+    plan = paginador._consulta(Personaje.objects.con_relaciones(),
+                               _peticion(ordering=ordering, cursor=cursor), None).explain()
+    assert re.search(rf"SEARCH core_personaje USING INDEX \S+ \({ordering.lstrip('-')}[<>]\?\)", plan), plan
+    assert "SCAN core_personaje" not in plan, plan
+
+
+@pytest.mark.django_db
+def test_paginacion_disponibles(jugador_client, crear_personajes, jugador):
+    crear_personajes(4, propietario=jugador, prefijo="Mio-")
+    pool = crear_personajes(9)
+    ids, paginas = _recorrer(jugador_client, reverse("personaje-disponibles"), page_size=3)
+    assert ids == [p.id for p in pool]
+    assert paginas == 3
+
+
+@pytest.mark.django_db
+def test_paginacion_rechaza_orden_y_cursor_invalidos(gm_client, crear_personajes):
+    crear_personajes(3)
+    url = reverse("personaje-list")
+    assert gm_client.get(url, {"ordering": "propietario"}).status_code == 400
+    assert gm_client.get(url, {"cursor": "no-es-un-cursor"}).status_code == 404
+    # Cursor generado con otro orden
+    sig = gm_client.get(url, {"page_size": 1}).json()["next"]
+    assert gm_client.get(sig + "&ordering=nivel").status_code == 404
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("orden,valor", [
+    ("nivel", None), ("nivel", "x"), ("nivel", {}), ("nivel", []), ("nivel", True), ("nivel", 2 ** 64),
+    ("nombre", None), ("nombre", 3), ("nombre", ["a"]), ("id", "ignorado"),
+])
+def test_cursor_manipulado_da_404(gm_client, crear_personajes, orden, valor):
+    crear_personajes(3)
+    datos = {"o": orden, "id": 2 ** 70 if orden == "id" else 1, "v": valor}
+    crudo = base64.urlsafe_b64encode(json.dumps(datos).encode()).decode()
+    r = gm_client.get(reverse("personaje-list"), {"ordering": orden, "cursor": crudo})
+    assert r.status_code == 404
+    assert r.json() == {"detail": "Cursor inválido."}
+
+
+# ---------- Elegir del pool (UPDATE condicional) ----------
+@pytest.mark.django_db
+def test_elegir_es_un_unico_update(jugador, jugador_client, personaje_en_pool, django_assert_num_queries):
+    url = reverse("personaje-elegir", args=[personaje_en_pool.id])
+    # Solo el UPDATE ... WHERE propietario IS NULL
+    with django_assert_num_queries(1):
+        r = jugador_client.post(url)
+    assert r.status_code == 200, r.content
+    assert r.json() == {"ok": True, "personaje": personaje_en_pool.id, "propietario": jugador.username}
+    personaje_en_pool.refresh_from_db()
+    assert personaje_en_pool.propietario_id == jugador.id
+
+
+@pytest.mark.django_db
+def test_elegir_rechaza_con_propietario_muerto_o_inexistente(jugador_client, personaje_de_jugador, personaje_en_pool):
+    r = jugador_client.post(reverse("personaje-elegir", args=[personaje_de_jugador.id]))
+    assert r.status_code == 400
+    assert "propietario" in r.json()["detalle"]
+
+    Personaje.objects.filter(pk=personaje_en_pool.pk).update(estado="MUERTO")
+    r = jugador_client.post(reverse("personaje-elegir", args=[personaje_en_pool.id]))
+    assert r.status_code == 400
+    assert "muerto" in r.json()["detalle"]
+    assert Personaje.objects.get(pk=personaje_en_pool.pk).propietario_id is None
+
+    assert jugador_client.post(reverse("personaje-elegir", args=[999999])).status_code == 404
+
+
+@pytest.mark.django_db
+def test_elegir_varios_reclama_solo_libres_y_vivos(jugador, jugador_client, crear_personajes, catalogos):
+    otra_raza = catalogos["razas"][1]
+    crear_personajes(3, prefijo="Muerto-", estado="MUERTO")
+    crear_personajes(2, prefijo="Ajeno-", propietario=jugador)
+    libres = crear_personajes(4, prefijo="Libre-")
+    crear_personajes(4, prefijo="OtraRaza-", raza=otra_raza)
+
+    url = reverse("personaje-elegir-varios")
+    r = jugador_client.post(url, {"cantidad": 3, "raza": catalogos["razas"][0].id}, format="json")
+    assert r.status_code == 200, r.content
+    assert r.json()["personajes"] == [p.id for p in libres[:3]]
+    # Piden 5, solo queda 1 de esa raza
+    r = jugador_client.post(url, {"cantidad": 5, "raza": catalogos["razas"][0].id}, format="json")
+    assert r.json()["personajes"] == [libres[3].id]
+    assert Personaje.objects.filter(propietario=jugador).count() == 2 + 4
+    assert jugador_client.post(url, {"cantidad": 0}, format="json").status_code == 400
+
+
+# ---------- Acciones GM en bloque ----------
+@pytest.mark.django_db
+def test_bulk_subir_nivel_salta_muertos_y_no_encontrados(gm, gm_client, crear_personajes, django_assert_num_queries):
+    vivos = crear_personajes(3, prefijo="Vivo-", nivel=4)
+    muerto = crear_personajes(1, prefijo="Muerto-", estado="MUERTO")[0]
+    ids = [p.id for p in vivos] + [muerto.id, 999999]
+    # SAVEPOINT/UPDATE/SELECT/INSERT auditoría/RELEASE: no depende del nº de ids
+    with django_assert_num_queries(5):
+        r = gm_client.post(reverse("personaje-bulk"), {"ids": ids, "accion": "subir_nivel"}, format="json")
+    assert r.status_code == 200, r.content
+    assert [x["resultado"] for x in r.json()["resultados"]] == ["ok", "ok", "ok", "muerto", "no_encontrado"]
+    assert set(Personaje.objects.filter(id__in=[p.id for p in vivos]).values_list("nivel", flat=True)) == {5}
+    assert Personaje.objects.get(pk=muerto.pk).nivel == 1
+    assert list(AuditLog.objects.values_list("accion", "usuario_id").distinct()) == [("SUBIR_NIVEL", gm.id)]
+    assert AuditLog.objects.count() == 3
+
+
+@pytest.mark.django_db
+def test_bulk_cambiar_estado_y_liberar(gm_client, jugador, crear_personajes):
+    pjs = crear_personajes(4, propietario=jugador)
+    ids = [p.id for p in pjs]
+    r = gm_client.post(reverse("personaje-bulk"), {"ids": ids, "accion": "cambiar_estado", "estado": "CONGELADO"}, format="json")
+    assert r.status_code == 200
+    assert set(Personaje.objects.filter(id__in=ids).values_list("estado", flat=True)) == {"CONGELADO"}
+
+    r = gm_client.post(reverse("personaje-bulk"), {"ids": ids[:2], "accion": "liberar"}, format="json")
+    assert r.status_code == 200
+    assert Personaje.objects.filter(propietario__isnull=True).count() == 2
+    assert AuditLog.objects.filter(accion="LIBERAR_PERSONAJE").count() == 2
+
+
+@pytest.mark.django_db
+def test_bulk_validacion_y_permisos(gm_client, jugador_client, crear_personajes):
+    ids = [p.id for p in crear_personajes(2)]
+    url = reverse("personaje-bulk")
+    assert jugador_client.post(url, {"ids": ids, "accion": "liberar"}, format="json").status_code == 403
+    assert gm_client.post(url, {"ids": ids, "accion": "cambiar_estado"}, format="json").status_code == 400
+    assert gm_client.post(url, {"ids": ids, "accion": "borrar"}, format="json").status_code == 400
+    assert gm_client.post(url, {"ids": [], "accion": "liberar"}, format="json").status_code == 400
@@ -0,0 +1,65 @@
+"""
+Contrato del camino rápido: para cada serializer con proyección registrada,
+el JSON renderizado debe ser idéntico byte a byte al del serializer.
+"""
+import pytest
+from django.urls import reverse
+from rest_framework.renderers import JSONRenderer
+
+from core import proyecciones
+from core.models import Equipamiento, Habilidad, Personaje, Poder, Raza
+from core.serializers import PersonajeListaSerializer
+
+render = JSONRenderer().render
+
+
+@pytest.fixture
+def variados(catalogos, crear_personajes, jugador):
+    """Con y sin propietario, opciones/selección completas, parciales y vacías."""
+    habs = catalogos["habilidades"]
+    crear_personajes(3, propietario=jugador, prefijo="Completo-")
+    crear_personajes(3, prefijo="Pool-")
+    crear_personajes(2, prefijo="Parcial-", opcion_hab1=None, opcion_hab3=habs[0], habilidad1=None)
+    crear_personajes(2, propietario=jugador, prefijo="Vacío-", estado="MUERTO", nivel=12,
+                     opcion_hab1=None, opcion_hab2=None, opcion_hab3=None, habilidad1=None, habilidad2=None)
+
+
+@pytest.mark.django_db
+def test_personaje_lista_identica_al_serializer(variados):
+    qs = Personaje.objects.con_relaciones().order_by("id")
+    esperado = render(PersonajeListaSerializer(qs, many=True).data)
+    assert render(proyecciones.PERSONAJE_LISTA.datos(qs)) == esperado
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("modelo", [Raza, Habilidad, Poder, Equipamiento])
+def test_catalogos_identicos_al_serializer(modelo, catalogos):
+    from core.views import CATALOGOS_BOOTSTRAP
+    serializer_class = next(vs.serializer_class for vs in CATALOGOS_BOOTSTRAP.values() if vs.queryset.model is modelo)
+    qs = modelo.objects.order_by("id")
+    assert render(proyecciones.para(serializer_class).datos(qs)) == render(serializer_class(qs, many=True).data)
+
+
+@pytest.mark.django_db
+def test_listado_paginado_igual_que_con_serializer(gm_client, variados):
+    ids = []
+    url, params = reverse("personaje-list"), {"page_size": 3, "ordering": "-nivel"}
+    while url:
+        cuerpo = gm_client.get(url, params).json()
+        params = None
+        esperados = Personaje.objects.con_relaciones().filter(id__in=[p["id"] for p in cuerpo["results"]])
+        por_id = {p["id"]: p for p in PersonajeListaSerializer(esperados, many=True).data}
+        assert cuerpo["results"] == [por_id[p["id"]] for p in cuerpo["results"]]
+        ids += [p["id"] for p in cuerpo["results"]]
+        url = cuerpo["next"]
+    assert ids == list(Personaje.objects.order_by("-nivel", "-id").values_list("id", flat=True))
+
+
+@pytest.mark.django_db
+def test_listado_sin_proyeccion_usa_el_serializer(monkeypatch, gm_client, variados):
+    url, params = reverse("personaje-list"), {"page_size": 4, "ordering": "nombre"}
+    con_proyeccion = gm_client.get(url, params).json()
+    monkeypatch.delitem(proyecciones.PROYECCIONES, PersonajeListaSerializer)
+    sin_proyeccion = gm_client.get(url, params).json()
+    assert sin_proyeccion == con_proyeccion
+    assert gm_client.get(sin_proyeccion["next"]).json() == gm_client.get(con_proyeccion["next"]).json()
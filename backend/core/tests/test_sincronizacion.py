@@ -0,0 +1,212 @@
+import pytest
+from django.core.management import call_command
+from django.db.models import Q
+from django.urls import reverse
+from model_bakery import baker
+
+from core import sincronizacion
+from core.models import Cambio, Personaje, Raza
+
+URL = reverse("sync")
+
+
+def _sync(client, since=None):
+    r = client.get(URL, {} if since is None else {"since": since})
+    assert r.status_code == 200, r.content
+    return r.json()
+
+
+def _ids(seccion):
+    return [f["id"] for f in seccion["cambiados"]]
+
+
+# ---------- Carga completa ----------
+@pytest.mark.django_db
+def test_sin_cursor_devuelve_todo(jugador_client, gm_client, personaje_de_jugador, personaje_en_pool):
+    datos = _sync(jugador_client)
+    assert datos["reset"] is True
+    assert _ids(datos["personajes"]) == [personaje_de_jugador.id]
+    assert _ids(datos["disponibles"]) == [personaje_en_pool.id]
+    assert datos["catalogos"] is None  # catálogos: solo GM
+    assert datos["cursor"] == Cambio.objects.order_by("-id").first().id
+
+    # Misma forma que el listado
+    listado = jugador_client.get(reverse("personaje-list")).json()["results"]
+    assert datos["personajes"]["cambiados"] == listado
+
+    gm = _sync(gm_client)
+    assert _ids(gm["personajes"]) == [personaje_de_jugador.id, personaje_en_pool.id]
+    assert [r["nombre"] for r in gm["catalogos"]["razas"]["cambiados"]] == [
+        r.nombre for r in Raza.objects.order_by("id")]
+
+
+@pytest.mark.django_db
+def test_reset_paginado_con_el_cursor(gm_client, crear_personajes):
+    pjs = crear_personajes(7)
+    r = gm_client.get(URL, {"page_size": 3})
+    assert r.status_code == 200
+    datos = r.json()
+    assert datos["reset"] is True
+    assert datos["cursor"] == Cambio.objects.order_by("-id").first().id
+    # Primera página y el resto por el listado real, como bootstrap
+    vistos, seccion = _ids(datos["personajes"]), datos["personajes"]
+    assert len(vistos) == 3 and "since" not in seccion["siguiente"]
+    siguiente = seccion["siguiente"]
+    while siguiente:
+        pagina = gm_client.get(siguiente).json()
+        vistos += [f["id"] for f in pagina["results"]]
+        siguiente = pagina["next"]
+    assert vistos == [p.id for p in pjs]
+    # Lo que cambie mientras se pagina llega en el delta desde ese cursor
+    Personaje.objects.filter(pk=pjs[0].pk).subir_nivel()
+    assert _ids(_sync(gm_client, datos["cursor"])["personajes"]) == [pjs[0].id]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("since", ["abc", "-1"])
+def test_cursor_invalido_400(jugador_client, since):
+    assert jugador_client.get(URL, {"since": since}).status_code == 400
+
+
+# ---------- Deltas ----------
+@pytest.mark.django_db
+def test_sin_cambios_cuesta_lo_mismo_con_muchas_filas(gm_client, jugador, crear_personajes,
+                                                     django_assert_num_queries):
+    crear_personajes(300)
+    crear_personajes(300, propietario=jugador, prefijo="Suyo-")
+    cursor = _sync(gm_client)["cursor"]
+    # Límites del diario + rango desde el cursor; nada que leer de las tablas
+    with django_assert_num_queries(3):
+        datos = _sync(gm_client, cursor)
+    assert datos["reset"] is False and datos["cursor"] == cursor
+    assert datos["personajes"] == datos["disponibles"] == {"cambiados": [], "borrados": []}
+
+
+@pytest.mark.django_db
+def test_update_por_conjunto_y_borrado(jugador_client, jugador, crear_personajes):
+    mios = crear_personajes(3, propietario=jugador)
+    cursor = _sync(jugador_client)["cursor"]
+
+    Personaje.objects.filter(pk=mios[0].pk).subir_nivel()  # UPDATE sin señales
+    Personaje.objects.filter(pk=mios[1].pk).delete()
+    datos = _sync(jugador_client, cursor)
+    assert datos["cursor"] > cursor
+    assert [(f["id"], f["nivel"]) for f in datos["personajes"]["cambiados"]] == [(mios[0].id, 2)]
+    assert datos["personajes"]["borrados"] == [mios[1].id]
+
+    # El cursor nuevo ya no repite nada
+    assert _ids(_sync(jugador_client, datos["cursor"])["personajes"]) == []
+
+
+@pytest.mark.django_db
+def test_cambio_de_dueño_llega_como_borrado(jugador_client, jugador, gm_client, personaje_de_jugador,
+                                            personaje_en_pool, auth_client):
+    otro = baker.make("core.Usuario", username="otro", rol="JUGADOR")
+    cursor = _sync(jugador_client)["cursor"]
+
+    gm_client.post(reverse("personaje-liberar", args=[personaje_de_jugador.id]))
+    auth_client(otro).post(reverse("personaje-elegir", args=[personaje_en_pool.id]))
+    datos = _sync(jugador_client, cursor)
+    # Su personaje pasó al pool; el del pool se lo llevó otro
+    assert datos["personajes"] == {"cambiados": [], "borrados": [personaje_de_jugador.id]}
+    assert _ids(datos["disponibles"]) == [personaje_de_jugador.id]
+    assert datos["disponibles"]["borrados"] == [personaje_en_pool.id]
+
+    # El nuevo dueño lo recibe en los suyos
+    datos_otro = _sync(auth_client(otro), cursor)
+    assert _ids(datos_otro["personajes"]) == [personaje_en_pool.id]
+
+
+@pytest.mark.django_db
+def test_cambios_ajenos_no_se_leen(jugador_client, jugador, crear_personajes, auth_client):
+    otro = baker.make("core.Usuario", username="otro", rol="JUGADOR")
+    ajenos = crear_personajes(5, propietario=otro, prefijo="Ajeno-")
+    cursor = _sync(jugador_client)["cursor"]
+    Personaje.objects.filter(id__in=[p.id for p in ajenos]).subir_nivel()
+    datos = _sync(jugador_client, cursor)
+    assert datos["personajes"] == datos["disponibles"] == {"cambiados": [], "borrados": []}
+    assert datos["cursor"] > cursor  # avanza igualmente
+
+
+@pytest.mark.django_db
+def test_renombrar_catalogo_y_usuario(gm_client, jugador, catalogos, crear_personajes):
+    pjs = crear_personajes(2, propietario=jugador)
+    suelta = baker.make(Raza, nombre="Sin usar")
+    suelta_id = suelta.id
+    cursor = _sync(gm_client)["cursor"]
+
+    raza = catalogos["razas"][0]
+    raza.nombre = "Renombrada"
+    raza.save()
+    suelta.delete()
+    datos = _sync(gm_client, cursor)
+    razas = datos["catalogos"]["razas"]
+    assert razas == {"cambiados": [{"id": raza.id, "nombre": "Renombrada"}], "borrados": [suelta_id]}
+    # Los personajes muestran raza_nombre: vuelven con el nombre nuevo
+    assert {f["raza_nombre"] for f in datos["personajes"]["cambiados"]} == {"Renombrada"}
+    assert _ids(datos["personajes"]) == [p.id for p in pjs]
+
+    cursor = datos["cursor"]
+    jugador.username = "renombrado"
+    jugador.save()
+    datos = _sync(gm_client, cursor)
+    assert {f["propietario_username"] for f in datos["personajes"]["cambiados"]} == {"renombrado"}
+
+
+@pytest.mark.django_db
+def test_respuestas_por_tandas(settings, gm_client, crear_personajes):
+    settings.SYNC_LIMITE = 4
+    pjs = crear_personajes(10)
+    cursor = _sync(gm_client)["cursor"]
+    Personaje.objects.all().subir_nivel()
+
+    vistos, tandas = set(), 0
+    while True:
+        datos = _sync(gm_client, cursor)
+        vistos |= set(_ids(datos["personajes"]))
+        cursor, tandas = datos["cursor"], tandas + 1
+        if not datos["mas"]:
+            break
+    assert vistos == {p.id for p in pjs}
+    assert tandas == 3
+
+
+# ---------- Cursor caducado ----------
+@pytest.mark.django_db
+def test_cursor_podado_o_ajeno_da_reset(jugador_client, jugador, crear_personajes):
+    mios = crear_personajes(3, propietario=jugador)
+    viejo = _sync(jugador_client)["cursor"]
+    Personaje.objects.filter(pk=mios[0].pk).subir_nivel()
+    Personaje.objects.filter(pk=mios[1].pk).subir_nivel()
+
+    call_command("podar_cambios", dias=0)
+    assert Cambio.objects.count() == 1  # la última se conserva
+    datos = _sync(jugador_client, viejo)
+    assert datos["reset"] is True
+    assert _ids(datos["personajes"]) == [p.id for p in mios]
+    # El cursor de esa respuesta vuelve a ser válido
+    assert _sync(jugador_client, datos["cursor"])["reset"] is False
+    # Un cursor posterior al final del diario es de otra BD
+    assert _sync(jugador_client, datos["cursor"] + 100)["reset"] is True
+
+
+def test_validez_del_cursor():
+    assert sincronizacion.cursor_valido(0, None, 0)  # diario vacío
+    assert not sincronizacion.cursor_valido(5, None, 0)
+    assert sincronizacion.cursor_valido(9, 10, 20)  # justo antes del primero conservado
+    assert not sincronizacion.cursor_valido(8, 10, 20)
+    assert not sincronizacion.cursor_valido(21, 10, 20)
+
+
+# ---------- Índices ----------
+@pytest.mark.django_db
+def test_delta_de_jugador_usa_indices(jugador, crear_personajes):
+    crear_personajes(200)
+    crear_personajes(50, propietario=jugador, prefijo="Suyo-")
+    Personaje.objects.all().subir_nivel()
+    plan = Cambio.objects.filter(id__gt=10, tabla=Cambio.Tabla.PERSONAJE).filter(
+        Q(propietario_id=jugador.id) | Q(anterior_id=jugador.id)
+        | Q(propietario_id__isnull=True) | Q(anterior_id__isnull=True)
+    ).explain()
+    assert "SCAN core_cambio" not in plan, plan
+    assert "core_cambio_prop_idx" in plan and "core_cambio_anterior_idx" in plan, plan
@@ -0,0 +1,76 @@
+import os
+import sqlite3
+import subprocess
+import sys
+
+import pytest
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+
+from core import sqlite
+
+
+WAL = {"journal_mode": "WAL", "synchronous": "NORMAL"}
+
+
+def test_perfil_aplica_wal_y_pragmas_en_fichero(settings, tmp_path):
+    con = sqlite3.connect(tmp_path / "bd.sqlite3")
+    valores = {**WAL, **settings.SQLITE_PRAGMAS}
+    sqlite.aplicar(con, valores)
+    assert sqlite.leer(con, ["journal_mode"]) == {"journal_mode": "wal"}
+    assert sqlite.diferencias(con, valores) == []
+    con.close()
+
+
+def test_wal_no_se_aplica_por_defecto(settings, tmp_path):
+    # El db.sqlite3 del repo no debe pasar a WAL por ejecutar un manage.py
+    assert not settings.SQLITE_WAL
+    con = sqlite3.connect(tmp_path / "bd.sqlite3")
+    sqlite.aplicar(con, settings.SQLITE_PRAGMAS)
+    assert sqlite.leer(con, ["journal_mode", "synchronous"]) == {"journal_mode": "delete", "synchronous": 2}
+    con.close()
+    assert not (tmp_path / "bd.sqlite3-wal").exists()
+
+
+def test_diferencias_detecta_pragmas_sin_aplicar(settings, tmp_path):
+    con = sqlite3.connect(tmp_path / "bd.sqlite3")
+    fallos = dict((n, (e, a)) for n, e, a in sqlite.diferencias(con, {**WAL, **settings.SQLITE_PRAGMAS}))
+    # SQLite de serie: journal en disco y fsync completo
+    assert fallos["journal_mode"] == ("wal", "delete")
+    assert fallos["synchronous"] == (1, 2)
+    con.close()
+
+
+@pytest.mark.django_db
+def test_conexion_de_django_sale_configurada():
+    connection.ensure_connection()
+    actuales = sqlite.leer(connection.connection, ["busy_timeout", "temp_store"])
+    assert actuales == {"busy_timeout": 5000, "temp_store": 2}
+
+
+@pytest.mark.django_db
+def test_comando_comprobar_sqlite(capsys):
+    call_command("comprobar_sqlite")
+    assert "PRAGMAs correctos" in capsys.readouterr().out
+    connection.connection.execute("PRAGMA cache_size=-2000")
+    try:
+        with pytest.raises(CommandError, match="cache_size=-2000"):
+            call_command("comprobar_sqlite")
+    finally:
+        connection.connection.execute("PRAGMA cache_size=-64000")
+
+
+@pytest.mark.parametrize("modulo, esperado", [("rpg.wsgi", 600), ("rpg.asgi", 0)])
+def test_conexion_persistente_solo_bajo_wsgi(modulo, esperado):
+    codigo = (
+        f"import importlib; importlib.import_module('{modulo}'); "
+        "from django.conf import settings; print(settings.DATABASES['default']['CONN_MAX_AGE'])"
+    )
+    entorno = {k: v for k, v in os.environ.items() if k not in ("DB_CONN_MAX_AGE", "DJANGO_SERVIDOR")}
+    entorno["DJANGO_SETTINGS_MODULE"] = "rpg.settings"
+    salida = subprocess.run(
+        [sys.executable, "-c", codigo], cwd=settings.BASE_DIR, env=entorno, capture_output=True, text=True, check=True
+    )
+    assert salida.stdout.strip() == str(esperado)
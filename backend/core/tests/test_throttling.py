@@ -0,0 +1,68 @@
+import pytest
+from django.urls import reverse
+
+from core.throttling import Almacen
+
+
+@pytest.fixture
+def tasas(settings):
+    """Fija las tasas de DRF para el test: tasas(user="5/min", anon=...)."""
+    def _fijar(**tasas):
+        settings.REST_FRAMEWORK = {
+            **settings.REST_FRAMEWORK,
+            "DEFAULT_THROTTLE_RATES": {"anon": "1000/min", "user": "1000/min", **tasas},
+        }
+    return _fijar
+
+
+# ---------- Cubo de fichas ----------
+def test_cubo_recarga_y_gasta_en_una_operacion(settings, tmp_path):
+    settings.THROTTLE_DB = str(tmp_path / "t.sqlite3")
+    a = Almacen()
+    # Capacidad 3, 1 ficha/s
+    assert [a.gastar("k", 1, 3, 1.0, ahora=100)[0] for _ in range(4)] == [True, True, True, False]
+    # 1,5 s después hay 1,5 fichas: alcanza para 1 pero no para 2
+    assert a.gastar("k", 2, 3, 1.0, ahora=101.5) == (False, 1.5)
+    assert a.gastar("k", 1, 3, 1.0, ahora=101.5) == (True, 0.5)
+    # Nunca se acumula por encima de la capacidad
+    assert a.gastar("k", 1, 3, 1.0, ahora=10_000) == (True, 2.0)
+
+
+def test_cubo_compartido_entre_conexiones(settings, tmp_path):
+    # Dos almacenes = dos workers con su propia conexión al mismo fichero
+    settings.THROTTLE_DB = str(tmp_path / "t.sqlite3")
+    w1, w2 = Almacen(), Almacen()
+    permitidos = [w.gastar("user:1", 1, 4, 0.0, ahora=0)[0] for w in (w1, w2, w1, w2, w1)]
+    assert permitidos == [True, True, True, True, False]
+
+
+# ---------- Integración con DRF ----------
+@pytest.mark.django_db
+def test_usuario_recibe_429_con_retry_after(tasas, jugador_client):
+    tasas(user="3/min")
+    url = reverse("personaje-list")
+    assert [jugador_client.get(url).status_code for _ in range(4)] == [200, 200, 200, 429]
+    r = jugador_client.get(url)
+    assert r.status_code == 429
+    assert 1 <= int(r["Retry-After"]) <= 20
+
+
+@pytest.mark.django_db
+def test_exportar_gasta_mas_presupuesto(tasas, gm_client):
+    tasas(user="25/min")
+    assert gm_client.get(reverse("personaje-exportar")).status_code == 200  # coste 20
+    codigos = [gm_client.get(reverse("personaje-list")).status_code for _ in range(6)]
+    assert codigos == [200] * 5 + [429]
+
+
+@pytest.mark.django_db
+def test_presupuesto_por_usuario_y_anonimos_por_ip(tasas, gm_client, jugador_client, api_client):
+    tasas(user="2/min", anon="1/min")
+    url = reverse("personaje-list")
+    assert [gm_client.get(url).status_code for _ in range(3)] == [200, 200, 429]
+    # El jugador tiene su propio cubo
+    assert jugador_client.get(url).status_code == 200
+    # Anónimos (por IP) en endpoints públicos: login fallido, luego 429
+    login = reverse("token_obtain_pair")
+    datos = {"username": "nadie", "password": "x"}
+    assert [api_client.post(login, datos).status_code for _ in range(2)] == [401, 429]
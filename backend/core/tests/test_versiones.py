@@ -0,0 +1,142 @@
+import pytest
+from django.urls import reverse
+
+from core.models import Personaje, Raza
+
+
+def _detalle(pj):
+    return reverse("personaje-detail", args=[pj.id])
+
+
+def _subio(pj, antes):
+    """La fila tiene versión y fecha nuevas respecto a `antes` (version, actualizado)."""
+    version, actualizado = Personaje.objects.values_list("version", "actualizado").get(pk=pj.pk)
+    return version > antes[0] and actualizado > antes[1]
+
+
+# ---------- Toda escritura sube versión y fecha ----------
+@pytest.mark.django_db
+@pytest.mark.parametrize("accion", [
+    "perform_update", "set_opciones", "elegir_habilidades", "subir_nivel",
+    "cambiar_estado", "liberar", "elegir", "bulk",
+])
+def test_cada_ruta_de_escritura_sube_la_version(accion, gm_client, jugador_client, catalogos, personaje_de_jugador,
+                                                personaje_en_pool):
+    habs = catalogos["habilidades"]
+    pj = personaje_en_pool if accion == "elegir" else personaje_de_jugador
+    if accion == "elegir_habilidades":
+        Personaje.objects.filter(pk=pj.pk).update(opcion_hab1=habs[0], opcion_hab2=habs[1], opcion_hab3=habs[2])
+    antes = Personaje.objects.values_list("version", "actualizado").get(pk=pj.pk)
+
+    url = {
+        "perform_update": _detalle(pj),
+        "set_opciones": reverse("personaje-set-opciones", args=[pj.id]),
+        "elegir_habilidades": reverse("personaje-elegir-habilidades", args=[pj.id]),
+        "subir_nivel": reverse("personaje-subir-nivel", args=[pj.id]),
+        "cambiar_estado": reverse("personaje-cambiar-estado", args=[pj.id]),
+        "liberar": reverse("personaje-liberar", args=[pj.id]),
+        "elegir": reverse("personaje-elegir", args=[pj.id]),
+        "bulk": reverse("personaje-bulk"),
+    }[accion]
+    if accion == "perform_update":
+        r = gm_client.patch(url, {"nombre": "Renombrado"}, format="json")
+    elif accion == "set_opciones":
+        r = gm_client.patch(url, {"opcion_hab1": habs[0].id}, format="json")
+    elif accion == "elegir_habilidades":
+        r = jugador_client.post(url, {"habilidades": [habs[0].id, habs[1].id]}, format="json")
+    elif accion == "cambiar_estado":
+        r = gm_client.post(url, {"estado": "CONGELADO"}, format="json")
+    elif accion == "elegir":
+        r = jugador_client.post(url)
+    elif accion == "bulk":
+        r = gm_client.post(url, {"ids": [pj.id], "accion": "subir_nivel"}, format="json")
+    else:
+        r = gm_client.post(url)
+    assert r.status_code == 200, r.content
+    assert _subio(pj, antes)
+
+
+@pytest.mark.django_db
+def test_save_con_update_fields_y_update_por_conjunto(personaje_en_pool):
+    pj = personaje_en_pool
+    assert pj.version == 1
+    pj.nivel = 5
+    pj.save(update_fields=["nivel"])
+    assert Personaje.objects.get(pk=pj.pk).version == 2
+    Personaje.objects.filter(pk=pj.pk).subir_nivel()
+    assert Personaje.objects.get(pk=pj.pk).version == 3
+
+
+# ---------- Detalle ----------
+@pytest.mark.django_db
+def test_detalle_etag_y_last_modified(jugador_client, personaje_de_jugador, django_assert_num_queries):
+    url = _detalle(personaje_de_jugador)
+    r = jugador_client.get(url)
+    etag, ultima = r["ETag"], r["Last-Modified"]
+
+    with django_assert_num_queries(1):
+        r = jugador_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert r.status_code == 304
+    assert r["ETag"] == etag
+    assert jugador_client.get(url, HTTP_IF_MODIFIED_SINCE=ultima).status_code == 304
+
+    Personaje.objects.filter(pk=personaje_de_jugador.pk).update(nivel=2)
+    r = jugador_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert r.status_code == 200
+    assert r["ETag"] != etag
+    assert r.json()["nivel"] == 2
+
+
+@pytest.mark.django_db
+def test_detalle_condicional_respeta_la_visibilidad(jugador_client, personaje_en_pool):
+    # Del pool: no es suyo, no hay 304 ni ETag que filtren que existe
+    r = jugador_client.get(_detalle(personaje_en_pool), HTTP_IF_NONE_MATCH='"x"')
+    assert r.status_code == 404
+    # pk mal formado: el mismo 404 que sin cabeceras condicionales
+    for cabeceras in ({}, {"HTTP_IF_NONE_MATCH": '"x"'}, {"HTTP_IF_MODIFIED_SINCE": "Wed, 21 Oct 2015 07:28:00 GMT"}):
+        assert jugador_client.get("/api/personajes/abc/", **cabeceras).status_code == 404
+
+
+@pytest.mark.django_db
+def test_renombrar_un_catalogo_cambia_el_etag(jugador_client, personaje_de_jugador):
+    url = _detalle(personaje_de_jugador)
+    etag = jugador_client.get(url)["ETag"]
+    raza = personaje_de_jugador.raza
+    raza.nombre = "Raza renombrada"
+    raza.save()
+    r = jugador_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert r.status_code == 200
+    assert r.json()["raza_nombre"] == "Raza renombrada"
+
+
+# ---------- Listados ----------
+@pytest.mark.django_db
+@pytest.mark.parametrize("nombre_url", ["personaje-list", "personaje-disponibles"])
+def test_listado_304_sin_consultas(nombre_url, gm_client, crear_personajes, django_assert_num_queries):
+    crear_personajes(5)
+    url = reverse(nombre_url)
+    etag = gm_client.get(url)["ETag"]
+    with django_assert_num_queries(0):
+        r = gm_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert r.status_code == 304
+
+    # Cualquier escritura invalida: aquí un UPDATE por conjunto
+    Personaje.objects.all().subir_nivel()
+    r = gm_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert r.status_code == 200
+    assert r["ETag"] != etag
+
+
+@pytest.mark.django_db
+def test_etag_de_listado_depende_de_usuario_y_parametros(gm_client, jugador_client, crear_personajes, catalogos):
+    crear_personajes(3)
+    url = reverse("personaje-list")
+    etag_gm = gm_client.get(url)["ETag"]
+    assert jugador_client.get(url, HTTP_IF_NONE_MATCH=etag_gm).status_code == 200
+    assert gm_client.get(url, {"ordering": "-id"}, HTTP_IF_NONE_MATCH=etag_gm).status_code == 200
+    # Borrar y renombrar catálogos también invalida
+    Personaje.objects.first().delete()
+    assert gm_client.get(url, HTTP_IF_NONE_MATCH=etag_gm).status_code == 200
+    etag = gm_client.get(url)["ETag"]
+    Raza.objects.filter(pk=catalogos["razas"][0].pk).first().save()
+    assert gm_client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200
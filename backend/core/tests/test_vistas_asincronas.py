@@ -0,0 +1,147 @@
+import asyncio
+from unittest import mock
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.test import AsyncClient
+from django.urls import reverse
+from django.utils.module_loading import import_string
+from model_bakery import baker
+from rest_framework.views import APIView
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from core.autenticacion import tokens_para
+from core.models import Personaje, Raza
+from core.throttling import CuboThrottle
+
+
+def _par(client, sincrona, asincrona, args=(), **extra):
+    """Misma petición a la vista DRF y a su versión async."""
+    return (client.get(reverse(sincrona, args=args), **extra),
+            client.get(reverse(asincrona, args=args), **extra))
+
+
+def _iguales(r_sync, r_async):
+    assert r_async.status_code == r_sync.status_code
+    assert r_async.content == r_sync.content or r_async.json() == r_sync.json()
+
+
+# ---------- Mismas respuestas que las vistas síncronas ----------
+@pytest.mark.django_db
+def test_personajes_y_disponibles(jugador_client, gm_client, jugador, crear_personajes, personaje_en_pool):
+    crear_personajes(5, propietario=jugador)
+    crear_personajes(3, prefijo="Otro-")
+    for client in (jugador_client, gm_client):
+        _iguales(*_par(client, "personaje-list", "async-personaje-list"))
+        _iguales(*_par(client, "personaje-disponibles", "async-personaje-disponibles"))
+
+    # Filtros, orden y paginación por cursor
+    params = {"page_size": 2, "ordering": "-nombre", "estado": "VIVO"}
+    r_sync = gm_client.get(reverse("personaje-list"), params).json()
+    r_async = gm_client.get(reverse("async-personaje-list"), params).json()
+    assert r_async["results"] == r_sync["results"]
+    siguiente = gm_client.get(r_async["next"]).json()
+    assert siguiente["results"] == gm_client.get(r_sync["next"]).json()["results"]
+
+
+@pytest.mark.django_db
+def test_detalle_y_errores(jugador_client, gm_client, personaje_de_jugador, personaje_en_pool, api_client):
+    pj = personaje_de_jugador
+    r_sync, r_async = _par(jugador_client, "personaje-detail", "async-personaje-detail", args=[pj.id])
+    _iguales(r_sync, r_async)
+    assert r_async["ETag"] == r_sync["ETag"]
+    assert r_async["Last-Modified"] == r_sync["Last-Modified"]
+
+    # 404 (no visible para el jugador), 401 sin token, 403 catálogos para jugador
+    _iguales(*_par(jugador_client, "personaje-detail", "async-personaje-detail", args=[personaje_en_pool.id]))
+    r_sync, r_async = _par(api_client, "personaje-list", "async-personaje-list")
+    _iguales(r_sync, r_async)
+    assert r_async.status_code == 401
+    assert r_async["WWW-Authenticate"] == r_sync["WWW-Authenticate"]
+    _iguales(*_par(jugador_client, "raza-list", "async-razas-list"))
+    for client in (api_client, jugador_client):
+        _iguales(client.get("/api/yo/"), client.get(reverse("async-yo")))
+
+    # Solo lectura
+    r = gm_client.post(reverse("async-personaje-list"), {})
+    assert r.status_code == 405 and r["Allow"] == "GET, HEAD"
+
+
+@pytest.mark.django_db
+def test_catalogos(gm_client, catalogos):
+    _iguales(*_par(gm_client, "raza-list", "async-razas-list"))
+    raza = catalogos["razas"][0]
+    r_sync, r_async = _par(gm_client, "raza-detail", "async-razas-detail", args=[raza.id])
+    _iguales(r_sync, r_async)
+    assert r_async["ETag"] == r_sync["ETag"]
+    _iguales(*_par(gm_client, "raza-detail", "async-razas-detail", args=[10 ** 6]))
+
+    # La caché es la misma: una escritura invalida las dos
+    baker.make(Raza, nombre="Nueva")
+    assert "Nueva" in {r["nombre"] for r in gm_client.get(reverse("async-razas-list")).json()}
+
+
+# ---------- Peticiones condicionales ----------
+@pytest.mark.django_db
+def test_etag_y_304(jugador_client, personaje_de_jugador, django_assert_num_queries):
+    url = reverse("async-personaje-detail", args=[personaje_de_jugador.id])
+    etag = jugador_client.get(url)["ETag"]
+    with django_assert_num_queries(1):  # solo los validadores
+        assert jugador_client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+
+    lista = reverse("async-personaje-list")
+    etag = jugador_client.get(lista)["ETag"]
+    with django_assert_num_queries(0):
+        assert jugador_client.get(lista, HTTP_IF_NONE_MATCH=etag).status_code == 304
+
+    Personaje.objects.filter(pk=personaje_de_jugador.pk).subir_nivel()
+    assert jugador_client.get(lista, HTTP_IF_NONE_MATCH=etag).status_code == 200
+
+
+@pytest.mark.django_db
+def test_autenticacion_de_drf(monkeypatch, gm_client, catalogos, django_assert_num_queries):
+    # Las clases de DEFAULT_AUTHENTICATION_CLASSES, no JWTSinBD fijo: con
+    # JWT_SIN_BD=False el usuario se carga de la BD en las dos
+    monkeypatch.setattr(APIView, "authentication_classes", [JWTAuthentication])
+    gm_client.get(reverse("raza-list"))  # catálogo ya en caché: solo queda el usuario
+    for nombre in ("raza-list", "async-razas-list"):
+        with django_assert_num_queries(1):
+            assert gm_client.get(reverse(nombre)).status_code == 200
+
+
+# ---------- Bajo ASGI ----------
+@pytest.mark.django_db(transaction=True)
+def test_asgi_sin_hilos_de_por_medio(jugador, personaje_de_jugador):
+    # Todos los middlewares admiten async: Django no mete la vista en un hilo
+    for ruta in settings.MIDDLEWARE:
+        assert getattr(import_string(ruta), "async_capable", False), ruta
+
+    token = tokens_para(jugador)["access"]
+
+    async def escenario():
+        cliente, cabeceras = AsyncClient(), {"Authorization": f"Bearer {token}"}
+        yo = await cliente.get(reverse("async-yo"), headers=cabeceras)
+        detalle = await cliente.get(reverse("async-personaje-detail", args=[personaje_de_jugador.id]),
+                                    headers=cabeceras)
+        return yo, detalle
+
+    en_el_loop = []
+    permitir = CuboThrottle.allow_request
+
+    def anotar(self, request, view):
+        # ¿Se está ejecutando dentro del event loop?
+        try:
+            asyncio.get_running_loop()
+            en_el_loop.append(True)
+        except RuntimeError:
+            en_el_loop.append(False)
+        return permitir(self, request, view)
+
+    with mock.patch.object(CuboThrottle, "allow_request", anotar):
+        yo, detalle = async_to_sync(escenario)()
+    assert yo.json() == {"id": jugador.id, "usuario": jugador.username, "rol": "JUGADOR"}
+    assert detalle.json()["nombre"] == personaje_de_jugador.nombre
+    assert "Server-Timing" in detalle
+    # El throttling (E/S en SQLite) se hace en un hilo, no en el loop
+    assert en_el_loop and not any(en_el_loop)
@@ -0,0 +1,140 @@
+"""
+Límite de tasa compartido entre procesos (cubo de fichas en SQLite).
+
+- Cada cliente (usuario o IP) y ámbito ("user", "anon") tiene UNA fila con
+  (fichas, t): memoria O(1) por cliente, sin listas de marcas de tiempo.
+- La recarga y el gasto se hacen en un único UPSERT atómico, así que varios
+  workers (gunicorn, runserver con hilos) comparten el mismo presupuesto.
+- Coste por ámbito de vista: `throttle_coste` en la vista o en @action(...)
+  (exportar, importar o bulk gastan más que un GET normal).
+- Almacén: fichero SQLite propio (THROTTLE_DB), fuera de la BD principal para
+  no sumar consultas ni bloqueos a las peticiones; no necesita servicios externos.
+"""
+import os
+import random
+import sqlite3
+import threading
+import time
+
+from django.conf import settings
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+PROB_PURGA = 0.001  # 1 de cada 1000 peticiones borra cubos ya llenos
+
+_SQL_CREAR = "CREATE TABLE IF NOT EXISTS cubo (clave TEXT PRIMARY KEY, fichas REAL NOT NULL, t REAL NOT NULL)"
+# Recarga + gasto en una sola sentencia: si no hay fichas suficientes el WHERE
+# impide el UPDATE y RETURNING no devuelve fila.
+_SQL_GASTAR = """
+INSERT INTO cubo (clave, fichas, t) VALUES (:clave, :capacidad - :coste, :ahora)
+ON CONFLICT (clave) DO UPDATE SET
+    fichas = MIN(:capacidad, fichas + (:ahora - t) * :ritmo) - :coste,
+    t = :ahora
+WHERE MIN(:capacidad, fichas + (:ahora - t) * :ritmo) >= :coste
+RETURNING fichas
+"""
+
+
+def ruta_almacen():
+    return getattr(settings, "THROTTLE_DB", None) or os.path.join(
+        settings.CACHES["default"]["LOCATION"], "throttle.sqlite3"
+    )
+
+
+class Almacen:
+    """Conexión SQLite por hilo y por proceso (sqlite3 no se comparte entre hilos ni fork)."""
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def conexion(self, ruta):
+        con = getattr(self._local, "con", None)
+        if con is None or self._local.ruta != ruta or self._local.pid != os.getpid():
+            os.makedirs(os.path.dirname(ruta) or ".", exist_ok=True)
+            con = sqlite3.connect(ruta, timeout=5, isolation_level=None)
+            con.execute("PRAGMA journal_mode=WAL")
+            # Datos desechables: no hace falta fsync en cada petición
+            con.execute("PRAGMA synchronous=OFF")
+            con.execute(_SQL_CREAR)
+            self._local.con, self._local.ruta, self._local.pid = con, ruta, os.getpid()
+        return con
+
+    def gastar(self, clave, coste, capacidad, ritmo, ahora=None):
+        """
+        Intenta gastar `coste` fichas. Devuelve (permitido, fichas_restantes).
+        """
+        con = self.conexion(ruta_almacen())
+        ahora = time.time() if ahora is None else ahora
+        params = {"clave": clave, "coste": coste, "capacidad": capacidad, "ritmo": ritmo, "ahora": ahora}
+        fila = con.execute(_SQL_GASTAR, params).fetchone()
+        if fila is not None:
+            if random.random() < PROB_PURGA:
+                self.purgar(con, ahora)
+            return True, fila[0]
+        # Denegado (camino raro): lectura para calcular la espera
+        fichas, t = con.execute("SELECT fichas, t FROM cubo WHERE clave = ?", (clave,)).fetchone()
+        return False, min(capacidad, fichas + (ahora - t) * ritmo)
+
+    def purgar(self, con, ahora, horizonte=86400):
+        # Un cubo sin tocar en un día está lleno: equivale a no tener fila
+        con.execute("DELETE FROM cubo WHERE t < ?", (ahora - horizonte,))
+
+
+almacen = Almacen()
+
+
+class CuboThrottle(BaseThrottle):
+    """
+    Cubo de fichas con la tasa de DEFAULT_THROTTLE_RATES[scope]:
+    "120/min" = capacidad 120, recarga de 2 fichas por segundo.
+    """
+    scope = None
+    coste_defecto = 1
+
+    def __init__(self):
+        self.capacidad, self.ritmo = self.parse_rate(api_settings.DEFAULT_THROTTLE_RATES[self.scope])
+        self.espera = None
+
+    @staticmethod
+    def parse_rate(rate):
+        num, periodo = rate.split("/")
+        segundos = {"s": 1, "m": 60, "h": 3600, "d": 86400}[periodo[0]]
+        return int(num), int(num) / segundos
+
+    def get_cache_key(self, request, view):
+        raise NotImplementedError
+
+    def coste(self, view):
+        return min(getattr(view, "throttle_coste", self.coste_defecto), self.capacidad)
+
+    def allow_request(self, request, view):
+        clave = self.get_cache_key(request, view)
+        if clave is None:
+            return True
+        coste = self.coste(view)
+        permitido, fichas = almacen.gastar(clave, coste, self.capacidad, self.ritmo)
+        self.espera = None if permitido else (coste - fichas) / self.ritmo
+        return permitido
+
+    def wait(self):
+        return self.espera
+
+
+class AnonCuboThrottle(CuboThrottle):
+    """Anónimos, por IP (equivalente a AnonRateThrottle)."""
+    scope = "anon"
+
+    def get_cache_key(self, request, view):
+        if request.user and request.user.is_authenticated:
+            return None
+        return f"{self.scope}:{self.get_ident(request)}"
+
+
+class UsuarioCuboThrottle(CuboThrottle):
+    """Autenticados por id; anónimos por IP (equivalente a UserRateThrottle)."""
+    scope = "user"
+
+    def get_cache_key(self, request, view):
+        if request.user and request.user.is_authenticated:
+            return f"{self.scope}:{request.user.pk}"
+        return f"{self.scope}:{self.get_ident(request)}"
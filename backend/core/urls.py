@@ -3,8 +3,9 @@ from rest_framework.routers import DefaultRouter
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 from .views import (
     PersonajeViewSet, RazaViewSet, HabilidadViewSet, PoderViewSet, EquipamientoViewSet,
-    yo, RegisterView
+    yo, bootstrap, sync, metricas, eventos_sse, eventos_ticket, RegisterView, CATALOGOS_BOOTSTRAP
 )
+from . import vistas_asincronas
 
 router = DefaultRouter()
 router.register("personajes", PersonajeViewSet)
@@ -15,6 +16,19 @@ router.register("equipamientos", EquipamientoViewSet)
 
 urlpatterns = router.urls + [
     path("yo/", yo),  # GET /api/yo/
+    path("bootstrap/", bootstrap, name="bootstrap"),  # GET /api/bootstrap/ (carga inicial)
+    path("sync/", sync, name="sync"),  # GET /api/sync/?since= (sincronización incremental)
+    path("metrics/", metricas, name="metricas"),  # GET /api/metrics/ (GM o staff)
+    path("eventos/", eventos_sse, name="eventos"),  # GET /api/eventos/ (SSE, solo ASGI)
+    path("eventos/ticket/", eventos_ticket, name="eventos-ticket"),  # POST: ticket para /api/eventos/
+
+    # --- Lecturas en vistas async nativas (mismas respuestas; ver core/vistas_asincronas.py) ---
+    path("async/yo/", vistas_asincronas.yo, name="async-yo"),
+    path("async/personajes/", vistas_asincronas.personajes, {"viewset": PersonajeViewSet},
+         name="async-personaje-list"),
+    path("async/personajes/disponibles/", vistas_asincronas.disponibles, name="async-personaje-disponibles"),
+    path("async/personajes/<int:pk>/", vistas_asincronas.personaje, {"viewset": PersonajeViewSet},
+         name="async-personaje-detail"),
 
     # --- Auth ---
     path("auth/register/", RegisterView.as_view(), name="auth-register"),
@@ -27,3 +41,11 @@ urlpatterns = router.urls + [
     path("auth/login/", TokenObtainPairView.as_view(), name="token_obtain_pair"),
     path("auth/refresh/", TokenRefreshView.as_view(), name="token_refresh"),
 ]
+
+for prefijo, viewset in CATALOGOS_BOOTSTRAP.items():
+    urlpatterns += [
+        path(f"async/{prefijo}/", vistas_asincronas.catalogo_lista, {"viewset": viewset},
+             name=f"async-{prefijo}-list"),
+        path(f"async/{prefijo}/<int:pk>/", vistas_asincronas.catalogo_detalle, {"viewset": viewset},
+             name=f"async-{prefijo}-detail"),
+    ]
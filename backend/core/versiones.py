@@ -0,0 +1,150 @@
+"""
+GET condicionales para personajes (ETag / Last-Modified -> 304).
+
+- Detalle: cada fila lleva `version` (+1 en cada escritura) y `actualizado`
+  (PersonajeQuerySet.update y Personaje.save los mantienen). El ETag sale de
+  la versión, el instante y las versiones de los catálogos (la respuesta
+  incluye sus nombres). Con If-None-Match/If-Modified-Since se lee solo
+  (version, actualizado) de la fila: una consulta pequeña y 304.
+- Listados: validador de colección = número de versión en la caché compartida
+  (como core.catalogos), que sube con cualquier escritura de Personaje
+  (save, delete, update, bulk_create) o de Usuario (usernames del listado).
+  El ETag mezcla esa versión, la de los catálogos, quién pregunta y la query
+  string: un 304 no toca la BD.
+"""
+import hashlib
+import time
+
+from django.core.cache import cache
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models.signals import post_delete, post_save
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from rest_framework.response import Response
+
+CLAVE_COLECCION = "personajes:v"
+
+
+def version_coleccion():
+    v = cache.get(CLAVE_COLECCION)
+    if v is None:
+        # Arranque en milisegundos: si la clave se pierde no se repite una versión vieja
+        cache.add(CLAVE_COLECCION, int(time.time() * 1000), timeout=None)
+        v = cache.get(CLAVE_COLECCION)
+    return v
+
+
+async def aversion_coleccion():
+    """version_coleccion() con la caché asíncrona (core.vistas_asincronas)."""
+    v = await cache.aget(CLAVE_COLECCION)
+    if v is None:
+        await cache.aadd(CLAVE_COLECCION, int(time.time() * 1000), timeout=None)
+        v = await cache.aget(CLAVE_COLECCION)
+    return v
+
+
+def _subir():
+    try:
+        cache.incr(CLAVE_COLECCION)
+    except ValueError:
+        version_coleccion()
+
+
+def invalidar_coleccion():
+    """Los listados cacheados por clientes dejan de validar. Una vez ahora y otra
+    al confirmar (una lectura concurrente anterior al COMMIT queda descartada)."""
+    _subir()
+    transaction.on_commit(_subir)
+
+
+def _catalogos():
+    from .catalogos import MODELOS_CATALOGO, version
+    return ":".join(str(version(m)) for m in MODELOS_CATALOGO)
+
+
+async def acatalogos():
+    from .catalogos import MODELOS_CATALOGO, aversion
+    return ":".join([str(await aversion(m)) for m in MODELOS_CATALOGO])
+
+
+def _etag(*partes):
+    return '"%s"' % hashlib.sha1(":".join(map(str, partes)).encode()).hexdigest()[:20]
+
+
+def etag_personaje(pk, version, actualizado, catalogos=None):
+    """`catalogos`: versiones ya leídas (acatalogos() en las vistas asíncronas)."""
+    catalogos = _catalogos() if catalogos is None else catalogos
+    return _etag("pj", pk, version, actualizado.isoformat(), catalogos)
+
+
+def _etag_coleccion(request, version, catalogos):
+    u = request.user
+    return _etag("pjs", version, catalogos, u.id, getattr(u, "rol", None), request.get_full_path())
+
+
+def etag_coleccion(request):
+    return _etag_coleccion(request, version_coleccion(), _catalogos())
+
+
+async def aetag_coleccion(request):
+    return _etag_coleccion(request, await aversion_coleccion(), await acatalogos())
+
+
+def con_validadores(response, valor_etag, actualizado=None):
+    response["ETag"] = valor_etag
+    if actualizado is not None:
+        response["Last-Modified"] = http_date(actualizado.timestamp())
+    return response
+
+
+# ---------- Mixin para PersonajeViewSet ----------
+class PersonajeCondicionalMixin:
+    """retrieve con ETag/Last-Modified por fila; `coleccion_condicional` para los listados."""
+
+    def retrieve(self, request, *args, **kwargs):
+        if "HTTP_IF_NONE_MATCH" in request.META or "HTTP_IF_MODIFIED_SINCE" in request.META:
+            lookup = self.lookup_url_kwarg or self.lookup_field
+            # Mismo queryset que get_object (visibilidad por rol), solo 3 columnas
+            try:
+                fila = (self.get_queryset().filter(pk=kwargs[lookup])
+                        .values_list("pk", "version", "actualizado").first())
+            except (TypeError, ValueError, DjangoValidationError):
+                # pk mal formado ("abc"): que get_object responda el 404, como
+                # get_object_or_404 de DRF
+                fila = None
+            if fila is not None:
+                valor_etag = etag_personaje(*fila)
+                response = get_conditional_response(request, etag=valor_etag,
+                                                    last_modified=int(fila[2].timestamp()))
+                if response is not None:
+                    return con_validadores(response, valor_etag, fila[2])
+        instancia = self.get_object()
+        response = Response(self.get_serializer(instancia).data)
+        return con_validadores(response, etag_personaje(instancia.pk, instancia.version, instancia.actualizado),
+                                instancia.actualizado)
+
+    def coleccion_condicional(self, request, queryset, generar):
+        """304 sin tocar la BD si If-None-Match coincide; si no, `generar(queryset)` + ETag.
+        El ETag se calcula ANTES de generar y el cuerpo se lee de la primaria
+        (una réplica atrasada daría datos viejos bajo la versión nueva): una
+        escritura concurrente solo puede hacer que el cliente vuelva a
+        descargar, nunca que se quede con datos viejos."""
+        valor_etag = etag_coleccion(request)
+        response = get_conditional_response(request, etag=valor_etag)
+        if response is None:
+            response = generar(queryset.using(DEFAULT_DB_ALIAS))
+        return con_validadores(response, valor_etag)
+
+
+# ---------- Invalidación por señales ----------
+def _al_escribir(sender, **kwargs):
+    invalidar_coleccion()
+
+
+def conectar_senales():
+    from .models import Personaje, Usuario
+    for modelo in (Personaje, Usuario):
+        nombre = modelo._meta.model_name
+        post_save.connect(_al_escribir, sender=modelo, dispatch_uid=f"coleccion-save-{nombre}")
+        post_delete.connect(_al_escribir, sender=modelo, dispatch_uid=f"coleccion-delete-{nombre}")
@@ -1,4 +1,8 @@
+from django.core.handlers.asgi import ASGIRequest
+from django.db import transaction
+from django.http import Http404, HttpResponse, JsonResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
+from django.urls import reverse
 
 from rest_framework import viewsets, status
 from rest_framework.decorators import action, api_view, permission_classes
@@ -7,11 +11,16 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.exceptions import ValidationError, PermissionDenied
 from rest_framework.views import APIView
 from rest_framework.permissions import AllowAny
-from rest_framework_simplejwt.tokens import RefreshToken
 from .serializers import RegisterSerializer
-from .models import AuditLog
 
-from .permissions import EsGM, EsPropietarioOGM
+from . import auditoria, busqueda, catalogos, eventos, intercambio, proyecciones, sincronizacion
+from .autenticacion import aautenticar_claims, aautenticar_token, atoken_vigente, tokens_para
+from .catalogos import CatalogoCacheMixin
+from .filtros import FiltroPersonajes
+from .metricas import MedirFasesMixin, registro as registro_metricas
+from .pagination import PaginacionPorClave
+from .versiones import PersonajeCondicionalMixin
+from .permissions import EsGM, EsGMOStaff, EsPropietarioOGM
 from .models import Personaje, Raza, Habilidad, Poder, Equipamiento
 from .serializers import (
     PersonajeSerializer,
@@ -19,6 +28,7 @@ from .serializers import (
     PersonajeListaSerializer,
     PersonajeOpcionesSerializer,
     ElegirHabilidadesSerializer,
+    AccionMasivaSerializer,
     RazaSerializer,
     HabilidadSerializer,
     PoderSerializer,
@@ -26,7 +36,7 @@ from .serializers import (
 )
 
 
-class PersonajeViewSet(viewsets.ModelViewSet):
+class PersonajeViewSet(MedirFasesMixin, PersonajeCondicionalMixin, viewsets.ModelViewSet):
     
     """
     ViewSet para CRUD de Personajes y acciones específicas.
@@ -41,21 +51,28 @@ class PersonajeViewSet(viewsets.ModelViewSet):
         GM: ve todos
         Jugador: ve solo los suyos
     - /disponibles/: lista el pool (sin propietario) para que el jugador elija
+    - /buscar/?q=: búsqueda por nombre/propietario ordenada por relevancia
+    - retrieve: ETag + Last-Modified por fila; list/disponibles: ETag de colección
+      (If-None-Match -> 304, ver core/versiones.py)
     - /{id}/elegir/ (POST): jugador toma un personaje del pool
     - /{id}/set-opciones/ (PATCH): GM define 3 opciones de habilidades
     - /{id}/elegir-habilidades/ (POST): jugador elige 2 entre las 3 opciones
     - /{id}/subir_nivel/ (POST), /{id}/cambiar_estado/ (POST), /{id}/liberar/ (POST): acciones GM
     """
     permission_classes = [IsAuthenticated, EsPropietarioOGM]
-    queryset = (
-        Personaje.objects
-        .select_related("raza", "poder", "equipamiento")
-    )
+    # list/disponibles paginan por cursor: ?cursor=, ?page_size=, ?ordering=(-)id|(-)nivel|(-)nombre
+    pagination_class = PaginacionPorClave
+    # ...y filtran en SQL: ?raza=&poder=&equipamiento=&estado=&nivel_min=&nivel_max=&propietario=&nombre=
+    filter_backends = [FiltroPersonajes]
+    # Fichas de throttling por petición; las acciones pesadas lo suben en @action
+    throttle_coste = 1
+    # list/retrieve/disponibles: una sola consulta por página (sin N+1)
+    queryset = Personaje.objects.con_relaciones()
 
     # ---------- Serializers por acción ----------
     def get_serializer_class(self):
         usuario = self.request.user
-        if self.action in ["list", "retrieve", "disponibles"]:
+        if self.action in ["list", "retrieve", "disponibles", "buscar"]:
             return PersonajeListaSerializer
         if self.action == "set_opciones":
             return PersonajeOpcionesSerializer
@@ -67,11 +84,25 @@ class PersonajeViewSet(viewsets.ModelViewSet):
 
     # ---------- Queryset por rol ----------
     def get_queryset(self):
-        usuario = self.request.user
-        if getattr(usuario, "rol", None) == "GM":
-            return super().get_queryset()
-        # Jugador: por defecto lista SOLO sus personajes
-        return super().get_queryset().filter(propietario=usuario)
+        # GM: todos. Jugador: por defecto lista SOLO sus personajes
+        return super().get_queryset().visibles_para(self.request.user)
+
+    # ---------- Listados: proyección sin serializer (ver core/proyecciones.py) ----------
+    def list(self, request, *args, **kwargs):
+        return self.coleccion_condicional(request, self.filter_queryset(self.get_queryset()), self._listado)
+
+    def _listado(self, qs):
+        """
+        Página de values_list() convertida con la proyección del serializer de
+        la acción; si el serializer no tiene proyección, página de modelos y
+        serializer (como catalogos.listado).
+        """
+        proyeccion = proyecciones.para(self.get_serializer_class())
+        if proyeccion is None:
+            page = self.paginate_queryset(qs)
+            return self.get_paginated_response(self.get_serializer(page, many=True).data)
+        page = self.paginate_queryset(proyeccion.consulta(qs))
+        return self.get_paginated_response(proyeccion.filas(page))
 
     # ---------- Update seguro ----------
     def perform_update(self, serializer):
@@ -84,32 +115,76 @@ class PersonajeViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=["get"], permission_classes=[IsAuthenticated])
     def disponibles(self, request):
         """Lista de personajes sin propietario (pool)."""
-        qs = (
-            Personaje.objects
-            .select_related("raza", "poder", "equipamiento")
-            .filter(propietario__isnull=True)
-        )
-        page = self.paginate_queryset(qs)
-        ser = self.get_serializer(page or qs, many=True)
-        return self.get_paginated_response(ser.data) if page is not None else Response(ser.data)
+        return self.coleccion_condicional(
+            request, self.filter_queryset(Personaje.objects.disponibles()), self._listado)
+
+    # ---------- Búsqueda de texto (FTS5; ver core/busqueda.py) ----------
+    MAX_RESULTADOS_BUSQUEDA = 100
+
+    @action(detail=False, methods=["get"], throttle_coste=2)
+    def buscar(self, request):
+        """
+        ?q=texto (prefijos: "gan ald" -> Gandalf), ?limite=N (20 por defecto).
+        Sobre los personajes visibles y admite los mismos filtros que el listado.
+        """
+        q = request.query_params.get("q", "")
+        if not busqueda.terminos(q):
+            raise ValidationError({"q": "Indica al menos una palabra."})
+        try:
+            limite = int(request.query_params.get("limite", 20))
+        except ValueError:
+            raise ValidationError({"limite": "Debe ser un entero."})
+        limite = max(1, min(limite, self.MAX_RESULTADOS_BUSQUEDA))
+
+        qs = busqueda.buscar(self.filter_queryset(self.get_queryset()), q)[:limite]
+        return Response({"results": self.get_serializer(qs, many=True).data})
 
     # ---------- Jugador elige (toma) un personaje del pool ----------
     @action(detail=True, methods=["post"], permission_classes=[IsAuthenticated])
     def elegir(self, request, pk=None):
         """Jugador elige un personaje disponible."""
-        # ¡OJO! No usar self.get_object() porque el jugador aún no es propietario
-        pj = get_object_or_404(
-            Personaje.objects.select_related("raza", "poder", "equipamiento"),
-            pk=pk
-        )
-        if pj.propietario_id is not None:
+        # ¡OJO! No usar self.get_object() porque el jugador aún no es propietario.
+        # Camino feliz = un solo UPDATE condicional; solo si falla se lee la fila
+        # para explicar el motivo.
+        try:
+            pk = int(pk)
+        except (TypeError, ValueError):
+            raise Http404
+        if not Personaje.objects.reclamar(pk, request.user.id):
+            pj = get_object_or_404(Personaje.objects.only("propietario_id", "estado"), pk=pk)
+            if pj.estado == pj.Estado.MUERTO:
+                raise ValidationError({"detalle": "No puedes elegir un personaje muerto."})
             raise ValidationError({"detalle": "Este personaje ya tiene propietario."})
-        if getattr(pj, "Estado", None) and pj.estado == pj.Estado.MUERTO:
-            raise ValidationError({"detalle": "No puedes elegir un personaje muerto."})
-
-        pj.propietario = request.user
-        pj.save(update_fields=["propietario"])
-        return Response({"ok": True, "personaje": pj.id, "propietario": request.user.username})
+        return Response({"ok": True, "personaje": pk, "propietario": request.user.username})
+
+    # ---------- Jugador reclama N personajes cualesquiera (matchmaking) ----------
+    MAX_ELEGIR_VARIOS = 50
+
+    @action(detail=False, methods=["post"], permission_classes=[IsAuthenticated], url_path="elegir-varios",
+            throttle_coste=5)
+    def elegir_varios(self, request):
+        """
+        Body: {"cantidad": N, "raza"?: id, "poder"?: id, "equipamiento"?: id,
+               "nivel_min"?: n, "nivel_max"?: n}
+        Reclama hasta N personajes libres que cumplan los filtros.
+        """
+        try:
+            cantidad = int(request.data.get("cantidad", 1))
+            filtros = {
+                campo: int(request.data[clave])
+                for clave, campo in (
+                    ("raza", "raza_id"), ("poder", "poder_id"), ("equipamiento", "equipamiento_id"),
+                    ("nivel_min", "nivel__gte"), ("nivel_max", "nivel__lte"),
+                )
+                if request.data.get(clave) not in (None, "")
+            }
+        except (TypeError, ValueError):
+            raise ValidationError({"detalle": "Parámetros numéricos inválidos."})
+        if not 1 <= cantidad <= self.MAX_ELEGIR_VARIOS:
+            raise ValidationError({"cantidad": f"Debe estar entre 1 y {self.MAX_ELEGIR_VARIOS}."})
+
+        ids = Personaje.objects.filter(**filtros).reclamar_varios(request.user.id, cantidad)
+        return Response({"ok": bool(ids), "personajes": ids, "solicitados": cantidad})
 
     # ---------- GM define 3 opciones de habilidades ----------
     @action(detail=True, methods=["patch"], permission_classes=[IsAuthenticated, EsGM], url_path="set-opciones")
@@ -143,11 +218,7 @@ class PersonajeViewSet(viewsets.ModelViewSet):
         pj.nivel = (pj.nivel or 0) + 1
         pj.save(update_fields=["nivel"])
 
-        AuditLog.objects.create(
-            usuario=request.user,
-            accion="SUBIR_NIVEL",
-            detalle=f"Subió a nivel {pj.nivel} el personaje {pj.nombre}"
-    )
+        auditoria.registrar(request.user, "SUBIR_NIVEL", f"Subió a nivel {pj.nivel} el personaje {pj.nombre}")
         return Response({"ok": True, "nivel": pj.nivel})
 
     @action(detail=True, methods=["post"], permission_classes=[IsAuthenticated, EsGM])
@@ -160,12 +231,7 @@ class PersonajeViewSet(viewsets.ModelViewSet):
         pj.estado = nuevo_estado
         pj.save(update_fields=["estado"])
 
-        AuditLog.objects.create(
-            usuario=request.user,
-            accion="CAMBIAR_ESTADO",
-            detalle=f"Nuevo estado={pj.estado} para personaje {pj.nombre}"
-        )
-
+        auditoria.registrar(request.user, "CAMBIAR_ESTADO", f"Nuevo estado={pj.estado} para personaje {pj.nombre}")
         return Response({"ok": True, "estado": pj.estado})
 
     @action(detail=True, methods=["post"], permission_classes=[IsAuthenticated, EsGM])
@@ -175,46 +241,243 @@ class PersonajeViewSet(viewsets.ModelViewSet):
         pj.propietario = None
         pj.save(update_fields=["propietario"])
 
-        AuditLog.objects.create(
-        usuario=request.user,
-        accion="LIBERAR_PERSONAJE",
-        detalle=f"Liberó personaje {pj.nombre}"
-)
-
+        auditoria.registrar(request.user, "LIBERAR_PERSONAJE", f"Liberó personaje {pj.nombre}")
         return Response({"ok": True})
 
+    # ---------- Exportar / importar NDJSON ----------
+    @action(detail=False, methods=["get"], url_path="exportar", throttle_coste=20)
+    def exportar(self, request):
+        """Stream NDJSON de los personajes visibles (GM: todos; jugador: los suyos)."""
+        qs = Personaje.objects.visibles_para(request.user)
+        response = StreamingHttpResponse(intercambio.exportar(qs), content_type="application/x-ndjson")
+        response["Content-Disposition"] = 'attachment; filename="personajes.ndjson"'
+        return response
+
+    @action(detail=False, methods=["post"], permission_classes=[IsAuthenticated, EsGM], url_path="importar",
+            throttle_coste=20)
+    def importar(self, request):
+        """
+        Cuerpo NDJSON (application/x-ndjson), leído línea a línea del stream
+        sin pasar por los parsers de DRF. Devuelve el resumen de la importación.
+        """
+        stream = request.stream
+        resumen = intercambio.importar(stream if stream is not None else [])
+        return Response(resumen, status=status.HTTP_200_OK)
+
+    # ---------- Acciones GM en bloque ----------
+    @action(detail=False, methods=["post"], permission_classes=[IsAuthenticated, EsGM], url_path="bulk",
+            throttle_coste=10)
+    def bulk(self, request):
+        """
+        Aplica subir_nivel / cambiar_estado / liberar a muchos personajes:
+        un UPDATE por conjunto + una lectura + auditoría en bloque, todo en
+        una transacción. Resultado por id: "ok", "muerto" (subir_nivel no
+        aplica a muertos) o "no_encontrado".
+        """
+        ser = AccionMasivaSerializer(data=request.data)
+        ser.is_valid(raise_exception=True)
+        ids, accion, estado = ser.validated_data["ids"], ser.validated_data["accion"], ser.validated_data.get("estado")
+
+        with transaction.atomic():
+            qs = Personaje.objects.filter(id__in=ids)
+            # Dueños antes del UPDATE: liberar avisa también al ex-dueño (como la acción individual)
+            antes = dict(qs.values_list("id", "propietario_id")) if accion == "liberar" else {}
+            if accion == "subir_nivel":
+                qs.subir_nivel()
+            elif accion == "cambiar_estado":
+                qs.cambiar_estado(estado)
+            else:
+                qs.liberar()
+            filas = {f["id"]: f for f in qs.values("id", "nombre", "nivel", "estado", "propietario_id", "version")}
+
+            resultados, entradas = [], []
+            for pk in ids:
+                fila = filas.get(pk)
+                if fila is None:
+                    resultados.append({"id": pk, "resultado": "no_encontrado"})
+                    continue
+                if accion == "subir_nivel" and fila["estado"] == Personaje.Estado.MUERTO:
+                    resultados.append({"id": pk, "resultado": "muerto"})
+                    continue
+                resultados.append({"id": pk, "resultado": "ok"})
+                entradas.append((request.user, *self._auditoria_bulk(accion, fila)))
+                propietarios = {fila["propietario_id"], antes.get(pk, fila["propietario_id"])}
+                eventos.publicar_cambio(pk, propietarios, accion, fila["version"])
+            auditoria.registrar_varios(entradas)
+
+        return Response({"ok": True, "accion": accion, "resultados": resultados})
+
+    @staticmethod
+    def _auditoria_bulk(accion, fila):
+        # Mismos textos que las acciones individuales
+        if accion == "subir_nivel":
+            return "SUBIR_NIVEL", f"Subió a nivel {fila['nivel']} el personaje {fila['nombre']}"
+        if accion == "cambiar_estado":
+            return "CAMBIAR_ESTADO", f"Nuevo estado={fila['estado']} para personaje {fila['nombre']}"
+        return "LIBERAR_PERSONAJE", f"Liberó personaje {fila['nombre']}"
+
 
 # --------- Catálogos (solo GM) ----------
-class RazaViewSet(viewsets.ModelViewSet):
+# GET servidos desde caché versionada con ETag (ver core/catalogos.py)
+class RazaViewSet(MedirFasesMixin, CatalogoCacheMixin, viewsets.ModelViewSet):
   queryset = Raza.objects.all()
   serializer_class = RazaSerializer
   permission_classes = [IsAuthenticated, EsGM]
 
-class HabilidadViewSet(viewsets.ModelViewSet):
+class HabilidadViewSet(MedirFasesMixin, CatalogoCacheMixin, viewsets.ModelViewSet):
   queryset = Habilidad.objects.all()
   serializer_class = HabilidadSerializer
   permission_classes = [IsAuthenticated, EsGM]
 
-class PoderViewSet(viewsets.ModelViewSet):
+class PoderViewSet(MedirFasesMixin, CatalogoCacheMixin, viewsets.ModelViewSet):
   queryset = Poder.objects.all()
   serializer_class = PoderSerializer
   permission_classes = [IsAuthenticated, EsGM]
 
-class EquipamientoViewSet(viewsets.ModelViewSet):
+class EquipamientoViewSet(MedirFasesMixin, CatalogoCacheMixin, viewsets.ModelViewSet):
   queryset = Equipamiento.objects.all()
   serializer_class = EquipamientoSerializer
   permission_classes = [IsAuthenticated, EsGM]
 
 
 # === Rol del usuario autenticado ===
+def _datos_yo(u):
+    return {"id": u.id, "usuario": u.username, "rol": getattr(u, "rol", None)}
+
+
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
 def yo(request):
+    return Response(_datos_yo(request.user))
+
+
+# === Carga inicial en una sola petición ===
+# Mismos catálogos (y misma caché) que sirven /razas/, /habilidades/...
+CATALOGOS_BOOTSTRAP = {
+    "razas": RazaViewSet,
+    "habilidades": HabilidadViewSet,
+    "poderes": PoderViewSet,
+    "equipamientos": EquipamientoViewSet,
+}
+
+
+def _primera_pagina(request, queryset, nombre_url):
+    """Página 1 con los mismos filtros y paginador que el listado; los enlaces
+    apuntan al listado y conservan la query string (?page_size=, ?ordering=, filtros)."""
+    queryset = FiltroPersonajes().filter_queryset(request, queryset, None)
+    paginador = PaginacionPorClave()
+    base_url = request.build_absolute_uri(reverse(nombre_url))
+    if request.META.get("QUERY_STRING"):
+        base_url += "?" + request.META["QUERY_STRING"]
+    proyeccion = proyecciones.PERSONAJE_LISTA
+    page = paginador.paginate_queryset(proyeccion.consulta(queryset), request, base_url=base_url)
+    return paginador.get_paginated_data(proyeccion.filas(page))
+
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def bootstrap(request):
+    """
+    Sustituye /yo/ + 4 catálogos + /personajes/ + /personajes/disponibles/.
+    - catalogos: solo para GM (los endpoints de catálogo son EsGM); null para jugador.
+    - personajes / disponibles: primera página, igual que sus listados
+      (admite ?page_size=, ?ordering= y los filtros); `next` apunta al listado real.
+    Coste: 2 páginas (+1 por catálogo que no esté en caché).
+    """
     u = request.user
-    return Response({"id": u.id, "usuario": u.username, "rol": getattr(u, "rol", None)})
+    datos_catalogos = None
+    if EsGM().has_permission(request, None):
+        datos_catalogos = {
+            nombre: catalogos.listado(vs.queryset.model, vs.serializer_class)
+            for nombre, vs in CATALOGOS_BOOTSTRAP.items()
+        }
+    base = Personaje.objects.all()
+    return Response({
+        "yo": _datos_yo(u),
+        "catalogos": datos_catalogos,
+        "personajes": _primera_pagina(request, base.visibles_para(u), "personaje-list"),
+        "disponibles": _primera_pagina(request, base.disponibles(), "personaje-disponibles"),
+    })
+
+# === Sincronización incremental (ver core/sincronizacion.py) ===
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def sync(request):
+    """
+    GET /api/sync/?since=<cursor>: lo cambiado desde `cursor` en personajes,
+    disponibles y (solo GM, como en bootstrap) catálogos. Sin ?since= (o con un
+    cursor caducado) devuelve `reset: true`, la primera página de personajes y
+    disponibles (admite ?page_size= y ?ordering=; `siguiente` apunta al
+    listado real) y los catálogos completos.
+    Respuesta: {"cursor", "reset", "mas", "personajes": {"cambiados", "borrados"[, "siguiente"]},
+    "disponibles": {...}, "catalogos": {"razas": {...}, ...} | null}
+    """
+    since = request.query_params.get("since")
+    if since in (None, ""):
+        since = None
+    else:
+        try:
+            since = int(since)
+        except ValueError:
+            since = -1
+        if since < 0:
+            raise ValidationError({"since": "Debe ser un entero no negativo (el cursor de la respuesta anterior)."})
+    con_catalogos = EsGM().has_permission(request, None)
+    return Response(sincronizacion.sincronizar(request, since, con_catalogos=con_catalogos))
+
+
+# === Cambios de personajes en tiempo real (SSE; ver core/eventos.py) ===
+@api_view(["POST"])
+@permission_classes([IsAuthenticated])
+def eventos_ticket(request):
+    """POST /api/eventos/ticket/ -> {"ticket"}: credencial de un solo uso para abrir /api/eventos/."""
+    return Response({"ticket": eventos.emitir_ticket(request.auth)}, status=status.HTTP_201_CREATED)
+
+
+async def eventos_sse(request):
+    """
+    GET /api/eventos/?ticket=<ticket>&pool=0|1 -> text/event-stream
+    - event: personaje  data: {"id", "accion", "version", "propietarios"}
+    - event: resync     (se perdieron eventos: recargar listados)
+    - event: caducado   (el token expiró o se revocó: reconectar con otro ticket)
+    EventSource no puede enviar cabeceras: ?ticket= (de /api/eventos/ticket/,
+    un solo uso) en vez del token, que quedaría en los logs; otros clientes
+    pueden usar Authorization. Solo con servidor ASGI: bajo WSGI cada conexión
+    abierta ocuparía un worker.
+    """
+    if request.method != "GET":
+        return JsonResponse({"detail": "Método no permitido."}, status=405)
+    if not isinstance(request, ASGIRequest):
+        return JsonResponse({"detail": "Eventos en tiempo real solo con servidor ASGI."}, status=501)
+    cabecera = request.META.get("HTTP_AUTHORIZATION", "")
+    if cabecera.startswith("Bearer "):
+        autenticado = await aautenticar_token(cabecera[7:])
+    else:
+        ticket = request.GET.get("ticket", "")
+        claims = await eventos.acanjear_ticket(ticket) if ticket else None
+        autenticado = await aautenticar_claims(claims) if claims else None
+    if autenticado is None:
+        return JsonResponse({"detail": "Token o ticket inválido o ausente."}, status=401)
+
+    usuario, token = autenticado
+    flujo = eventos.flujo(usuario.id, getattr(usuario, "rol", None) == "GM", pool=request.GET.get("pool") != "0",
+                          caduca=token["exp"], vigente=lambda: atoken_vigente(token))
+    response = StreamingHttpResponse(flujo, content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"  # sin buffer en nginx
+    return response
+
+
+# === Métricas por ruta (formato texto de Prometheus) ===
+@api_view(["GET"])
+@permission_classes([IsAuthenticated, EsGMOStaff])
+def metricas(request):
+    """Histogramas de duración por ruta y fase del worker actual (ver core/metricas.py)."""
+    return HttpResponse(registro_metricas.texto(), content_type="text/plain; version=0.0.4; charset=utf-8")
+
 
 # --- Registro de usuarios (auth) ---
-class RegisterView(APIView):
+class RegisterView(MedirFasesMixin, APIView):
     permission_classes = [AllowAny]
 
     def post(self, request):
@@ -222,8 +485,7 @@ class RegisterView(APIView):
         ser.is_valid(raise_exception=True)
         user = ser.save()
 
-        # Emitimos tokens para autologin
-        refresh = RefreshToken.for_user(user)
+        # Emitimos tokens para autologin (con claims de rol, como /auth/login/)
         data = {
             "user": {
                 "id": user.id,
@@ -231,9 +493,6 @@ class RegisterView(APIView):
                 "email": user.email,
                 "rol": getattr(user, "rol", None),
             },
-            "tokens": {
-                "refresh": str(refresh),
-                "access": str(refresh.access_token),
-            },
+            "tokens": tokens_para(user),
         }
         return Response(data, status=status.HTTP_201_CREATED)
\ No newline at end of file
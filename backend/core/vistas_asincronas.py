@@ -0,0 +1,188 @@
+"""
+Lecturas calientes como vistas async nativas, bajo /api/async/.
+
+Bajo ASGI, una vista de DRF ocupa un hilo de sync_to_async durante toda la
+petición (autenticación, permisos, consultas, serializer y render): la
+concurrencia de un worker la limita su pool de hilos. Estas vistas corren en
+el event loop y solo salen de él para las comprobaciones de DRF (un salto),
+en cada consulta (ORM asíncrono) y en cada lectura de la caché; el resto de
+middlewares del proyecto también son asíncronos (core.metricas,
+core.enrutador), así que nada obliga a un hilo.
+
+Mismo comportamiento que sus equivalentes síncronos, que no cambian:
+- `APIView.initial()` de DRF tal cual, en un hilo (hace E/S síncrona):
+  DEFAULT_AUTHENTICATION_CLASSES (JWT_SIN_BD incluido), las mismas clases de
+  permiso y el mismo throttling; errores con su manejador.
+- Mismos datos: proyecciones de core.proyecciones (idénticas a los
+  serializers), filtros y paginación por cursor del listado, y ETag / 304
+  (core.versiones, core.catalogos).
+
+    /api/async/yo/
+    /api/async/personajes/                      (?filtros, ?ordering, ?cursor)
+    /api/async/personajes/disponibles/
+    /api/async/personajes/<id>/
+    /api/async/{razas,habilidades,poderes,equipamientos}/[<id>/]
+
+Bajo WSGI también responden (Django las ejecuta con async_to_sync), pero sin
+ventaja. En Django 5.0 el ORM y la caché asíncronos siguen pasando por un
+hilo (sync_to_async): la ganancia frente a DRF bajo ASGI es no ocupar ese
+hilo mientras se autentica, se construye la respuesta y se renderiza; con
+SQLite local (sin espera de red) un worker WSGI con hilos sigue sirviendo
+más peticiones por segundo. Cifras en benchmarks/asgi_wsgi.py. Por eso el
+frontend solo las usa si se compila con VITE_API_ASYNC=true (despliegue ASGI).
+"""
+import functools
+
+from asgiref.sync import sync_to_async
+from django.core.exceptions import PermissionDenied
+from django.db import DEFAULT_DB_ALIAS
+from django.http import Http404, HttpResponse
+from django.utils.cache import get_conditional_response
+from rest_framework import exceptions
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.renderers import JSONRenderer
+from rest_framework.views import APIView
+
+from . import catalogos, proyecciones
+from .filtros import FiltroPersonajes
+from .models import Personaje
+from .pagination import PaginacionPorClave
+from .versiones import acatalogos, aetag_coleccion, con_validadores, etag_personaje
+from .views import _datos_yo
+
+METODOS = ("GET", "HEAD")
+_render = JSONRenderer().render
+
+
+def _json(datos, status=200):
+    return HttpResponse(_render(datos), status=status, content_type="application/json")
+
+
+# ---------- Autenticación, permisos y throttling (APIView.initial) ----------
+class _Comprobaciones(APIView):
+    """
+    APIView sin handlers: presta a las vistas async su `initial()`
+    (DEFAULT_AUTHENTICATION_CLASSES, permisos y throttling, como cualquier
+    vista DRF) y su manejo de errores.
+    """
+
+
+def vista_async(permission_classes=None, throttle_coste=1):
+    """
+    Envuelve una vista async con las comprobaciones de APIView. Sin
+    `permission_classes`, las del `viewset` que recibe la URL (las mismas que
+    la vista síncrona equivalente).
+    """
+    def decorador(funcion):
+        @functools.wraps(funcion)
+        async def vista(request, *args, **kwargs):
+            comprobador = _Comprobaciones(
+                permission_classes=permission_classes or kwargs["viewset"].permission_classes,
+                throttle_coste=throttle_coste,
+            )
+            peticion = comprobador.initialize_request(request, *args, **kwargs)
+            comprobador.request, comprobador.args, comprobador.kwargs = peticion, args, kwargs
+            comprobador.headers = {**comprobador.default_response_headers, "Allow": ", ".join(METODOS)}
+            try:
+                if request.method not in METODOS:
+                    raise exceptions.MethodNotAllowed(request.method)
+                # Autenticación (caché de revocación, usuario de la BD con
+                # tokens antiguos) y cubos de throttling hacen E/S síncrona:
+                # en un hilo, fuera del event loop
+                await sync_to_async(comprobador.initial)(peticion, *args, **kwargs)
+                return await funcion(peticion, *args, **kwargs)
+            except (exceptions.APIException, Http404, PermissionDenied) as exc:
+                response = comprobador.handle_exception(exc)
+                return comprobador.finalize_response(peticion, response, *args, **kwargs).render()
+
+        vista.throttle_coste = throttle_coste
+        return vista
+    return decorador
+
+
+# ---------- Usuario ----------
+@vista_async([IsAuthenticated])
+async def yo(request):
+    return _json(_datos_yo(request.user))
+
+
+# ---------- Personajes ----------
+async def _coleccion(request, queryset):
+    """Como PersonajeCondicionalMixin.coleccion_condicional + _listado."""
+    valor_etag = await aetag_coleccion(request)
+    response = get_conditional_response(request, etag=valor_etag)
+    if response is None:
+        # De la primaria, como coleccion_condicional
+        queryset = FiltroPersonajes().filter_queryset(request, queryset.using(DEFAULT_DB_ALIAS), None)
+        paginador = PaginacionPorClave()
+        proyeccion = proyecciones.PERSONAJE_LISTA
+        pagina = await paginador.apaginate_queryset(proyeccion.consulta(queryset), request)
+        response = _json(paginador.get_paginated_data(proyeccion.filas(pagina)))
+    return con_validadores(response, valor_etag)
+
+
+@vista_async()
+async def personajes(request, viewset):
+    return await _coleccion(request, Personaje.objects.visibles_para(request.user))
+
+
+# Como la acción disponibles: cualquier autenticado ve el pool
+@vista_async([IsAuthenticated])
+async def disponibles(request):
+    return await _coleccion(request, Personaje.objects.disponibles())
+
+
+@vista_async()
+async def personaje(request, viewset, pk):
+    """Como PersonajeCondicionalMixin.retrieve: una consulta (fila + validadores)."""
+    qs = Personaje.objects.visibles_para(request.user).filter(pk=pk)
+    version_catalogos = await acatalogos()
+    if "HTTP_IF_NONE_MATCH" in request.META or "HTTP_IF_MODIFIED_SINCE" in request.META:
+        fila = await qs.values_list("pk", "version", "actualizado").afirst()
+        if fila is not None:
+            valor_etag = etag_personaje(*fila, catalogos=version_catalogos)
+            response = get_conditional_response(request, etag=valor_etag, last_modified=int(fila[2].timestamp()))
+            if response is not None:
+                return con_validadores(response, valor_etag, fila[2])
+
+    proyeccion = proyecciones.PERSONAJE_LISTA
+    fila = await proyeccion.consulta(qs, extra=("version", "actualizado", "propietario_id")).afirst()
+    if fila is None:
+        raise Http404(f"No {Personaje._meta.object_name} matches the given query.")
+    for permiso in (cls() for cls in viewset.permission_classes):
+        if not permiso.has_object_permission(request, None, fila):
+            raise exceptions.PermissionDenied(detail=getattr(permiso, "message", None))
+    return con_validadores(_json(proyeccion.construir(fila)),
+                           etag_personaje(fila.id, fila.version, fila.actualizado, catalogos=version_catalogos),
+                           fila.actualizado)
+
+
+# ---------- Catálogos (como CatalogoCacheMixin) ----------
+async def _catalogo_condicional(request, valor_etag, generar):
+    response = get_conditional_response(request, etag=valor_etag)
+    if response is None:
+        response = _json(await generar())
+    response["ETag"] = valor_etag
+    return response
+
+
+@vista_async()
+async def catalogo_lista(request, viewset):
+    modelo = viewset.queryset.model
+    return await _catalogo_condicional(
+        request, await catalogos.aetag(modelo),
+        lambda: catalogos.alistado(modelo, viewset.serializer_class))
+
+
+@vista_async()
+async def catalogo_detalle(request, viewset, pk):
+    modelo = viewset.queryset.model
+
+    async def generar():
+        datos = await catalogos.alistado(modelo, viewset.serializer_class)
+        item = next((x for x in datos if x["id"] == pk), None)
+        if item is None:
+            raise Http404
+        return item
+
+    return await _catalogo_condicional(request, await catalogos.aetag(modelo, str(pk)), generar)
@@ -5,6 +5,13 @@ It exposes the ASGI callable as a module-level variable named ``application``.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
+
+/api/eventos/ (SSE, core.eventos) solo funciona servido por ASGI, p. ej.:
+    uvicorn rpg.asgi:application --workers 4
+Cada worker mantiene miles de conexiones SSE inactivas en su event loop; los
+eventos publicados en otro worker llegan por EVENTOS_FICHERO (hay que
+configurarlo: por defecto solo se reparten en proceso). Las lecturas de
+/api/async/ (core.vistas_asincronas) se sirven sin pasar por un hilo por petición.
 """
 
 import os
@@ -12,5 +19,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'rpg.settings')
+# settings: sin conexiones persistentes (DB_CONN_MAX_AGE=0 por defecto)
+os.environ.setdefault('DJANGO_SERVIDOR', 'asgi')
 
 application = get_asgi_application()
@@ -3,6 +3,7 @@ Django settings for rpg project.
 """
 from pathlib import Path
 import os
+import tempfile
 from datetime import timedelta
 
 # Carga de .env (opcional, útil en desarrollo local)
@@ -48,6 +49,10 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # Instrumentación (Server-Timing + /api/metrics/): primero y último
+    "core.metricas.InstrumentacionMiddleware",
+    # Lecturas GET a réplicas (si hay), con lee-lo-que-escribes por usuario
+    "core.enrutador.EnrutamientoMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "axes.middleware.AxesMiddleware",
@@ -57,7 +62,9 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "core.metricas.InstrumentacionVistaMiddleware",
 ]
+INSTRUMENTACION = os.environ.get("INSTRUMENTACION", "True").strip().lower() == "true"
 
 ROOT_URLCONF = "rpg.urls"
 
@@ -80,12 +87,36 @@ WSGI_APPLICATION = "rpg.wsgi.application"
 ASGI_APPLICATION = "rpg.asgi.application"
 
 # === Base de datos (SQLite por defecto; DATABASE_URL opcional) ===
+# rpg.asgi marca DJANGO_SERVIDOR=asgi antes de cargar estos settings
+_ASGI = os.environ.get("DJANGO_SERVIDOR", "").strip().lower() == "asgi"
+DB_CONN_MAX_AGE = int(os.environ.get("DB_CONN_MAX_AGE", "0" if _ASGI else "600"))
 DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
         "NAME": BASE_DIR / "db.sqlite3",
+        # Conexión persistente bajo WSGI: los PRAGMAs se aplican una vez por
+        # conexión. Bajo ASGI, 0 (Django desaconseja conexiones persistentes)
+        "CONN_MAX_AGE": DB_CONN_MAX_AGE,
+        "CONN_HEALTH_CHECKS": True,
+        "OPTIONS": {
+            # Segundos de espera del driver al cerrojo (además de busy_timeout)
+            "timeout": int(os.environ.get("SQLITE_TIMEOUT", "5")),
+        },
     }
 }
+# Perfil de producción SQLite (core.sqlite, aplicado en connection_created).
+# SQLITE_PERFIL=serie lo desactiva. Comprobar: python manage.py comprobar_sqlite
+# WAL queda grabado en el fichero: solo con SQLITE_WAL=True (BD de producción),
+# para que un manage.py cualquiera no convierta el db.sqlite3 del repo.
+# synchronous=NORMAL solo es seguro con WAL; sin él, FULL de serie.
+SQLITE_WAL = os.environ.get("SQLITE_WAL", "False").strip().lower() == "true"
+SQLITE_PRAGMAS = {
+    **({"journal_mode": "WAL", "synchronous": "NORMAL"} if SQLITE_WAL else {}),
+    "busy_timeout": int(os.environ.get("SQLITE_TIMEOUT", "5")) * 1000,  # ms
+    "mmap_size": 256 * 1024 * 1024,
+    "cache_size": -64_000,  # negativo = KiB (~64 MB)
+    "temp_store": "MEMORY",
+} if os.environ.get("SQLITE_PERFIL", "produccion").strip().lower() != "serie" else {}
 # Si defines DATABASE_URL (Postgres, etc.), úsalo automáticamente.
 # Requiere: pip install dj-database-url
 if os.environ.get("DATABASE_URL"):
@@ -93,13 +124,56 @@ if os.environ.get("DATABASE_URL"):
         import dj_database_url
         DATABASES["default"] = dj_database_url.config(
             default=os.environ["DATABASE_URL"],
-            conn_max_age=600,
+            conn_max_age=DB_CONN_MAX_AGE,
             ssl_require=False,
         )
     except Exception:
         # Si no está instalado o falla, sigue con SQLite
         pass
 
+# Réplicas de lectura (core.enrutador): DATABASE_REPLICA_URLS=url1,url2
+# "sqlite:////ruta/replica.sqlite3" no necesita dj-database-url (réplica local
+# mantenida al día con `python manage.py replicar_sqlite --cada 1`).
+BD_REPLICAS = []
+for _i, _url in enumerate(filter(None, (u.strip() for u in os.environ.get("DATABASE_REPLICA_URLS", "").split(","))), 1):
+    if _url.startswith("sqlite:///"):
+        _replica = {**DATABASES["default"], "ENGINE": "django.db.backends.sqlite3", "NAME": _url[len("sqlite:///"):],
+                    "OPTIONS": dict(DATABASES["default"].get("OPTIONS", {}))}
+    else:
+        try:
+            import dj_database_url
+            _replica = dj_database_url.parse(_url, conn_max_age=600)
+        except Exception:
+            continue
+    # En tests la "réplica" es la propia BD de pruebas
+    _replica["TEST"] = {"MIRROR": "default"}
+    DATABASES[f"replica_{_i}"] = _replica
+    BD_REPLICAS.append(f"replica_{_i}")
+DATABASE_ROUTERS = ["core.enrutador.EnrutadorLecturaEscritura"]
+# Tras escribir, las lecturas del mismo usuario van a la primaria estos segundos
+BD_FIJAR_PRIMARIA_SEGUNDOS = int(os.environ.get("BD_FIJAR_PRIMARIA_SEGUNDOS", "5"))
+
+# === Caché compartida entre procesos (catálogos versionados, throttling) ===
+# FileBasedCache: todos los workers ven lo mismo sin servicios externos.
+_CACHE_DIR = os.environ.get("DJANGO_CACHE_DIR", os.path.join(tempfile.gettempdir(), "rpg-cache"))
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": _CACHE_DIR,
+    },
+    # Contadores de axes aparte: la caché por defecto purga al pasar de
+    # MAX_ENTRIES (300) y un ataque contra muchas cuentas borraría los
+    # bloqueos. Aquí no se purga nunca (CULL_FREQUENCY=0 vaciaría TODO al
+    # llegar al límite, así que el límite es inalcanzable); las claves
+    # caducan solas con AXES_COOLOFF_TIME.
+    "axes": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": os.path.join(_CACHE_DIR, "axes"),
+        "OPTIONS": {"MAX_ENTRIES": int(os.environ.get("AXES_CACHE_MAX_ENTRIES", str(10**9)))},
+    },
+}
+CATALOGO_CACHE_TIMEOUT = int(os.environ.get("CATALOGO_CACHE_TIMEOUT", "3600"))  # segundos
+
 # === Password validators ===
 AUTH_PASSWORD_VALIDATORS = [
     {"NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator"},
@@ -138,8 +212,11 @@ if not DEBUG:
 
 # === DRF / JWT ===
 REST_FRAMEWORK = {
+    # JWTSinBD: el usuario sale de los claims del token (sin consulta por petición)
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "core.autenticacion.JWTSinBD"
+        if os.environ.get("JWT_SIN_BD", "True").strip().lower() == "true"
+        else "rest_framework_simplejwt.authentication.JWTAuthentication",
     ),
     "DEFAULT_PERMISSION_CLASSES": (
         "rest_framework.permissions.IsAuthenticated",
@@ -147,21 +224,49 @@ REST_FRAMEWORK = {
 }
 
 # --- Límite de tasa (throttling) para mitigar abuso de API ---
+# Cubos de fichas en SQLite compartido por todos los workers (core.throttling)
 REST_FRAMEWORK.setdefault("DEFAULT_THROTTLE_CLASSES", [
-    "rest_framework.throttling.AnonRateThrottle",
-    "rest_framework.throttling.UserRateThrottle",
+    "core.throttling.AnonCuboThrottle",
+    "core.throttling.UsuarioCuboThrottle",
 ])
 # Límites por defecto (ajústalos por env si quieres)
 REST_FRAMEWORK.setdefault("DEFAULT_THROTTLE_RATES", {
     "anon": os.environ.get("DRF_THROTTLE_ANON", "60/min"),
     "user": os.environ.get("DRF_THROTTLE_USER", "120/min"),
 })
+# Fichero de los cubos (por defecto, dentro de DJANGO_CACHE_DIR)
+THROTTLE_DB = os.environ.get("THROTTLE_DB", "")
+
+# --- Eventos en tiempo real (SSE, core.eventos) ---
+# Fichero compartido entre procesos: solo con varios workers ASGI (p. ej.
+# $DJANGO_CACHE_DIR/eventos.ndjson). Por defecto "-": solo en proceso, sin
+# escribir nada en disco (bajo WSGI /api/eventos/ responde 501)
+EVENTOS_FICHERO = os.environ.get("EVENTOS_FICHERO", "-")
+EVENTOS_LATIDO = float(os.environ.get("EVENTOS_LATIDO", "15"))  # segundos entre pings
+EVENTOS_COLA = int(os.environ.get("EVENTOS_COLA", "100"))  # eventos pendientes por conexión
+EVENTOS_TICKET_TTL = int(os.environ.get("EVENTOS_TICKET_TTL", "30"))  # segundos para abrir la conexión
+
+# --- Sincronización incremental (/api/sync/, core.sincronizacion) ---
+SYNC_LIMITE = int(os.environ.get("SYNC_LIMITE", "500"))  # entradas del diario por respuesta
+SYNC_RETENCION_DIAS = int(os.environ.get("SYNC_RETENCION_DIAS", "30"))  # manage.py podar_cambios
 
 # Tiempos de vida de tokens configurables por env
 # JWT_ACCESS_MINUTES=60, JWT_REFRESH_DAYS=7, por ejemplo
 AXES_FAILURE_LIMIT = 5
-AXES_COOLOFF_TIME = 10  # en minutos
+# axes interpreta un entero como HORAS: timedelta para que sean 10 minutos
+AXES_COOLOFF_TIME = timedelta(minutes=10)
 AXES_ONLY_USER_FAILURES = True  # bloquea por usuario (no IP completa)
+# Contadores de fallos en la caché compartida; en la BD solo resúmenes diferidos
+AXES_HANDLER = "core.bloqueos.ManejadorAxesCache"
+AXES_CACHE = "axes"  # alias sin purga (ver CACHES)
+AXES_RESUMEN_INTERVALO = float(os.environ.get("AXES_RESUMEN_INTERVALO", "5.0"))  # segundos
+AXES_RESUMEN_MAX = int(os.environ.get("AXES_RESUMEN_MAX", "10000"))
+# AxesStandaloneBackend corta el login de un cliente bloqueado antes de
+# consultar el usuario o calcular el hash de la contraseña
+AUTHENTICATION_BACKENDS = [
+    "axes.backends.AxesStandaloneBackend",
+    "django.contrib.auth.backends.ModelBackend",
+]
 
 ACCESS_MIN = int(os.environ.get("JWT_ACCESS_MINUTES", "60"))
 REFRESH_DAYS = int(os.environ.get("JWT_REFRESH_DAYS", "7"))
@@ -169,7 +274,26 @@ REFRESH_DAYS = int(os.environ.get("JWT_REFRESH_DAYS", "7"))
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=ACCESS_MIN),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=REFRESH_DAYS),
+    # Añade username/rol/is_staff como claims (ver core.autenticacion)
+    "TOKEN_OBTAIN_SERIALIZER": "core.autenticacion.TokenConRolSerializer",
+    # Renueva el access con los claims actuales del usuario (o lo rechaza si
+    # está inactivo)
+    "TOKEN_REFRESH_SERIALIZER": "core.autenticacion.RefrescoConRolSerializer",
 }
+# Segundos que se cachea el rol/is_staff vigente de un usuario para revocar
+# tokens de usuarios desactivados o con rol o is_staff cambiado (0 = sin
+# comprobación)
+JWT_REVOCACION_TTL = int(os.environ.get("JWT_REVOCACION_TTL", "60"))
+
+# --- Auditoría (core.auditoria): cola en memoria + bulk_create en segundo plano ---
+AUDITORIA_ASINCRONA = os.environ.get("AUDITORIA_ASINCRONA", "True").strip().lower() == "true"
+AUDITORIA_MAX_COLA = int(os.environ.get("AUDITORIA_MAX_COLA", "10000"))
+AUDITORIA_LOTE = int(os.environ.get("AUDITORIA_LOTE", "500"))
+AUDITORIA_INTERVALO = float(os.environ.get("AUDITORIA_INTERVALO", "1.0"))  # segundos
+AUDITORIA_ESPERA = float(os.environ.get("AUDITORIA_ESPERA", "0.05"))  # contrapresión
+# Retención: lo anterior a N días pasa a AUDITORIA_ARCHIVO_DIR/AAAA-MM.ndjson.gz
+AUDITORIA_RETENCION_DIAS = int(os.environ.get("AUDITORIA_RETENCION_DIAS", "90"))
+AUDITORIA_ARCHIVO_DIR = Path(os.environ.get("AUDITORIA_ARCHIVO_DIR", BASE_DIR / "auditoria_archivo"))
 
 LOGGING = {
     "version": 1,
@@ -32,29 +32,68 @@ export async function login({ usuario, clave }) {
   return data;
 }
 
+// Listados paginados por cursor: { next, previous, results }
+const resultados = (data) => (Array.isArray(data) ? data : data.results);
+
+// URL de la página siguiente (absoluta, con el cursor) o null si no hay más
+const siguiente = (data) => (Array.isArray(data) ? null : data.next || null);
+
+// Lecturas calientes (yo, catálogos, listados de personajes): con
+// VITE_API_ASYNC=true van a /api/async/, vistas async nativas con las mismas
+// respuestas (backend/core/vistas_asincronas.py). Solo compensa si el backend
+// se sirve por ASGI; bajo WSGI son más lentas, así que por defecto no.
+const lectura = (ruta) => (import.meta.env.VITE_API_ASYNC === "true" ? `/async${ruta}` : ruta);
+
 export async function obtenerYo() {
-  const { data } = await cliente.get("/yo/");
+  const { data } = await cliente.get(lectura("/yo/"));
   localStorage.setItem("rol", data.rol || "");
   return data;
 }
 
+// Carga inicial en una sola petición: yo + catálogos (GM) + 1ª página de
+// personajes y disponibles. Listas ya "desenvueltas" como en PersonajesAPI;
+// `siguiente` trae la URL de la página que sigue de cada una (o null), para
+// pedirla con PersonajesAPI.mas() cuando el usuario quiera ver más.
+export async function obtenerBootstrap() {
+  const { data } = await cliente.get("/bootstrap/");
+  localStorage.setItem("rol", data.yo?.rol || "");
+  return {
+    yo: data.yo,
+    catalogos: data.catalogos,
+    personajes: resultados(data.personajes),
+    disponibles: resultados(data.disponibles),
+    siguiente: { personajes: siguiente(data.personajes), disponibles: siguiente(data.disponibles) },
+  };
+}
+
 export const Catalogo = {
-  listarRazas: () => cliente.get("/razas/").then(r=>r.data),
+  listarRazas: () => cliente.get(lectura("/razas/")).then(r=>r.data),
   crearRaza: (nombre) => cliente.post("/razas/", { nombre }).then(r=>r.data),
 
-  listarHabilidades: () => cliente.get("/habilidades/").then(r=>r.data),
+  listarHabilidades: () => cliente.get(lectura("/habilidades/")).then(r=>r.data),
   crearHabilidad: (nombre) => cliente.post("/habilidades/", { nombre }).then(r=>r.data),
 
-  listarPoderes: () => cliente.get("/poderes/").then(r=>r.data),
+  listarPoderes: () => cliente.get(lectura("/poderes/")).then(r=>r.data),
   crearPoder: (nombre) => cliente.post("/poderes/", { nombre }).then(r=>r.data),
 
-  listarEquipamientos: () => cliente.get("/equipamientos/").then(r=>r.data),
+  listarEquipamientos: () => cliente.get(lectura("/equipamientos/")).then(r=>r.data),
   crearEquipamiento: (nombre) => cliente.post("/equipamientos/", { nombre }).then(r=>r.data),
 };
 
+// Filtros de servidor: { raza, poder, equipamiento, estado, nivel_min, nivel_max,
+// propietario, nombre, ordering, page_size } (el backend filtra y pagina en SQL)
+const conFiltros = (filtros) => (filtros ? [{ params: filtros }] : []);
+
 export const PersonajesAPI = {
-  listar: () => cliente.get("/personajes/").then(r=>r.data),
-  disponibles: () => cliente.get("/personajes/disponibles/").then(r=>r.data),
+  // Primera página; las demás, con mas(url) a partir de su `next`
+  listar: (filtros) => cliente.get(lectura("/personajes/"), ...conFiltros(filtros)).then(r=>resultados(r.data)),
+  disponibles: (filtros) =>
+    cliente.get(lectura("/personajes/disponibles/"), ...conFiltros(filtros)).then(r=>resultados(r.data)),
+  // Página siguiente de un listado: { filas, siguiente: url|null }
+  mas: (url) => cliente.get(url).then(r=>({ filas: resultados(r.data), siguiente: siguiente(r.data) })),
+  // Búsqueda por nombre/propietario, ordenada por relevancia
+  buscar: (q, filtros = {}) =>
+    cliente.get("/personajes/buscar/", { params: { ...filtros, q } }).then(r=>r.data.results),
 
   elegir: (id) => cliente.post(`/personajes/${id}/elegir/`).then(r=>r.data),
   elegirHabilidades: (id, payload) =>
@@ -71,6 +110,13 @@ export const PersonajesAPI = {
   eliminar: (id) => cliente.delete(`/personajes/${id}/`).then(r=>r.data),
 };
 
+// Sincronización incremental (GET /api/sync/?since=): guarda `cursor` y
+// pásalo en el siguiente refresco. reset: true = sustituir los listados por
+// la primera página (el resto, con PersonajesAPI.mas(seccion.siguiente));
+// si no, aplicar { cambiados, borrados } de cada sección. mas: repetir ya.
+export const sincronizar = (since) =>
+  cliente.get("/sync/", since == null ? {} : { params: { since } }).then(r=>r.data);
+
 // Registro (POST /api/auth/register/)
 export async function registrarse({ username, email, password, password2 }) {
   const { data } = await cliente.post("/auth/register/", {
@@ -83,3 +129,49 @@ export async function registrarse({ username, email, password, password2 }) {
   if (access) almacenamientoToken.guardar(access);
   return data;
 }
+
+// Avisos en tiempo real (SSE, GET /api/eventos/). EventSource no envía
+// cabeceras y el token en la URL quedaría en los logs: se pide antes un ticket
+// de un solo uso (POST /api/eventos/ticket/, con el token en la cabecera).
+// onCambio recibe { id, accion, version, propietarios }; onResync, cuando se
+// perdieron avisos y toca recargar (también al reconectar). Si se corta la
+// conexión o el token caduca, se reconecta con un ticket nuevo; si ya no se
+// puede pedir (sesión caducada), se deja de intentar.
+const RECONEXION_MS = 3000;
+
+export function suscribirEventos({ onCambio, onResync, pool = true } = {}) {
+  let fuente = null;
+  let espera = null;
+  let cerrado = false;
+
+  async function conectar(reconexion) {
+    let ticket;
+    try {
+      ({ data: { ticket } } = await cliente.post("/eventos/ticket/"));
+    } catch {
+      return;
+    }
+    if (cerrado) return;
+    const params = new URLSearchParams({ ticket, pool: pool ? "1" : "0" });
+    fuente = new EventSource(`${API_URL}/api/eventos/?${params}`);
+    if (onCambio) fuente.addEventListener("personaje", (e) => onCambio(JSON.parse(e.data)));
+    if (onResync) {
+      fuente.addEventListener("resync", () => onResync());
+      if (reconexion) fuente.addEventListener("open", () => onResync(), { once: true });
+    }
+    // El reintento propio de EventSource reusaría el ticket ya gastado
+    const reconectar = () => {
+      fuente.close();
+      if (!cerrado) espera = setTimeout(() => conectar(true), RECONEXION_MS);
+    };
+    fuente.addEventListener("caducado", reconectar);
+    fuente.onerror = reconectar;
+  }
+
+  conectar(false);
+  return () => {
+    cerrado = true;
+    clearTimeout(espera);
+    if (fuente) fuente.close();
+  };
+}
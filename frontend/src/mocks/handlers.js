@@ -46,6 +46,36 @@ export const handlers = [
     return HttpResponse.json({ rol }, { status: 200 });
   }),
 
+  // ---- CARGA INICIAL (yo + catálogos + listas) ----
+  http.get("*/bootstrap/", async ({ request }) => {
+    await delay(10);
+    const auth = request.headers.get("Authorization") || "";
+    const rol = auth.includes("token_login_") ? "GM" : "JUGADOR";
+    return HttpResponse.json(
+      {
+        yo: { id: 1, usuario: "gm", rol },
+        catalogos: rol === "GM"
+          ? { razas: [{ id: 1, nombre: "Humano" }], habilidades: [], poderes: [], equipamientos: [] }
+          : null,
+        personajes: {
+          next: null, previous: null,
+          results: [
+            { id: 1, nombre: "Arthas", nivel: 10, raza: "Humano" },
+            { id: 2, nombre: "Jaina", nivel: 8, raza: "Humano" },
+          ],
+        },
+        disponibles: {
+          next: null, previous: null,
+          results: [
+            { id: 3, nombre: "Thrall", nivel: 5, raza: "Orco" },
+            { id: 4, nombre: "Valeera", nivel: 7, raza: "Elfa" },
+          ],
+        },
+      },
+      { status: 200 }
+    );
+  }),
+
   // ---- PERSONAJES ----
   http.get("*/personajes/", async () => {
     await delay(10);
@@ -1,5 +1,5 @@
 import React, { useEffect, useState, useLayoutEffect, useRef} from "react";
-import { Catalogo, PersonajesAPI } from "../api";
+import { PersonajesAPI, obtenerBootstrap } from "../api";
 import Header from "../components/Header";
 
 
@@ -104,6 +104,8 @@ export default function Personajes() {
 
   const [mis, setMis] = useState([]);
   const [disponibles, setDisponibles] = useState([]);
+  // URL de la página siguiente de cada listado (null = no hay más)
+  const [siguiente, setSiguiente] = useState({ personajes: null, disponibles: null });
 
   const [form, setForm] = useState({ nombre: "", raza: "", poder: "", equipo: "" });
   const [editId, setEditId] = useState(null);
@@ -130,41 +132,68 @@ useLayoutEffect(() => {
 
 
   async function cargarGM() {
-    const [r, h, p, e, todos, disp] = await Promise.all([
-      Catalogo.listarRazas(),
-      Catalogo.listarHabilidades(),
-      Catalogo.listarPoderes(),
-      Catalogo.listarEquipamientos(),
-      PersonajesAPI.listar(),
-      PersonajesAPI.disponibles(),
-    ]);
-    setRazas(r);
-    setHabs(h);
-    setPoderes(p);
-    setEquipos(e);
+    const { catalogos, personajes: todos, disponibles: disp, siguiente: sig } = await obtenerBootstrap();
+    setRazas(catalogos?.razas || []);
+    setHabs(catalogos?.habilidades || []);
+    setPoderes(catalogos?.poderes || []);
+    setEquipos(catalogos?.equipamientos || []);
     setMis(todos);
     setDisponibles(disp);
-
-    const initOps = {};
-    todos.forEach((pj) => {
-      const ids = (pj.opciones || []).map((o) => o.id);
-      initOps[pj.id] = { op1: ids[0] || "", op2: ids[1] || "", op3: ids[2] || "" };
-    });
-    setOpSel(initOps);
+    setSiguiente(sig);
+    setOpSel(opcionesDe(todos));
   }
 
   async function cargarJugador() {
-    const [misL, disp] = await Promise.all([PersonajesAPI.listar(), PersonajesAPI.disponibles()]);
+    const { personajes: misL, disponibles: disp, siguiente: sig } = await obtenerBootstrap();
     setMis(misL);
     setDisponibles(disp);
+    setSiguiente(sig);
+    setSeleccion(seleccionDe(misL));
+  }
 
-    const initSel = {};
-    misL.forEach((pj) => {
-      initSel[pj.id] = (pj.seleccion || []).map((x) => x.id);
+  function opcionesDe(lista) {
+    const ops = {};
+    lista.forEach((pj) => {
+      const ids = (pj.opciones || []).map((o) => o.id);
+      ops[pj.id] = { op1: ids[0] || "", op2: ids[1] || "", op3: ids[2] || "" };
     });
-    setSeleccion(initSel);
+    return ops;
   }
 
+  function seleccionDe(lista) {
+    const sel = {};
+    lista.forEach((pj) => {
+      sel[pj.id] = (pj.seleccion || []).map((x) => x.id);
+    });
+    return sel;
+  }
+
+  // Página siguiente de un listado ("personajes" o "disponibles"), a petición
+  async function cargarMas(lista) {
+    keepScrollPosition();
+    try {
+      const { filas, siguiente: url } = await PersonajesAPI.mas(siguiente[lista]);
+      if (lista === "disponibles") {
+        setDisponibles((prev) => [...prev, ...filas]);
+      } else {
+        setMis((prev) => [...prev, ...filas]);
+        if (esGM) setOpSel((prev) => ({ ...opcionesDe(filas), ...prev }));
+        else setSeleccion((prev) => ({ ...seleccionDe(filas), ...prev }));
+      }
+      setSiguiente((prev) => ({ ...prev, [lista]: url }));
+    } catch (e) {
+      console.error(e);
+      setMsg("Error cargando más personajes.");
+    }
+  }
+
+  const BotonMas = ({ lista }) =>
+    siguiente[lista] ? (
+      <div className="mt-4 flex justify-center">
+        <Button variant="subtle" onClick={() => cargarMas(lista)}>Cargar más</Button>
+      </div>
+    ) : null;
+
   useEffect(() => {
     setMsg("");
     (async () => {
@@ -581,6 +610,7 @@ useLayoutEffect(() => {
             ) : (
               <ul>{disponibles.map((p) => <Item key={p.id} {...p} />)}</ul>
             )}
+            <BotonMas lista="disponibles" />
           </div>
         )}
 
@@ -600,6 +630,7 @@ useLayoutEffect(() => {
           ) : (
             <ul>{mis.map((p) => <Item key={p.id} {...p} />)}</ul>
           )}
+          <BotonMas lista="personajes" />
         </div>
         </div>
       </main>
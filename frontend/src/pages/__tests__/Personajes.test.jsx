@@ -1,6 +1,8 @@
 import { render, screen, waitFor, fireEvent } from "@testing-library/react";
 import { BrowserRouter } from "react-router-dom";
 import Personajes from "../../pages/Personajes";
+import { server } from "../../mocks/server";
+import { http, HttpResponse } from "msw";
 
 // set rol por defecto
 beforeEach(() => {
@@ -33,3 +35,33 @@ test("si no es GM, muestra 'Personajes disponibles' y botón Elegir", async () =
   expect(await screen.findByText(/Personajes disponibles/i)).toBeInTheDocument();
   expect(await screen.findByRole("button", { name: /Elegir/i })).toBeInTheDocument();
 });
+
+test("pide la página siguiente solo al pulsar 'Cargar más'", async () => {
+  localStorage.setItem("rol", "JUGADOR");
+  const pagina2 = "http://127.0.0.1:8000/api/personajes/?cursor=abc";
+  const pedidas = [];
+  server.use(
+    http.get("*/bootstrap/", () =>
+      HttpResponse.json({
+        yo: { id: 1, usuario: "j", rol: "JUGADOR" },
+        catalogos: null,
+        personajes: { next: pagina2, previous: null, results: [{ id: 1, nombre: "Arthas", nivel: 10 }] },
+        disponibles: { next: null, previous: null, results: [] },
+      })
+    ),
+    http.get("*/personajes/", ({ request }) => {
+      pedidas.push(request.url);
+      return HttpResponse.json({ next: null, previous: pagina2, results: [{ id: 2, nombre: "Jaina", nivel: 8 }] });
+    })
+  );
+  renderWithRouter(<Personajes />);
+
+  expect(await screen.findByText("Arthas")).toBeInTheDocument();
+  expect(screen.queryByText("Jaina")).not.toBeInTheDocument();
+  expect(pedidas).toEqual([]);
+
+  fireEvent.click(screen.getByRole("button", { name: /Cargar más/i }));
+  expect(await screen.findByText("Jaina")).toBeInTheDocument();
+  expect(pedidas).toEqual([pagina2]);
+  await waitFor(() => expect(screen.queryByRole("button", { name: /Cargar más/i })).not.toBeInTheDocument());
+});
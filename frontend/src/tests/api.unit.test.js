@@ -135,6 +135,27 @@ test("interceptor agrega Authorization cuando hay token", () => {
     expect(mockPost).toHaveBeenCalledWith("/equipamientos/", { nombre: "Espada" });
   });
 
+  it("con VITE_API_ASYNC las lecturas calientes van a /async/", async () => {
+    vi.stubEnv("VITE_API_ASYNC", "true");
+    try {
+      mockGet.mockResolvedValue({ data: { results: [] } });
+      await obtenerYo();
+      await Catalogo.listarRazas();
+      await PersonajesAPI.listar({ raza: 2 });
+      await PersonajesAPI.disponibles();
+      expect(mockGet).toHaveBeenCalledWith("/async/yo/");
+      expect(mockGet).toHaveBeenCalledWith("/async/razas/");
+      expect(mockGet).toHaveBeenCalledWith("/async/personajes/", { params: { raza: 2 } });
+      expect(mockGet).toHaveBeenCalledWith("/async/personajes/disponibles/");
+      // Las escrituras siguen en las vistas DRF
+      mockPost.mockResolvedValue({ data: {} });
+      await PersonajesAPI.elegir(7);
+      expect(mockPost).toHaveBeenCalledWith("/personajes/7/elegir/");
+    } finally {
+      vi.unstubAllEnvs();
+    }
+  });
+
   it("PersonajesAPI: listar, disponibles y acciones", async () => {
     mockGet.mockResolvedValue({ data: [] });
     mockPost.mockResolvedValue({ data: { ok: true } });
@@ -146,6 +167,22 @@ test("interceptor agrega Authorization cuando hay token", () => {
     expect(mockGet).toHaveBeenCalledWith("/personajes/");
     expect(mockGet).toHaveBeenCalledWith("/personajes/disponibles/");
 
+    // Solo la primera página; la siguiente, cuando se pide con mas()
+    const siguiente = "http://127.0.0.1:8000/api/personajes/?cursor=abc";
+    mockGet.mockResolvedValueOnce({ data: { next: siguiente, previous: null, results: [{ id: 1 }] } });
+    expect(await PersonajesAPI.listar()).toEqual([{ id: 1 }]);
+    expect(mockGet).not.toHaveBeenCalledWith(siguiente);
+    mockGet.mockResolvedValueOnce({ data: { next: null, previous: siguiente, results: [{ id: 2 }] } });
+    expect(await PersonajesAPI.mas(siguiente)).toEqual({ filas: [{ id: 2 }], siguiente: null });
+    expect(mockGet).toHaveBeenCalledWith(siguiente);
+
+    await PersonajesAPI.listar({ raza: 2, nivel_min: 3 });
+    expect(mockGet).toHaveBeenCalledWith("/personajes/", { params: { raza: 2, nivel_min: 3 } });
+
+    mockGet.mockResolvedValueOnce({ data: { results: [] } });
+    await PersonajesAPI.buscar("gan", { limite: 5 });
+    expect(mockGet).toHaveBeenCalledWith("/personajes/buscar/", { params: { limite: 5, q: "gan" } });
+
     await PersonajesAPI.elegir(7);
     expect(mockPost).toHaveBeenCalledWith("/personajes/7/elegir/");
 